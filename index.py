@@ -1,31 +1,95 @@
 # index.py
 import os
 import json
+import queue
 import eel
-from modules.core import FlowExecutor, ActionRegistry
+from modules.core import ActionRegistry, RunManager, RunQueueFull
 import modules.actions  # Esto iniciará el auto-registro
 from modules.browser_config import create_browser_config
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 eel.init(BASE_DIR, allowed_extensions=['.js', '.html', '.css'])
 
+# Ejecuciones: cola con prioridad y hasta MAX_CONCURRENT_RUNS flujos a la vez,
+# cada uno con su propio contexto (variables, navegadores, cancelación)
+MAX_CONCURRENT_RUNS = 2
+MAX_QUEUED_RUNS = 20
+
+_events = queue.Queue()
+run_manager = RunManager(MAX_CONCURRENT_RUNS, MAX_QUEUED_RUNS, notifier=_events.put)
+_pump = None
+
 def _notify(payload):
     try:
         eel.notify_progress(payload)
     except Exception:
         pass
 
+def _pump_progress():
+    # Los flujos corren en hilos propios; este greenlet reenvía su progreso a
+    # la interfaz, así eel sigue atendiendo las demás llamadas mientras tanto
+    while True:
+        try:
+            _notify(_events.get_nowait())
+        except queue.Empty:
+            eel.sleep(0.1)
+
+def _ensure_pump():
+    global _pump
+    if _pump is None:
+        _pump = eel.spawn(_pump_progress)
+
+def _targets(run_id):
+    return [run_id] if run_id else run_manager.active()
+
 @eel.expose
-def run_flow(flow):
+def run_flow(flow, priority=0):
     print('RUN_FLOW <-', json.dumps(flow, indent=2, ensure_ascii=False))
     
-    # Usar el nuevo executor
-    executor = FlowExecutor(notifier=_notify)
-    result = executor.execute_flow(flow)
+    # Encolar y esperar el resultado sin bloquear a eel
+    _ensure_pump()
+    try:
+        run_id = run_manager.submit(flow, priority)
+    except RunQueueFull as e:
+        return {"ok": False, "error": str(e)}
+    while run_manager.get(run_id) is not None and run_manager.result(run_id) is None:
+        eel.sleep(0.1)
+    result = dict(run_manager.result(run_id) or {"ok": False, "error": "Ejecución no encontrada"}, run_id=run_id)
     
     print('RUN_FLOW ->', json.dumps(result, indent=2, ensure_ascii=False))
     return result
 
+@eel.expose
+def submit_run(flow, priority=0, name=''):
+    _ensure_pump()
+    try:
+        return {"ok": True, "run_id": run_manager.submit(flow, priority, name)}
+    except RunQueueFull as e:
+        return {"ok": False, "error": str(e)}
+
+@eel.expose
+def run_status(run_id):
+    status = run_manager.status(run_id)
+    if status is None:
+        return {"ok": False, "error": f"Ejecución no encontrada: {run_id}"}
+    return dict(status, ok=True)
+
+@eel.expose
+def run_result(run_id):
+    status = run_manager.status(run_id)
+    if status is None:
+        return {"ok": False, "error": f"Ejecución no encontrada: {run_id}"}
+    return {"ok": True, "estado": status["estado"], "resultado": run_manager.result(run_id)}
+
+@eel.expose
+def list_runs():
+    return run_manager.list_runs()
+
+@eel.expose
+def configure_runs(max_concurrent):
+    run_manager.set_max_concurrent(max_concurrent)
+    return True
+
 @eel.expose
 def export_flow(flow):
     out = os.path.join(BASE_DIR, 'flujo_exportado.json')
@@ -35,14 +99,23 @@ def export_flow(flow):
     return True
 
 @eel.expose
-def cancel_run():
-    print('CANCEL_RUN solicitado (pendiente)')
-    return True
+def cancel_run(run_id=None):
+    # Sin id: todas las ejecuciones en curso (botón Detener)
+    run_ids = _targets(run_id)
+    print(f'CANCEL_RUN {run_ids}')
+    return any([run_manager.cancel(r) for r in run_ids])
 
 @eel.expose
-def pause_run():
-    print('PAUSE_RUN (pendiente)')
-    return True
+def pause_run(run_id=None):
+    run_ids = _targets(run_id)
+    print(f'PAUSE_RUN {run_ids}')
+    return any([run_manager.pause(r) for r in run_ids])
+
+@eel.expose
+def resume_run(run_id=None):
+    run_ids = _targets(run_id)
+    print(f'RESUME_RUN {run_ids}')
+    return any([run_manager.resume(r) for r in run_ids])
 
 @eel.expose
 def get_enabled_types():
@@ -18,7 +18,7 @@ from . import finalization
 from .control import flow
 from .data import processors, readers, writers
 from .dialogs import pickers
-from .navigation import browser
+from .navigation import browser, extraction, forms, http
 from .files import operations
 from .finalization import cleanup
 
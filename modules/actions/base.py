@@ -24,19 +24,26 @@ class BaseAction(ABC):
             
         Returns:
             Dict con 'ok' boolean y opcionalmente 'error', 'result', 'variables'
+            y 'rama' (conexión de salida a seguir)
         """
         pass
 
 
-def success_result(result: Any = None, variables: Optional[Dict] = None) -> Dict[str, Any]:
+def success_result(result: Any = None, variables: Optional[Dict] = None,
+                   rama: Optional[str] = None) -> Dict[str, Any]:
     """
     Crea un resultado exitoso estándar.
+    
+    `rama` indica al ejecutor qué conexiones de salida seguir (condiciones
+    y bucles); sin rama se siguen todas.
     """
     response = {"ok": True}
     if result is not None:
         response["result"] = result
     if variables:
         response["variables"] = variables
+    if rama:
+        response["rama"] = rama
     return response
 
 
@@ -56,10 +63,23 @@ def validate_required_params(params: Dict[str, Any], required: list) -> Optional
     """
     missing = []
     for param in required:
-        if param not in params or params[param] is None or params[param] == '':
+        value = params.get(param)
+        # Solo el texto vacío cuenta como ausente (una tabla ya resuelta no se compara)
+        if value is None or (isinstance(value, str) and value == ''):
             missing.append(param)
     
     if missing:
         return f"Parámetros requeridos faltantes: {', '.join(missing)}"
     
     return None
+
+
+def parse_bool(value: Any) -> bool:
+    """
+    Interpreta valores de formulario ('sí', 'true', 1...) como booleanos.
+    """
+    if isinstance(value, bool):
+        return value
+    if value is None:
+        return False
+    return str(value).strip().lower() in ('true', 'verdadero', 'sí', 'si', '1', 'yes')
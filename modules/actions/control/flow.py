@@ -3,9 +3,21 @@
 Acciones de control de flujo básicas.
 """
 
+import os
+import re
+import json
 import time
-from typing import Dict, Any
-from modules.core import action, FlowContext
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from modules.core import action, FlowContext, FlowExecutor
+from modules.core.executor import CompiledFlow
+from modules.core.expressions import evaluar, resolver_valor, compilar_vectorial
+from modules.utils.query_plan import LazyFrame
+from modules.utils.text_index import ArchivoTexto
 from modules.actions.base import success_result, error_result, validate_required_params
 
 
@@ -20,13 +32,16 @@ from modules.actions.base import success_result, error_result, validate_required
 def pausa(context: FlowContext, segundos: float = 1.0) -> Dict[str, Any]:
     """
     Pausa la ejecución por el número de segundos especificado.
+    
+    Espera sobre el token de la ejecución: cancelar la interrumpe al
+    instante y el tiempo en pausa no se descuenta.
     """
     try:
         if segundos <= 0:
             return error_result("Los segundos deben ser mayor que 0")
         
         print(f"[PAUSA] Esperando {segundos} segundos...")
-        time.sleep(float(segundos))
+        context.token.wait(float(segundos))
         
         return success_result(f"Pausa de {segundos} segundos completada")
         
@@ -34,37 +49,371 @@ def pausa(context: FlowContext, segundos: float = 1.0) -> Dict[str, Any]:
         return error_result(f"Error en pausa: {str(e)}")
 
 
-# TODO: Implementar en el futuro
+def _parse_asignaciones(texto: Any) -> List[Tuple[str, str]]:
+    """
+    'a=$x, b=texto' → [('a', '$x'), ('b', 'texto')]. Un nombre sin '=' se
+    asigna a sí mismo: 'total' equivale a 'total=total'.
+    """
+    if isinstance(texto, dict):
+        return [(str(k), v) for k, v in texto.items()]
+    texto = str(texto or '').strip()
+    if texto.startswith('{'):
+        return list(json.loads(texto).items())
+    pares = []
+    for parte in texto.replace('\n', ',').split(','):
+        if not parte.strip():
+            continue
+        nombre, _, valor = parte.partition('=')
+        pares.append((nombre.strip(), valor.strip() if valor.strip() else nombre.strip()))
+    return pares
+
+
 @action(
     category='logica',
-    name='Si... entonces', 
-    description='Ejecuta acciones condicionalmente.',
+    name='Ejecutar flujo',
+    description='Ejecuta otro flujo exportado como un paso, con entradas y salidas.',
     schema=[
-        {'key': 'condicion', 'label': 'Condición', 'type': 'text', 'required': True, 'placeholder': '$variable == "valor"'},
-        {'key': 'verdadero', 'label': 'Acciones si verdadero', 'type': 'textarea', 'required': False},
-        {'key': 'falso', 'label': 'Acciones si falso', 'type': 'textarea', 'required': False}
+        {'key': 'ruta', 'label': 'Archivo del flujo (.json)', 'type': 'text', 'required': True, 'placeholder': 'C:\\flujos\\login.json'},
+        {'key': 'entradas', 'label': 'Entradas (variable=valor)', 'type': 'textarea', 'required': False, 'placeholder': 'usuario=$usuario\nfecha=2024-01-31'},
+        {'key': 'salidas', 'label': 'Salidas (destino=variable del subflujo)', 'type': 'text', 'required': False, 'placeholder': 'reporte=datos_web  (vacío = todas)'}
     ]
 )
-def condicional_si(context: FlowContext, condicion: str, 
-                   verdadero: str = "", falso: str = "") -> Dict[str, Any]:
+def ejecutar_flujo(context: FlowContext, executor: FlowExecutor, ruta: str,
+                   entradas: Any = "", salidas: str = "") -> Dict[str, Any]:
     """
-    Ejecuta acciones condicionalmente (implementación futura).
+    Ejecuta un subflujo en el mismo ejecutor y contexto.
+    
+    Dentro de 'Para cada fila' en paralelo, el contexto es el del hilo. El
+    subflujo ve las variables del flujo padre más las entradas y
+    comparte navegador y recursos. Al terminar, las variables del padre
+    vuelven a su estado previo y solo se copian las salidas; sin salidas se
+    copian todas las variables que el subflujo creó o modificó.
     """
-    return error_result("Condicionales aún no implementados - próximamente")
+    try:
+        error = validate_required_params({'ruta': ruta}, ['ruta'])
+        if error:
+            return error_result(error)
+        
+        ruta = os.path.abspath(ruta.strip())
+        if not os.path.exists(ruta):
+            return error_result(f"No se encontró el flujo: {ruta}")
+        if ruta in context.call_stack:
+            return error_result(f"Llamada recursiva al flujo: {os.path.basename(ruta)}")
+        
+        pasos = executor.load_flow(ruta)
+        
+        previas = context.list_variables()
+        nombres_entrada = set()
+        for nombre, valor in _parse_asignaciones(entradas):
+            context.set_variable(nombre, resolver_valor(valor, previas))
+            nombres_entrada.add(nombre)
+        
+        inicio = time.perf_counter()
+        context.call_stack.append(ruta)
+        try:
+            resultado = executor.run_steps(pasos, notify=False, context=context)
+        finally:
+            context.call_stack.pop()
+            finales = context.list_variables()
+            context.restore_variables(previas)
+        segundos = time.perf_counter() - inicio
+        
+        if not resultado.get('ok', False):
+            return error_result(f"Error en el flujo {os.path.basename(ruta)}: {resultado.get('error')}")
+        
+        if salidas:
+            mapeo = _parse_asignaciones(salidas)
+            faltantes = [origen for _, origen in mapeo if origen not in finales]
+            if faltantes:
+                return error_result(f"El flujo no produjo: {', '.join(faltantes)}")
+        else:
+            mapeo = [(n, n) for n, v in finales.items()
+                     if n not in nombres_entrada and (n not in previas or previas[n] is not v)]
+        
+        variables = {}
+        for destino, origen in mapeo:
+            context.set_variable(destino, finales[origen])
+            variables[destino] = type(finales[origen]).__name__
+        
+        return success_result(
+            f"Flujo {os.path.basename(ruta)} completado ({len(pasos)} pasos, {segundos:.2f}s)",
+            variables=variables
+        )
+        
+    except Exception as e:
+        return error_result(f"Error ejecutando flujo: {str(e)}")
+
+
+@action(
+    category='logica',
+    name='Si... entonces', 
+    description='Evalúa una condición y sigue la conexión de la rama verdadera (derecha) o falsa (abajo).',
+    schema=[
+        {'key': 'condicion', 'label': 'Condición', 'type': 'text', 'required': True, 'placeholder': '$total > 1000 and ${fila.estado} == "ok"', 'expresion': True}
+    ],
+    branches=True
+)
+def condicional_si(context: FlowContext, condicion: str) -> Dict[str, Any]:
+    """
+    Bifurca el flujo según una expresión sobre las variables.
+    
+    La expresión se compila la primera vez y se reutiliza; el ejecutor
+    sigue solo las conexiones de la rama devuelta.
+    """
+    try:
+        error = validate_required_params({'condicion': condicion}, ['condicion'])
+        if error:
+            return error_result(error)
+        
+        valor = bool(evaluar(condicion, context.variables))
+        return success_result(f"Condición {'verdadera' if valor else 'falsa'}: {condicion}",
+                              rama='verdadero' if valor else 'falso')
+        
+    except Exception as e:
+        return error_result(f"Error evaluando condición: {str(e)}")
 
 
 @action(
     category='logica',
     name='Repetir mientras',
-    description='Repite acciones mientras se cumpla una condición.',
+    description='Repite la rama conectada a la derecha mientras se cumpla la condición; al terminar sigue por abajo.',
     schema=[
-        {'key': 'condicion', 'label': 'Condición', 'type': 'text', 'required': True},
+        {'key': 'condicion', 'label': 'Condición', 'type': 'text', 'required': True, 'placeholder': '$pagina <= $total_paginas', 'expresion': True},
         {'key': 'max_iteraciones', 'label': 'Máximo iteraciones', 'type': 'number', 'required': False, 'placeholder': '100'}
-    ]
+    ],
+    branches=True
 )
 def bucle_mientras(context: FlowContext, condicion: str, 
                   max_iteraciones: int = 100) -> Dict[str, Any]:
     """
-    Bucle while (implementación futura).
+    Paso de control de un bucle.
+    
+    El último paso del cuerpo se conecta de vuelta a este paso. Cada visita
+    evalúa la condición: si se cumple y no se alcanzó el máximo devuelve la
+    rama 'cuerpo', si no 'salida' y reinicia el contador. La iteración en
+    curso queda en la variable '<paso>_iteracion'.
+    """
+    try:
+        error = validate_required_params({'condicion': condicion}, ['condicion'])
+        if error:
+            return error_result(error)
+        
+        paso = context.current_step or 'bucle'
+        maximo = int(max_iteraciones or 100)
+        hechas = context.loop_counters.get(paso, 0)
+        
+        if bool(evaluar(condicion, context.variables)) and hechas < maximo:
+            context.loop_counters[paso] = hechas + 1
+            context.set_variable(f"{paso}_iteracion", hechas + 1)
+            return success_result(f"Iteración {hechas + 1}", rama='cuerpo')
+        
+        context.loop_counters.pop(paso, None)
+        if hechas >= maximo:
+            mensaje = f"Bucle detenido al alcanzar {maximo} iteraciones"
+            print(f"[BUCLE] {mensaje}")
+        else:
+            mensaje = f"Bucle terminado tras {hechas} iteraciones"
+        return success_result(mensaje, rama='salida')
+        
+    except Exception as e:
+        return error_result(f"Error en bucle: {str(e)}")
+
+
+# Pasos que 'Para cada fila' sabe ejecutar sobre columnas enteras
+_VECTORIALES = {'fila_calcular': 'expresion', 'fila_filtrar': 'condicion', 'variable_set': None}
+
+# $fila, ${fila.campo}, $indice: valores que cambian en cada fila
+_REFERENCIA_FILA = re.compile(r'\$\{?\s*(fila|indice)\b')
+
+
+def _tabla(context: FlowContext, variable: Any) -> pd.DataFrame:
+    """Nombre de variable o valor ya resuelto → DataFrame en memoria."""
+    datos = context.get_variable(variable) if isinstance(variable, str) and context.has_variable(variable) else variable
+    if isinstance(datos, LazyFrame):
+        return datos.collect()
+    if isinstance(datos, ArchivoTexto):
+        return datos.a_dataframe()
+    if isinstance(datos, pd.DataFrame):
+        return datos
+    if isinstance(datos, list):
+        return pd.DataFrame(datos)
+    raise ValueError(f"La variable '{variable}' debe contener datos tabulares")
+
+
+def _plan_vectorial(cuerpo: CompiledFlow) -> Optional[List[Tuple[Dict[str, Any], Any]]]:
+    """
+    Plan (paso, expresión por columnas) si el cuerpo es una cadena de pasos
+    de _VECTORIALES con expresiones vectorizables; None en otro caso.
     """
-    return error_result("Bucles aún no implementados - próximamente")
+    if not cuerpo.is_chain():
+        return None
+    plan = []
+    for paso_id in sorted(cuerpo.steps, key=cuerpo.rank.get):
+        paso = cuerpo.steps[paso_id]
+        if paso['type'] not in _VECTORIALES:
+            return None
+        clave = _VECTORIALES[paso['type']]
+        expresion = None
+        if not clave:
+            # Una variable que depende de la fila se fija una sola vez (con la
+            # última) y los pasos siguientes la verían igual en todas las filas
+            if any(isinstance(v, str) and _REFERENCIA_FILA.search(v)
+                   for v in (paso.get('props') or {}).values()):
+                return None
+        else:
+            expresion = compilar_vectorial(str((paso.get('props') or {}).get(clave, '')))
+            if expresion is None:
+                return None
+        plan.append((paso, expresion))
+    return plan
+
+
+def _ejecutar_vectorial(executor: FlowExecutor, context: FlowContext, cuerpo: CompiledFlow,
+                        plan: List[Tuple[Dict[str, Any], Any]], df: pd.DataFrame) -> pd.DataFrame:
+    """Aplica el plan a toda la tabla: una operación por paso, no por fila."""
+    df = df.copy()
+    for paso, expresion in plan:
+        if paso['type'] == 'variable_set':
+            # Como en la ejecución fila a fila: queda el valor de la última fila
+            if len(df):
+                context.variables['fila'] = df.iloc[-1].to_dict()
+                context.variables['indice'] = df.index[-1]
+                resultado = executor._execute_step(paso, context, cuerpo)
+                if not resultado.get('ok'):
+                    raise RuntimeError(resultado.get('error'))
+            continue
+        
+        variables = dict(context.variables, fila=df, indice=df.index)
+        valor = expresion.evaluar(variables)
+        if paso['type'] == 'fila_calcular':
+            df[paso['props']['campo']] = valor
+        elif np.ndim(valor) == 0:
+            df = df if valor else df.iloc[0:0]
+        else:
+            df = df[pd.Series(valor, index=df.index).fillna(False).astype(bool)]
+    return df
+
+
+def _ejecutar_por_filas(executor: FlowExecutor, context: FlowContext, cuerpo: CompiledFlow,
+                        df: pd.DataFrame, hilos: int, lote: int) -> pd.DataFrame:
+    """
+    Ejecuta el cuerpo una vez por fila.
+    
+    Con un hilo se usa el contexto del flujo (el cuerpo puede usar el
+    navegador ya abierto). Con varios, cada hilo toma lotes de filas y usa
+    un contexto hijo propio durante toda su vida: sus drivers se reutilizan
+    entre filas y se devuelven al pool al terminar.
+    """
+    registros = df.to_dict('records')
+    indices = list(df.index)
+    resultados: List[Any] = [None] * len(registros)
+    
+    def procesar(ctx: FlowContext, i: int) -> None:
+        ctx.variables['fila'] = registros[i]
+        ctx.variables['indice'] = indices[i]
+        resultado = executor.run_steps(cuerpo, notify=False, context=ctx)
+        if not resultado.get('ok', False):
+            raise RuntimeError(f"Fila {i + 1}: {resultado.get('error')}")
+        resultados[i] = ctx.variables.get('fila')
+    
+    if hilos <= 1:
+        for i in range(len(registros)):
+            procesar(context, i)
+    else:
+        lotes: 'queue.Queue[Tuple[int, int]]' = queue.Queue()
+        for inicio in range(0, len(registros), lote):
+            lotes.put((inicio, min(inicio + lote, len(registros))))
+        fallo = threading.Event()
+        
+        def trabajador() -> None:
+            hijo = context.child()
+            try:
+                while not fallo.is_set() and not hijo.token.cancelled:
+                    try:
+                        inicio, fin = lotes.get_nowait()
+                    except queue.Empty:
+                        return
+                    for i in range(inicio, fin):
+                        procesar(hijo, i)
+            except BaseException:
+                fallo.set()
+                raise
+            finally:
+                hijo.clear_all_drivers()
+        
+        with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+            tareas = [ejecutor.submit(trabajador) for _ in range(hilos)]
+        for tarea in tareas:
+            tarea.result()
+    
+    conservadas = [(indices[i], r) for i, r in enumerate(resultados) if isinstance(r, dict)]
+    return pd.DataFrame([r for _, r in conservadas], index=[i for i, _ in conservadas])
+
+
+@action(
+    category='logica',
+    name='Para cada fila',
+    description='Ejecuta la rama conectada a la derecha una vez por fila de una tabla; al terminar sigue por abajo.',
+    schema=[
+        {'key': 'variable', 'label': 'Variable con datos', 'type': 'text', 'required': True, 'placeholder': 'datos_csv'},
+        {'key': 'variable_destino', 'label': 'Variable con el resultado', 'type': 'text', 'required': False, 'placeholder': 'datos_procesados'},
+        {'key': 'hilos', 'label': 'Filas en paralelo (pasos web/archivos)', 'type': 'number', 'required': False, 'placeholder': '1', 'default': 1},
+        {'key': 'lote', 'label': 'Filas por lote', 'type': 'number', 'required': False, 'placeholder': '50', 'default': 50}
+    ],
+    branches=True
+)
+def para_cada_fila(context: FlowContext, executor: FlowExecutor, flow: CompiledFlow, variable: Any,
+                   variable_destino: str = "", hilos: int = 1, lote: int = 50) -> Dict[str, Any]:
+    """
+    Recorre una tabla ejecutando el cuerpo del bucle con $fila (dict) e
+    $indice.
+    
+    Si el cuerpo es una cadena de 'Calcular campo de la fila', 'Conservar
+    fila si' y 'Crear/Actualizar variable' con expresiones vectorizables, se
+    ejecuta una sola vez sobre columnas enteras. Si no, se ejecuta fila a
+    fila, en lotes y con `hilos` en paralelo si se indicó. El resultado
+    (filas conservadas, con los campos calculados) queda en variable_destino.
+    """
+    try:
+        error = validate_required_params({'variable': variable}, ['variable'])
+        if error:
+            return error_result(error)
+        
+        paso = context.current_step
+        cuerpo = flow.body(paso) if flow is not None and paso in flow.steps else None
+        if cuerpo is None or not len(cuerpo):
+            return error_result("Conectar los pasos del cuerpo a la salida derecha de 'Para cada fila'")
+        
+        df = _tabla(context, variable)
+        if paso not in flow.plans:
+            flow.plans[paso] = _plan_vectorial(cuerpo)
+        plan = flow.plans[paso]
+        
+        previas = {n: context.variables[n] for n in ('fila', 'indice') if n in context.variables}
+        inicio = time.perf_counter()
+        try:
+            if plan is not None:
+                resultado = _ejecutar_vectorial(executor, context, cuerpo, plan, df)
+                modo = "por columnas"
+            else:
+                hilos = max(1, int(hilos or 1))
+                resultado = _ejecutar_por_filas(executor, context, cuerpo, df, hilos,
+                                                 max(1, int(lote or 50)))
+                modo = "fila a fila" if hilos == 1 else f"fila a fila en {hilos} hilos"
+        finally:
+            for nombre in ('fila', 'indice'):
+                context.variables.pop(nombre, None)
+            context.variables.update(previas)
+        segundos = time.perf_counter() - inicio
+        
+        nombre = variable_destino or (f"{variable}_resultado" if isinstance(variable, str) else "resultado_filas")
+        context.set_variable(nombre, resultado)
+        
+        return success_result(
+            f"{len(df)} filas procesadas {modo} en {segundos:.2f}s; {len(resultado)} en el resultado",
+            variables={nombre: f"DataFrame con {len(resultado)} filas"},
+            rama='salida'
+        )
+        
+    except Exception as e:
+        return error_result(f"Error en 'Para cada fila': {str(e)}")
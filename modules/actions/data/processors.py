@@ -3,9 +3,13 @@
 Acciones de procesamiento de datos y manejo de variables.
 """
 
-from typing import Dict, Any, Union
+from typing import Dict, Any, Union, List, Tuple
+import pandas as pd
 from modules.core import action, FlowContext
+from modules.core.expressions import evaluar
 from modules.actions.base import success_result, error_result, validate_required_params
+from modules.utils.query_plan import LazyFrame, OPERADORES, AGREGACIONES
+from modules.utils.text_index import ArchivoTexto
 
 
 @action(
@@ -26,8 +30,8 @@ def variable_set(context: FlowContext, variable: str, valor: str) -> Dict[str, A
         if error:
             return error_result(error)
         
-        # Convertir valor según el tipo
-        processed_value = _convert_value(valor)
+        # Convertir valor según el tipo ($variable ya llega con su tipo)
+        processed_value = _convert_value(valor) if isinstance(valor, str) else valor
         
         context.set_variable(variable, processed_value)
         
@@ -119,6 +123,18 @@ def ordenar_info(context: FlowContext, variable: str, criterio: str, columna: st
         
         data = context.get_variable(variable)
         
+        # DataFrames y planes diferidos: orden diferido por columna
+        if isinstance(data, (pd.DataFrame, LazyFrame)):
+            if not columna:
+                return error_result("Indique la columna para ordenar datos tabulares")
+            plan = LazyFrame.desde(data).ordenar(_split_list(columna), ascendente=(criterio != 'desc'))
+            result_var = f"{variable}_ordenado"
+            context.set_variable(result_var, plan)
+            return success_result(
+                f"Orden diferido por {columna}. Guardado en '{result_var}'",
+                variables={result_var: plan.explicar()}
+            )
+        
         if not isinstance(data, list):
             return error_result(f"La variable '{variable}' debe contener una lista")
         
@@ -150,6 +166,256 @@ def ordenar_info(context: FlowContext, variable: str, criterio: str, columna: st
         return error_result(f"Error en ordenar_info: {str(e)}")
 
 
+@action(
+    category='datos',
+    name='Filtrar datos',
+    description='Agrega un filtro diferido sobre una tabla (no copia datos).',
+    schema=[
+        {'key': 'variable', 'label': 'Variable con datos', 'type': 'text', 'required': True, 'placeholder': 'datos_csv'},
+        {'key': 'columna', 'label': 'Columna', 'type': 'text', 'required': True},
+        {'key': 'operador', 'label': 'Operador', 'type': 'select', 'required': True, 'options': list(OPERADORES)},
+        {'key': 'valor', 'label': 'Valor', 'type': 'text', 'required': False, 'placeholder': '1000 | ok | a,b,c'},
+        {'key': 'variable_destino', 'label': 'Variable destino (opcional)', 'type': 'text', 'required': False}
+    ]
+)
+def datos_filtrar(context: FlowContext, variable: str, columna: str, operador: str,
+                  valor: str = "", variable_destino: str = "") -> Dict[str, Any]:
+    """
+    Filtra filas de una tabla sin materializar el resultado.
+    """
+    try:
+        error = validate_required_params({'variable': variable, 'columna': columna, 'operador': operador},
+                                       ['variable', 'columna', 'operador'])
+        if error:
+            return error_result(error)
+        
+        plan = _obtener_plan(context, variable)
+        if isinstance(plan, dict):
+            return plan
+        
+        if isinstance(valor, str) and operador == 'en':
+            # 'a,b,c': cada elemento con su tipo, como en los demás operadores
+            valor_convertido = tuple(_convert_value(v.strip()) for v in valor.split(','))
+        else:
+            valor_convertido = _convert_value(valor) if isinstance(valor, str) else valor
+        plan = plan.filtrar(columna, operador, valor_convertido)
+        
+        return _guardar_plan(context, plan, variable_destino or f"{variable}_filtrado")
+        
+    except Exception as e:
+        return error_result(f"Error filtrando datos: {str(e)}")
+
+
+@action(
+    category='datos',
+    name='Seleccionar columnas',
+    description='Conserva solo las columnas indicadas (diferido).',
+    schema=[
+        {'key': 'variable', 'label': 'Variable con datos', 'type': 'text', 'required': True, 'placeholder': 'datos_csv'},
+        {'key': 'columnas', 'label': 'Columnas', 'type': 'text', 'required': True, 'placeholder': 'fecha,cliente,importe'},
+        {'key': 'variable_destino', 'label': 'Variable destino (opcional)', 'type': 'text', 'required': False}
+    ]
+)
+def datos_seleccionar_columnas(context: FlowContext, variable: str, columnas: str,
+                               variable_destino: str = "") -> Dict[str, Any]:
+    """
+    Proyecta columnas de una tabla; el lector solo cargará esas columnas.
+    """
+    try:
+        error = validate_required_params({'variable': variable, 'columnas': columnas}, ['variable', 'columnas'])
+        if error:
+            return error_result(error)
+        
+        plan = _obtener_plan(context, variable)
+        if isinstance(plan, dict):
+            return plan
+        
+        plan = plan.seleccionar(_split_list(columnas))
+        
+        return _guardar_plan(context, plan, variable_destino or f"{variable}_columnas")
+        
+    except Exception as e:
+        return error_result(f"Error seleccionando columnas: {str(e)}")
+
+
+@action(
+    category='datos',
+    name='Agrupar y resumir',
+    description='Agrupa por columnas y calcula sumas, conteos, promedios, mínimos o máximos.',
+    schema=[
+        {'key': 'variable', 'label': 'Variable con datos', 'type': 'text', 'required': True, 'placeholder': 'datos_csv'},
+        {'key': 'por', 'label': 'Agrupar por', 'type': 'text', 'required': False, 'placeholder': 'cliente,mes'},
+        {'key': 'agregaciones', 'label': 'Agregaciones', 'type': 'text', 'required': True, 'placeholder': 'importe:suma,id:conteo'},
+        {'key': 'variable_destino', 'label': 'Variable destino (opcional)', 'type': 'text', 'required': False}
+    ]
+)
+def datos_agrupar(context: FlowContext, variable: str, agregaciones: str, por: str = "",
+                  variable_destino: str = "") -> Dict[str, Any]:
+    """
+    Agrega una agrupación diferida; se calcula por bloques al ejecutar el plan.
+    """
+    try:
+        error = validate_required_params({'variable': variable, 'agregaciones': agregaciones},
+                                       ['variable', 'agregaciones'])
+        if error:
+            return error_result(error)
+        
+        funciones = _parse_agregaciones(agregaciones)
+        if isinstance(funciones, dict):
+            return funciones
+        
+        plan = _obtener_plan(context, variable)
+        if isinstance(plan, dict):
+            return plan
+        
+        plan = plan.agrupar(_split_list(por), funciones)
+        
+        return _guardar_plan(context, plan, variable_destino or f"{variable}_agrupado")
+        
+    except Exception as e:
+        return error_result(f"Error agrupando datos: {str(e)}")
+
+
+@action(
+    category='datos',
+    name='Vista previa de datos',
+    description='Ejecuta el plan solo hasta obtener las primeras filas.',
+    schema=[
+        {'key': 'variable', 'label': 'Variable con datos', 'type': 'text', 'required': True, 'placeholder': 'datos_csv'},
+        {'key': 'filas', 'label': 'Filas', 'type': 'number', 'required': False, 'placeholder': '10', 'default': 10}
+    ]
+)
+def datos_vista_previa(context: FlowContext, variable: str, filas: int = 10) -> Dict[str, Any]:
+    """
+    Muestra las primeras filas de una tabla o plan diferido.
+    """
+    try:
+        if not variable:
+            return error_result("Nombre de variable requerido")
+        
+        plan = _obtener_plan(context, variable)
+        if isinstance(plan, dict):
+            return plan
+        
+        muestra = plan.head(int(filas))
+        
+        return success_result(
+            f"Vista previa de '{variable}': {len(muestra)} filas",
+            variables={variable: muestra.to_dict(orient='records')}
+        )
+        
+    except Exception as e:
+        return error_result(f"Error en vista previa: {str(e)}")
+
+
+@action(
+    category='datos',
+    name='Calcular campo de la fila',
+    description='Dentro de "Para cada fila": calcula un campo de la fila actual con una expresión.',
+    schema=[
+        {'key': 'campo', 'label': 'Campo', 'type': 'text', 'required': True, 'placeholder': 'total_con_iva'},
+        {'key': 'expresion', 'label': 'Expresión', 'type': 'text', 'required': True, 'placeholder': '${fila.importe} * 1.21', 'expresion': True}
+    ]
+)
+def fila_calcular(context: FlowContext, campo: str, expresion: str) -> Dict[str, Any]:
+    """
+    Asigna fila[campo] = expresión. Si el cuerpo del bucle solo tiene pasos
+    de este tipo (o filtros), 'Para cada fila' lo ejecuta por columnas.
+    """
+    try:
+        error = validate_required_params({'campo': campo, 'expresion': expresion}, ['campo', 'expresion'])
+        if error:
+            return error_result(error)
+        
+        fila = context.variables.get('fila')
+        if not isinstance(fila, dict):
+            return error_result("Este paso se usa dentro de 'Para cada fila'")
+        
+        fila[campo] = evaluar(expresion, context.variables)
+        return success_result(f"{campo} = {fila[campo]}")
+        
+    except Exception as e:
+        return error_result(f"Error calculando campo: {str(e)}")
+
+
+@action(
+    category='datos',
+    name='Conservar fila si',
+    description='Dentro de "Para cada fila": descarta la fila actual si no se cumple la condición.',
+    schema=[
+        {'key': 'condicion', 'label': 'Condición', 'type': 'text', 'required': True, 'placeholder': '${fila.estado} == "activo"', 'expresion': True}
+    ]
+)
+def fila_filtrar(context: FlowContext, condicion: str) -> Dict[str, Any]:
+    """
+    Una fila descartada no llega al resultado y los pasos siguientes del
+    cuerpo no se ejecutan para ella.
+    """
+    try:
+        error = validate_required_params({'condicion': condicion}, ['condicion'])
+        if error:
+            return error_result(error)
+        
+        if not isinstance(context.variables.get('fila'), dict):
+            return error_result("Este paso se usa dentro de 'Para cada fila'")
+        
+        if bool(evaluar(condicion, context.variables)):
+            return success_result("Fila conservada")
+        
+        context.variables['fila'] = None
+        return success_result("Fila descartada", rama='descartada')
+        
+    except Exception as e:
+        return error_result(f"Error evaluando condición: {str(e)}")
+
+
+def _obtener_plan(context: FlowContext, variable: str) -> Union[LazyFrame, Dict[str, Any]]:
+    """
+    Obtiene la variable como plan diferido o devuelve un error_result.
+    """
+    if not context.has_variable(variable):
+        return error_result(f"Variable '{variable}' no encontrada")
+    
+    datos = context.get_variable(variable)
+    if not isinstance(datos, (pd.DataFrame, LazyFrame, ArchivoTexto)):
+        return error_result(f"La variable '{variable}' debe contener datos tabulares")
+    
+    return LazyFrame.desde(datos)
+
+
+def _guardar_plan(context: FlowContext, plan: LazyFrame, var_name: str) -> Dict[str, Any]:
+    """
+    Guarda un plan diferido y arma el resultado estándar.
+    """
+    context.set_variable(var_name, plan)
+    return success_result(
+        f"Plan actualizado. Guardado en '{var_name}'",
+        variables={var_name: plan.explicar()}
+    )
+
+
+def _split_list(value: str) -> List[str]:
+    """
+    Convierte 'a, b,c' en ['a', 'b', 'c'].
+    """
+    return [item.strip() for item in str(value or '').split(',') if item.strip()]
+
+
+def _parse_agregaciones(value: str) -> Union[List[Tuple[str, str]], Dict[str, Any]]:
+    """
+    Convierte 'importe:suma,id:conteo' en [('importe', 'suma'), ('id', 'conteo')].
+    """
+    funciones = []
+    for item in _split_list(value):
+        if ':' not in item:
+            return error_result(f"Agregación inválida '{item}' (use columna:funcion)")
+        columna, funcion = (part.strip() for part in item.split(':', 1))
+        if funcion not in AGREGACIONES:
+            return error_result(f"Agregación no soportada: {funcion}. Opciones: {', '.join(AGREGACIONES)}")
+        funciones.append((columna, funcion))
+    return funciones
+
+
 def _convert_value(value_str: str) -> Union[str, int, float, bool]:
     """
     Convierte un string a su tipo más apropiado.
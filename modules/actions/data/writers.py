@@ -5,8 +5,17 @@ Acciones de escritura de datos a archivos.
 
 from typing import Dict, Any
 from modules.core import action, FlowContext
-from modules.actions.base import success_result, error_result, validate_required_params
-from modules.utils.data_io import escribir_csv as _escribir_csv, escribir_excel as _escribir_excel
+from modules.actions.base import success_result, error_result, validate_required_params, parse_bool
+from modules.utils.data_io import escribir_csv as _escribir_csv, escribir_excel as _escribir_excel, \
+    abrir_salida, ruta_con_compresion
+from modules.utils.query_plan import LazyFrame
+from modules.utils.text_index import ArchivoTexto
+from modules.utils.database import obtener_conexion, escribir_tabla
+from modules.utils.json_io import escribir_jsonl
+
+
+COMPRESION_FIELD = {'key': 'compresion', 'label': 'Compresión', 'type': 'select', 'required': False,
+                    'options': ['auto', 'gzip', 'zstd', 'xz'], 'default': 'auto'}
 
 
 @action(
@@ -15,12 +24,17 @@ from modules.utils.data_io import escribir_csv as _escribir_csv, escribir_excel
     description='Escribe datos a un archivo CSV.',
     schema=[
         {'key': 'nombre_variable', 'label': 'Variable con datos', 'type': 'text', 'required': True, 'placeholder': 'datos_excel'},
-        {'key': 'ruta_destino', 'label': 'Ruta del archivo CSV', 'type': 'text', 'required': True, 'placeholder': 'C:\\salida\\datos.csv'}
+        {'key': 'ruta_destino', 'label': 'Ruta del archivo CSV', 'type': 'text', 'required': True, 'placeholder': 'C:\\salida\\datos.csv'},
+        COMPRESION_FIELD
     ]
 )
-def escribir_csv_action(context: FlowContext, nombre_variable: str, ruta_destino: str) -> Dict[str, Any]:
+def escribir_csv_action(context: FlowContext, nombre_variable: str, ruta_destino: str,
+                        compresion: str = "auto") -> Dict[str, Any]:
     """
     Escribe datos de una variable a un archivo CSV.
+    
+    Con compresión se escribe en streaming a través del compresor; 'auto'
+    la deduce de la extensión (.gz, .zst, .xz).
     """
     try:
         error = validate_required_params({'nombre_variable': nombre_variable, 'ruta_destino': ruta_destino}, 
@@ -35,7 +49,8 @@ def escribir_csv_action(context: FlowContext, nombre_variable: str, ruta_destino
         datos = context.variables[nombre_variable]
         
         # Escribir usando la función consolidada
-        _escribir_csv(datos, ruta_destino)
+        ruta_destino = ruta_con_compresion(ruta_destino, compresion)
+        _escribir_csv(datos, ruta_destino, compresion=compresion)
         
         return success_result(f"CSV escrito: {ruta_destino}")
         
@@ -85,10 +100,12 @@ def escribir_excel_action(context: FlowContext, nombre_variable: str, ruta_desti
     schema=[
         {'key': 'nombre_variable', 'label': 'Variable con datos', 'type': 'text', 'required': True, 'placeholder': 'datos_procesados'},
         {'key': 'ruta_destino', 'label': 'Ruta del archivo TXT', 'type': 'text', 'required': True, 'placeholder': 'C:\\salida\\datos.txt'},
-        {'key': 'delimitador', 'label': 'Delimitador', 'type': 'text', 'required': False, 'placeholder': ',', 'default': ','}
+        {'key': 'delimitador', 'label': 'Delimitador', 'type': 'text', 'required': False, 'placeholder': ',', 'default': ','},
+        COMPRESION_FIELD
     ]
 )
-def escribir_txt_action(context: FlowContext, nombre_variable: str, ruta_destino: str, delimitador: str = ",") -> Dict[str, Any]:
+def escribir_txt_action(context: FlowContext, nombre_variable: str, ruta_destino: str, delimitador: str = ",",
+                        compresion: str = "auto") -> Dict[str, Any]:
     """
     Escribe datos de una variable a un archivo de texto.
     """
@@ -104,15 +121,21 @@ def escribir_txt_action(context: FlowContext, nombre_variable: str, ruta_destino
         
         datos = context.variables[nombre_variable]
         
-        # Escribir usando pandas si es DataFrame
-        if hasattr(datos, 'to_csv'):
-            _escribir_csv(datos, ruta_destino, sep=delimitador)
+        ruta_destino = ruta_con_compresion(ruta_destino, compresion)
+        
+        # Escribir usando pandas si es DataFrame o plan diferido
+        if isinstance(datos, LazyFrame) or hasattr(datos, 'to_csv'):
+            _escribir_csv(datos, ruta_destino, compresion=compresion, sep=delimitador)
         else:
             # Escribir como texto plano
             import os
             os.makedirs(os.path.dirname(ruta_destino), exist_ok=True)
-            with open(ruta_destino, 'w', encoding='utf-8') as f:
-                if isinstance(datos, (list, tuple)):
+            with abrir_salida(ruta_destino, compresion) as f:
+                if isinstance(datos, ArchivoTexto):
+                    # Copia línea a línea sin cargar el archivo completo
+                    for _, linea in datos.iter_lineas():
+                        f.write(linea + "\n")
+                elif isinstance(datos, (list, tuple)):
                     f.write(delimitador.join(map(str, datos)))
                 else:
                     f.write(str(datos))
@@ -121,3 +144,83 @@ def escribir_txt_action(context: FlowContext, nombre_variable: str, ruta_destino
         
     except Exception as e:
         return error_result(f"Error escribiendo TXT: {str(e)}")
+
+
+@action(
+    category='escritura',
+    name='Escribir en base SQLite',
+    description='Inserta una tabla en SQLite en una sola transacción con inserciones por lotes.',
+    schema=[
+        {'key': 'nombre_variable', 'label': 'Variable con datos', 'type': 'text', 'required': True, 'placeholder': 'datos_csv'},
+        {'key': 'ruta_bd', 'label': 'Archivo de base de datos', 'type': 'text', 'required': True, 'placeholder': 'C:\\datos\\staging.db'},
+        {'key': 'tabla', 'label': 'Tabla', 'type': 'text', 'required': True, 'placeholder': 'ventas'},
+        {'key': 'modo', 'label': 'Si la tabla existe', 'type': 'select', 'required': False, 'options': ['agregar', 'reemplazar'], 'default': 'agregar'},
+        {'key': 'lote', 'label': 'Filas por lote', 'type': 'number', 'required': False, 'placeholder': '10000', 'default': 10000}
+    ]
+)
+def escribir_sqlite_action(context: FlowContext, nombre_variable: str, ruta_bd: str, tabla: str,
+                           modo: str = "agregar", lote: int = 10000) -> Dict[str, Any]:
+    """
+    Escribe datos de una variable en una tabla SQLite.
+    """
+    try:
+        error = validate_required_params({'nombre_variable': nombre_variable, 'ruta_bd': ruta_bd, 'tabla': tabla}, 
+                                       ['nombre_variable', 'ruta_bd', 'tabla'])
+        if error:
+            return error_result(error)
+        
+        # Obtener datos del contexto
+        if nombre_variable not in context.variables:
+            return error_result(f"Variable '{nombre_variable}' no encontrada")
+        
+        datos = context.variables[nombre_variable]
+        
+        conexion = obtener_conexion(context, ruta_bd)
+        filas = escribir_tabla(conexion, tabla, datos, modo=modo or "agregar", lote=int(lote or 10000))
+        
+        return success_result(f"{filas} filas escritas en {ruta_bd}:{tabla}")
+        
+    except Exception as e:
+        return error_result(f"Error escribiendo SQLite: {str(e)}")
+
+
+@action(
+    category='escritura',
+    name='Escribir JSON Lines',
+    description='Escribe una tabla o lista como JSONL, un registro por línea.',
+    schema=[
+        {'key': 'nombre_variable', 'label': 'Variable con datos', 'type': 'text', 'required': True, 'placeholder': 'datos_web'},
+        {'key': 'ruta_destino', 'label': 'Ruta del archivo JSONL', 'type': 'text', 'required': True, 'placeholder': 'C:\\salida\\datos.jsonl'},
+        {'key': 'anexar', 'label': 'Agregar al final si existe', 'type': 'select', 'required': False, 'options': ['no', 'sí'], 'default': 'no'},
+        COMPRESION_FIELD
+    ]
+)
+def escribir_jsonl_action(context: FlowContext, nombre_variable: str, ruta_destino: str, anexar: str = "no",
+                          compresion: str = "auto") -> Dict[str, Any]:
+    """
+    Escribe datos de una variable a JSON Lines.
+    
+    Se serializa bloque a bloque; con anexar sirve para ir acumulando
+    resultados dentro de un bucle.
+    """
+    try:
+        error = validate_required_params({'nombre_variable': nombre_variable, 'ruta_destino': ruta_destino}, 
+                                       ['nombre_variable', 'ruta_destino'])
+        if error:
+            return error_result(error)
+        
+        # Obtener datos del contexto
+        if nombre_variable not in context.variables:
+            return error_result(f"Variable '{nombre_variable}' no encontrada")
+        
+        datos = context.variables[nombre_variable]
+        if isinstance(datos, ArchivoTexto):
+            datos = datos.como_plan()
+        
+        ruta_destino = ruta_con_compresion(ruta_destino, compresion)
+        escritos = escribir_jsonl(datos, ruta_destino, compresion=compresion, anexar=parse_bool(anexar))
+        
+        return success_result(f"JSONL escrito: {ruta_destino} ({escritos} registros)")
+        
+    except Exception as e:
+        return error_result(f"Error escribiendo JSONL: {str(e)}")
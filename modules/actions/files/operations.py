@@ -3,10 +3,13 @@
 Operaciones de gestión de archivos.
 """
 
-from typing import Dict, Any
+import os
+from typing import Dict, Any, List, Tuple
+import pandas as pd
 from modules.core import action, FlowContext
-from modules.actions.base import success_result, error_result, validate_required_params
-from modules.utils.data_io import crear_carpeta, mover_archivo, copiar_archivo, eliminar_archivo
+from modules.actions.base import success_result, error_result, validate_required_params, parse_bool
+from modules.utils.data_io import crear_carpeta, mover_archivo, copiar_archivo, eliminar_archivo, \
+    carpeta_escanear, transferir_archivos, sincronizar_carpeta, buscar_duplicados
 
 
 @action(
@@ -107,3 +110,212 @@ def eliminar_archivo_action(context: FlowContext, ruta: str) -> Dict[str, Any]:
         
     except Exception as e:
         return error_result(f"Error eliminando archivo: {str(e)}")
+
+
+LOTE_SCHEMA = [
+    {'key': 'origen', 'label': 'Variable con archivos o patrón', 'type': 'text', 'required': True, 'placeholder': 'lista_archivos | C:\\entrada\\*.pdf'},
+    {'key': 'carpeta_destino', 'label': 'Carpeta destino', 'type': 'text', 'required': True, 'placeholder': 'C:\\archivo\\procesados'},
+    {'key': 'carpeta_origen', 'label': 'Carpeta de la lista (si son nombres)', 'type': 'text', 'required': False},
+    {'key': 'si_existe', 'label': 'Si existe', 'type': 'select', 'required': False, 'options': ['sobrescribir', 'renombrar', 'saltar'], 'default': 'sobrescribir'},
+    {'key': 'hilos', 'label': 'Transferencias simultáneas', 'type': 'number', 'required': False, 'placeholder': '8'},
+    {'key': 'verificar', 'label': 'Verificar con hash', 'type': 'select', 'required': False, 'options': ['no', 'sí'], 'default': 'no'},
+    {'key': 'variable_destino', 'label': 'Variable con reporte (opcional)', 'type': 'text', 'required': False}
+]
+
+
+@action(
+    category='archivos',
+    name='Copiar varios archivos',
+    description='Copia en paralelo una lista de archivos o los que coinciden con un patrón.',
+    schema=LOTE_SCHEMA
+)
+def copiar_archivos_action(context: FlowContext, origen: Any, carpeta_destino: str, carpeta_origen: str = "",
+                           si_existe: str = "sobrescribir", hilos: int = 0, verificar: str = "no",
+                           variable_destino: str = "") -> Dict[str, Any]:
+    """
+    Copia un lote de archivos a una carpeta.
+    """
+    return _transferir_lote(context, "copiar", origen, carpeta_destino, carpeta_origen,
+                            si_existe, hilos, verificar, variable_destino)
+
+
+@action(
+    category='archivos',
+    name='Mover varios archivos',
+    description='Mueve en paralelo una lista de archivos o los que coinciden con un patrón.',
+    schema=LOTE_SCHEMA
+)
+def mover_archivos_action(context: FlowContext, origen: Any, carpeta_destino: str, carpeta_origen: str = "",
+                          si_existe: str = "sobrescribir", hilos: int = 0, verificar: str = "no",
+                          variable_destino: str = "") -> Dict[str, Any]:
+    """
+    Mueve un lote de archivos a una carpeta.
+    """
+    return _transferir_lote(context, "mover", origen, carpeta_destino, carpeta_origen,
+                            si_existe, hilos, verificar, variable_destino)
+
+
+@action(
+    category='archivos',
+    name='Sincronizar carpeta',
+    description='Copia a destino solo los archivos nuevos o modificados del origen (tipo rsync).',
+    schema=[
+        {'key': 'origen', 'label': 'Carpeta origen', 'type': 'text', 'required': True, 'placeholder': 'C:\\reportes'},
+        {'key': 'destino', 'label': 'Carpeta destino', 'type': 'text', 'required': True, 'placeholder': 'D:\\respaldo\\reportes'},
+        {'key': 'patron', 'label': 'Patrón (ej. *.xlsx;*.csv)', 'type': 'text', 'required': False, 'placeholder': '*'},
+        {'key': 'usar_hash', 'label': 'Comparar contenido (hash)', 'type': 'select', 'required': False, 'options': ['no', 'sí'], 'default': 'no'},
+        {'key': 'eliminar_huerfanos', 'label': 'Eliminar archivos que ya no están en origen', 'type': 'select', 'required': False, 'options': ['no', 'sí'], 'default': 'no'},
+        {'key': 'hilos', 'label': 'Copias simultáneas', 'type': 'number', 'required': False, 'placeholder': '8'},
+        {'key': 'variable_destino', 'label': 'Variable con resumen (opcional)', 'type': 'text', 'required': False}
+    ]
+)
+def sincronizar_carpeta_action(context: FlowContext, origen: str, destino: str, patron: str = "*",
+                               usar_hash: str = "no", eliminar_huerfanos: str = "no", hilos: int = 0,
+                               variable_destino: str = "") -> Dict[str, Any]:
+    """
+    Sincroniza una carpeta con otra copiando solo lo que cambió.
+    """
+    try:
+        error = validate_required_params({'origen': origen, 'destino': destino}, ['origen', 'destino'])
+        if error:
+            return error_result(error)
+        
+        resumen = sincronizar_carpeta(
+            origen, destino, patron or "*",
+            usar_hash=parse_bool(usar_hash),
+            eliminar_huerfanos=parse_bool(eliminar_huerfanos),
+            max_workers=int(hilos) if hilos else None
+        )
+        
+        reporte = resumen.pop("reporte")
+        var_name = variable_destino or "resumen_sincronizacion"
+        context.set_variable(var_name, resumen)
+        context.set_variable(f"{var_name}_reporte", pd.DataFrame(reporte))
+        
+        return success_result(
+            f"Sincronizado {origen} → {destino}: {resumen['copiados']} copiados ({resumen['bytes']} bytes), "
+            f"{resumen['sin_cambios']} sin cambios, {resumen['eliminados']} eliminados, {resumen['errores']} errores",
+            variables={var_name: resumen}
+        )
+        
+    except Exception as e:
+        return error_result(f"Error sincronizando carpeta: {str(e)}")
+
+
+@action(
+    category='archivos',
+    name='Buscar archivos duplicados',
+    description='Detecta archivos con contenido idéntico en una o varias carpetas.',
+    schema=[
+        {'key': 'carpetas', 'label': 'Carpetas (separadas por coma)', 'type': 'text', 'required': True, 'placeholder': 'C:\\facturas,C:\\escaneos'},
+        {'key': 'patron', 'label': 'Patrón (ej. *.pdf;*.jpg)', 'type': 'text', 'required': False, 'placeholder': '*'},
+        {'key': 'recursivo', 'label': 'Incluir subcarpetas', 'type': 'select', 'required': False, 'options': ['sí', 'no'], 'default': 'sí'},
+        {'key': 'algoritmo', 'label': 'Algoritmo', 'type': 'select', 'required': False, 'options': ['sha256', 'blake2b', 'sha1', 'md5'], 'default': 'sha256'},
+        {'key': 'hilos', 'label': 'Hashes simultáneos', 'type': 'number', 'required': False, 'placeholder': '8'},
+        {'key': 'variable_destino', 'label': 'Variable destino (opcional)', 'type': 'text', 'required': False, 'placeholder': 'duplicados'}
+    ]
+)
+def buscar_duplicados_action(context: FlowContext, carpetas: Any, patron: str = "*", recursivo: str = "sí",
+                             algoritmo: str = "sha256", hilos: int = 0,
+                             variable_destino: str = "") -> Dict[str, Any]:
+    """
+    Agrupa archivos duplicados y guarda la tabla de grupos en una variable.
+    """
+    try:
+        error = validate_required_params({'carpetas': carpetas}, ['carpetas'])
+        if error:
+            return error_result(error)
+        
+        if isinstance(carpetas, str):
+            carpetas = [c.strip() for c in carpetas.split(',') if c.strip()]
+        
+        duplicados = buscar_duplicados(
+            list(carpetas), patron or "*",
+            recursivo=parse_bool(recursivo),
+            algoritmo=algoritmo or "sha256",
+            max_workers=int(hilos) if hilos else None
+        )
+        
+        var_name = variable_destino or "duplicados"
+        context.set_variable(var_name, duplicados)
+        
+        grupos = duplicados['grupo'].nunique()
+        return success_result(
+            f"{grupos} grupos de duplicados ({len(duplicados)} archivos)",
+            variables={var_name: f"DataFrame con {len(duplicados)} filas"}
+        )
+        
+    except Exception as e:
+        return error_result(f"Error buscando duplicados: {str(e)}")
+
+
+def _transferir_lote(context: FlowContext, operacion: str, origen: Any, carpeta_destino: str,
+                     carpeta_origen: str, si_existe: str, hilos: int, verificar: str,
+                     variable_destino: str) -> Dict[str, Any]:
+    """
+    Lógica común de copiar/mover en lote.
+    """
+    etiqueta = "copiando" if operacion == "copiar" else "moviendo"
+    try:
+        error = validate_required_params({'origen': origen, 'carpeta_destino': carpeta_destino},
+                                       ['origen', 'carpeta_destino'])
+        if error:
+            return error_result(error)
+        
+        pares = [(ruta, os.path.join(carpeta_destino, relativa))
+                 for ruta, relativa in _resolver_origenes(context, origen, carpeta_origen)]
+        if not pares:
+            return success_result("No hay archivos para transferir")
+        
+        reporte = transferir_archivos(pares, operacion, si_existe,
+                                      max_workers=int(hilos) if hilos else None,
+                                      verificar=parse_bool(verificar))
+        
+        fallidos = [r for r in reporte if r['estado'] == 'error']
+        saltados = sum(1 for r in reporte if r['estado'] == 'saltado')
+        total_bytes = sum(r['bytes'] for r in reporte)
+        
+        var_name = variable_destino or f"reporte_{operacion}"
+        context.set_variable(var_name, pd.DataFrame(reporte))
+        
+        mensaje = (f"{len(reporte) - len(fallidos) - saltados} archivos transferidos "
+                   f"({total_bytes} bytes), {saltados} saltados, {len(fallidos)} con error")
+        if fallidos and len(fallidos) == len(reporte):
+            return error_result(f"Error {etiqueta} archivos: {fallidos[0]['error']}")
+        
+        return success_result(mensaje, variables={var_name: f"DataFrame con {len(reporte)} filas"})
+        
+    except Exception as e:
+        return error_result(f"Error {etiqueta} archivos: {str(e)}")
+
+
+def _resolver_origenes(context: FlowContext, origen: Any, carpeta_origen: str = "") -> List[Tuple[str, str]]:
+    """
+    Normaliza el origen a una lista de (ruta_completa, ruta_relativa_destino).
+    
+    Acepta el nombre de una variable o su valor ya resuelto (lista de rutas o
+    nombres, o DataFrame con columna 'ruta') o un patrón tipo 'C:\\dir\\*.pdf'.
+    """
+    if isinstance(origen, str) and context.has_variable(origen):
+        origen = context.get_variable(origen)
+    
+    if isinstance(origen, pd.DataFrame):
+        if 'ruta' not in origen.columns:
+            raise ValueError("La tabla de origen debe tener una columna 'ruta'")
+        relativas = origen['relativa'] if 'relativa' in origen.columns else origen['ruta'].map(os.path.basename)
+        return list(zip(origen['ruta'], relativas))
+    
+    if isinstance(origen, (list, tuple)):
+        pares = []
+        for item in origen:
+            item = str(item)
+            if os.path.isabs(item) or not carpeta_origen:
+                pares.append((item, os.path.basename(item)))
+            else:
+                pares.append((os.path.join(carpeta_origen, item), item))
+        return pares
+    
+    # Patrón: carpeta + comodines en el nombre
+    carpeta, patron = os.path.split(str(origen))
+    return [(registro["ruta"], registro["nombre"])
+            for registro in carpeta_escanear(carpeta or ".", patron or "*", con_metadatos=False)]
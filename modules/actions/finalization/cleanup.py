@@ -6,7 +6,6 @@ Acciones de finalización y limpieza.
 from typing import Dict, Any
 from modules.core import action, FlowContext
 from modules.actions.base import success_result, error_result
-from modules.utils.web_automation import cerrar_navegador
 
 
 @action(
@@ -18,12 +17,11 @@ from modules.utils.web_automation import cerrar_navegador
 )
 def cerrar_navegador_action(context: FlowContext) -> Dict[str, Any]:
     """
-    Cierra el navegador actual.
+    Cierra el navegador actual (o lo devuelve al pool si era prestado).
     """
     try:
         driver = context.get_driver()
         if driver:
-            cerrar_navegador(driver)
             context.clear_driver()
             return success_result("Navegador cerrado")
         else:
@@ -45,10 +43,7 @@ def finalizar_todo_action(context: FlowContext) -> Dict[str, Any]:
     """
     try:
         # Cerrar navegador si existe
-        driver = context.get_driver()
-        if driver:
-            cerrar_navegador(driver)
-            context.clear_driver()
+        context.clear_all_drivers()
         
         # Limpiar variables (opcional)
         variables_count = len(context.variables)
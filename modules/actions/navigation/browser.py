@@ -3,10 +3,26 @@
 Acciones de navegación web.
 """
 
-from typing import Dict, Any
+import re
+from typing import Dict, Any, List
+import pandas as pd
 from modules.core import action, FlowContext
-from modules.actions.base import success_result, error_result, validate_required_params
-from modules.utils.web_automation import abrir_pagina_web, cambiar_pagina_web, maximizar_navegador
+from modules.actions.base import success_result, error_result, validate_required_params, parse_bool
+from modules.utils.web_automation import crear_driver, cambiar_pagina_web, esperar_pagina, maximizar_navegador, \
+    obtener_pool, configurar_navegadores, perfil_defecto, PerfilNavegador, BLOQUEOS, ESPERAS, ESPERA_TIMEOUT, \
+    navegar_urls
+
+
+PERFIL_SCHEMA = [
+    {'key': 'sin_ventana', 'label': 'Sin ventana (headless)', 'type': 'select', 'required': False, 'options': ['predeterminado', 'sí', 'no'], 'default': 'predeterminado'},
+    {'key': 'bloquear', 'label': 'Bloquear recursos', 'type': 'text', 'required': False, 'placeholder': ', '.join(BLOQUEOS) + ', *.pdf'}
+]
+
+ESPERA_SCHEMA = [
+    {'key': 'espera', 'label': 'Esperar a', 'type': 'select', 'required': False, 'options': list(ESPERAS), 'default': 'documento'},
+    {'key': 'selector', 'label': 'Selector CSS (espera por selector)', 'type': 'text', 'required': False, 'placeholder': '#resultados table'},
+    {'key': 'timeout', 'label': 'Tiempo máximo (s)', 'type': 'number', 'required': False, 'placeholder': '15', 'default': 15}
+]
 
 
 @action(
@@ -14,28 +30,40 @@ from modules.utils.web_automation import abrir_pagina_web, cambiar_pagina_web, m
     name='Abrir página web',
     description='Abre una página web en el navegador.',
     schema=[
-        {'key': 'url', 'label': 'URL', 'type': 'text', 'required': True, 'placeholder': 'https://example.com'}
-    ],
+        {'key': 'url', 'label': 'URL', 'type': 'text', 'required': True, 'placeholder': 'https://example.com'},
+        {'key': 'reutilizar_sesion', 'label': 'Reutilizar sesión del pool', 'type': 'select', 'required': False, 'options': ['sí', 'no'], 'default': 'sí'}
+    ] + PERFIL_SCHEMA + ESPERA_SCHEMA,
     provides='driver'
 )
-def abrir_pagina_action(context: FlowContext, url: str) -> Dict[str, Any]:
+def abrir_pagina_action(context: FlowContext, url: str, reutilizar_sesion: str = "sí",
+                        sin_ventana: str = "predeterminado", bloquear: str = "", espera: str = "documento",
+                        selector: str = "", timeout: float = ESPERA_TIMEOUT) -> Dict[str, Any]:
     """
     Abre una página web y almacena el driver.
+    
+    Por defecto toma una sesión ya iniciada del pool de navegadores; al
+    cerrar el navegador (o terminar el flujo) la sesión vuelve al pool.
+    En lugar de una pausa fija se espera la condición elegida. Sin ventana
+    y con recursos bloqueados la carga es bastante más liviana.
     """
     try:
         error = validate_required_params({'url': url}, ['url'])
         if error:
             return error_result(error)
         
-        # Usar la función consolidada de utilidades
-        driver = abrir_pagina_web(url)
+        perfil = _perfil(sin_ventana, bloquear)
         
-        if driver:
-            # Guardar el driver en el contexto
-            context.set_driver(driver)
-            return success_result(f"Página abierta: {url}")
+        if parse_bool(reutilizar_sesion):
+            driver = context.borrow_driver(obtener_pool(perfil))
         else:
-            return error_result("No se pudo abrir la página")
+            # Sesión dedicada: se crea y se cierra con el flujo. La anterior
+            # se devuelve al pool (o se cierra) antes de reemplazarla.
+            context.clear_driver('driver')
+            driver = crear_driver(perfil)
+            context.set_driver('driver', driver)
+        
+        segundos = cambiar_pagina_web(driver, url, espera, selector or None, float(timeout or ESPERA_TIMEOUT))
+        return success_result(f"Página abierta: {url} (espera {segundos:.2f}s)")
         
     except Exception as e:
         return error_result(f"Error abriendo página: {str(e)}")
@@ -47,9 +75,10 @@ def abrir_pagina_action(context: FlowContext, url: str) -> Dict[str, Any]:
     description='Navega a una URL diferente en el navegador actual.',
     schema=[
         {'key': 'url', 'label': 'URL', 'type': 'text', 'required': True, 'placeholder': 'https://example.com'}
-    ]
+    ] + ESPERA_SCHEMA
 )
-def cambiar_pagina_action(context: FlowContext, url: str) -> Dict[str, Any]:
+def cambiar_pagina_action(context: FlowContext, url: str, espera: str = "documento", selector: str = "",
+                          timeout: float = ESPERA_TIMEOUT) -> Dict[str, Any]:
     """
     Cambia la página en el navegador actual.
     """
@@ -62,13 +91,127 @@ def cambiar_pagina_action(context: FlowContext, url: str) -> Dict[str, Any]:
         if not driver:
             return error_result("No hay navegador abierto. Usar 'Abrir página web' primero.")
         
-        cambiar_pagina_web(driver, url)
-        return success_result(f"Navegado a: {url}")
+        segundos = cambiar_pagina_web(driver, url, espera, selector or None, float(timeout or ESPERA_TIMEOUT))
+        return success_result(f"Navegado a: {url} (espera {segundos:.2f}s)")
         
     except Exception as e:
         return error_result(f"Error cambiando página: {str(e)}")
 
 
+@action(
+    category='navegacion',
+    name='Esperar página',
+    description='Espera a que la página actual esté lista, aparezca un elemento o la red quede en reposo.',
+    schema=ESPERA_SCHEMA
+)
+def esperar_pagina_action(context: FlowContext, espera: str = "selector", selector: str = "",
+                          timeout: float = ESPERA_TIMEOUT) -> Dict[str, Any]:
+    """
+    Espera una condición sobre la página actual sin navegar.
+    """
+    try:
+        driver = context.get_driver()
+        if not driver:
+            return error_result("No hay navegador abierto. Usar 'Abrir página web' primero.")
+        
+        segundos = esperar_pagina(driver, espera, selector or None, float(timeout or ESPERA_TIMEOUT))
+        return success_result(f"Condición '{espera}' cumplida en {segundos:.2f}s")
+        
+    except Exception as e:
+        return error_result(f"Error esperando página: {str(e)}")
+
+
+@action(
+    category='navegacion',
+    name='Navegar varias URLs en paralelo',
+    description='Visita una lista de URLs con varias sesiones a la vez y junta los resultados en una tabla.',
+    schema=[
+        {'key': 'urls', 'label': 'URLs (variable o lista)', 'type': 'textarea', 'required': True, 'placeholder': 'lista_urls  o  https://a.com, https://b.com'},
+        {'key': 'columna', 'label': 'Columna de URLs (si es tabla)', 'type': 'text', 'required': False, 'placeholder': 'url'},
+        {'key': 'campos', 'label': 'Campos a extraer (nombre=selector CSS)', 'type': 'textarea', 'required': False, 'placeholder': 'precio=.price, nombre=h1'},
+        {'key': 'sesiones', 'label': 'Sesiones simultáneas', 'type': 'number', 'required': False, 'placeholder': 'auto'}
+    ] + PERFIL_SCHEMA + ESPERA_SCHEMA + [
+        {'key': 'variable_destino', 'label': 'Variable destino', 'type': 'text', 'required': False, 'placeholder': 'resultados_web'}
+    ]
+)
+def navegar_urls_action(context: FlowContext, urls: Any, columna: str = "", campos: str = "", sesiones: int = None,
+                        sin_ventana: str = "predeterminado", bloquear: str = "", espera: str = "documento",
+                        selector: str = "", timeout: float = ESPERA_TIMEOUT,
+                        variable_destino: str = "") -> Dict[str, Any]:
+    """
+    Navega muchas URLs repartidas entre sesiones del pool.
+    
+    Las sesiones simultáneas se limitan según núcleos y memoria libre. El
+    resultado es un DataFrame en el orden de entrada con url, estado
+    (ok/error/timeout), segundos, titulo, url_final, error y los campos.
+    """
+    try:
+        lista = _resolver_urls(context, urls, columna)
+        if not lista:
+            return error_result("No hay URLs para navegar")
+        
+        resultados = navegar_urls(
+            lista,
+            campos=_parse_campos(campos),
+            sesiones=int(sesiones) if sesiones not in (None, "") else None,
+            perfil=_perfil(sin_ventana, bloquear),
+            espera=espera,
+            selector=selector or None,
+            timeout=float(timeout or ESPERA_TIMEOUT)
+        )
+        
+        df = pd.DataFrame(resultados)
+        var_name = variable_destino or "resultados_web"
+        context.set_variable(var_name, df)
+        
+        fallidas = int((df['estado'] != 'ok').sum())
+        if fallidas == len(df):
+            return error_result(f"Ninguna URL pudo navegarse: {df['error'].iloc[0]}")
+        
+        return success_result(
+            f"{len(df) - fallidas} de {len(df)} URLs navegadas ({fallidas} con error o timeout)",
+            variables={var_name: f"DataFrame con {len(df)} filas"}
+        )
+        
+    except Exception as e:
+        return error_result(f"Error navegando URLs: {str(e)}")
+
+
+def _resolver_urls(context: FlowContext, urls: Any, columna: str = "") -> List[str]:
+    """
+    Acepta el nombre de una variable, una lista, un DataFrame/Serie o texto
+    con URLs separadas por coma, punto y coma o saltos de línea.
+    """
+    if isinstance(urls, str) and context.has_variable(urls.strip()):
+        urls = context.get_variable(urls.strip())
+    
+    if isinstance(urls, pd.DataFrame):
+        if not columna:
+            columna = 'url' if 'url' in urls.columns else urls.columns[0]
+        if columna not in urls.columns:
+            raise ValueError(f"Columna '{columna}' no encontrada")
+        urls = urls[columna]
+    if isinstance(urls, pd.Series):
+        urls = urls.dropna().tolist()
+    if isinstance(urls, str):
+        urls = re.split(r'[\n,;]+', urls)
+    
+    return [str(u).strip() for u in (urls or []) if str(u).strip()]
+
+
+def _parse_campos(campos: str) -> Dict[str, str]:
+    """
+    Convierte 'precio=.price, nombre=h1' en {'precio': '.price', 'nombre': 'h1'}.
+    """
+    resultado = {}
+    for parte in re.split(r'[\n,]+', str(campos or '')):
+        if '=' in parte:
+            nombre, sel = parte.split('=', 1)
+            if nombre.strip() and sel.strip():
+                resultado[nombre.strip()] = sel.strip()
+    return resultado
+
+
 @action(
     category='navegacion',
     name='Maximizar navegador',
@@ -89,3 +232,60 @@ def maximizar_navegador_action(context: FlowContext) -> Dict[str, Any]:
         
     except Exception as e:
         return error_result(f"Error maximizando navegador: {str(e)}")
+
+
+@action(
+    category='navegacion',
+    name='Configurar navegadores',
+    description='Ajusta el pool de sesiones y el modo por defecto (sin ventana, recursos bloqueados).',
+    schema=[
+        {'key': 'sesiones', 'label': 'Sesiones en el pool', 'type': 'number', 'required': False, 'placeholder': '2', 'default': 2},
+        {'key': 'max_usos', 'label': 'Reciclar tras N usos', 'type': 'number', 'required': False, 'placeholder': '50', 'default': 50},
+        {'key': 'max_memoria_mb', 'label': 'Reciclar si el heap JS supera (MB)', 'type': 'number', 'required': False, 'placeholder': '0 = sin límite'}
+    ] + PERFIL_SCHEMA
+)
+def configurar_navegadores_action(context: FlowContext, sesiones: int = 2, max_usos: int = 50,
+                                  max_memoria_mb: int = None, sin_ventana: str = "predeterminado",
+                                  bloquear: str = "") -> Dict[str, Any]:
+    """
+    Configura los límites del pool y el perfil por defecto de los navegadores.
+    """
+    try:
+        perfil = _perfil(sin_ventana, bloquear)
+        configurar_navegadores(
+            tamano=int(sesiones) if sesiones not in (None, "") else None,
+            max_usos=int(max_usos) if max_usos not in (None, "") else None,
+            max_memoria_mb=int(max_memoria_mb) if max_memoria_mb not in (None, "") else None,
+            perfil=perfil
+        )
+        estado = obtener_pool().estado()
+        modo = "sin ventana" if perfil.sin_ventana else "con ventana"
+        bloqueos = ", ".join(perfil.bloquear) or "nada"
+        return success_result(
+            f"Navegadores: {estado['tamano']} sesiones, {modo}, bloqueando {bloqueos}"
+        )
+        
+    except Exception as e:
+        return error_result(f"Error configurando navegadores: {str(e)}")
+
+
+def _perfil(sin_ventana: str, bloquear: str) -> PerfilNavegador:
+    """
+    Perfil del paso; lo no indicado se toma del perfil por defecto.
+    
+    'ninguno' en bloquear desactiva los bloqueos por defecto.
+    """
+    base = perfil_defecto()
+    if sin_ventana in (None, "", "predeterminado"):
+        headless = base.sin_ventana
+    else:
+        headless = parse_bool(sin_ventana)
+    
+    if bloquear:
+        items = [b.strip().lower() if b.strip().lower() in BLOQUEOS else b.strip()
+                 for b in str(bloquear).split(',')]
+        bloqueos = tuple(b for b in items if b and b != 'ninguno')
+    else:
+        bloqueos = base.bloquear
+    
+    return PerfilNavegador(headless, bloqueos)
@@ -0,0 +1,67 @@
+# modules/actions/navigation/extraction.py
+"""
+Acciones de extracción de datos desde páginas web.
+"""
+
+import time
+from typing import Dict, Any
+import pandas as pd
+from modules.core import action, FlowContext
+from modules.actions.base import success_result, error_result, validate_required_params
+from modules.actions.navigation.browser import _parse_campos
+from modules.utils.web_automation import ESPERA_TIMEOUT
+from modules.utils.web_dom import extraer_paginas
+
+
+@action(
+    category='navegacion',
+    name='Extraer datos de la página',
+    description='Extrae una tabla o elementos repetidos en una sola llamada, opcionalmente recorriendo páginas.',
+    schema=[
+        {'key': 'selector', 'label': 'Selector CSS', 'type': 'text', 'required': True, 'placeholder': 'table#resultados  o  .producto'},
+        {'key': 'modo', 'label': 'Tipo', 'type': 'select', 'required': False, 'options': ['tabla', 'elementos'], 'default': 'tabla'},
+        {'key': 'campos', 'label': 'Campos por elemento (nombre=subselector, @atributo)', 'type': 'textarea', 'required': False, 'placeholder': 'nombre=h2, precio=.price, enlace=a@href'},
+        {'key': 'siguiente', 'label': 'Selector del botón "siguiente" (opcional)', 'type': 'text', 'required': False, 'placeholder': 'a.next'},
+        {'key': 'max_paginas', 'label': 'Máximo de páginas', 'type': 'number', 'required': False, 'placeholder': '1', 'default': 1},
+        {'key': 'timeout', 'label': 'Tiempo máximo por página (s)', 'type': 'number', 'required': False, 'placeholder': '15', 'default': 15},
+        {'key': 'variable_destino', 'label': 'Variable destino', 'type': 'text', 'required': False, 'placeholder': 'datos_web'}
+    ]
+)
+def extraer_datos_web_action(context: FlowContext, selector: str, modo: str = "tabla", campos: str = "",
+                             siguiente: str = "", max_paginas: int = 1, timeout: float = ESPERA_TIMEOUT,
+                             variable_destino: str = "") -> Dict[str, Any]:
+    """
+    Extrae datos del DOM como DataFrame.
+
+    Cada página se lee con un único execute_script que devuelve JSON, en
+    lugar de una llamada a WebDriver por celda.
+    """
+    try:
+        error = validate_required_params({'selector': selector}, ['selector'])
+        if error:
+            return error_result(error)
+
+        driver = context.get_driver()
+        if not driver:
+            return error_result("No hay navegador abierto. Usar 'Abrir página web' primero.")
+
+        t0 = time.perf_counter()
+        registros, paginas = extraer_paginas(
+            driver, selector, modo or "tabla", _parse_campos(campos),
+            siguiente=siguiente or None,
+            max_paginas=max(1, int(max_paginas or 1)),
+            timeout=float(timeout or ESPERA_TIMEOUT)
+        )
+        segundos = time.perf_counter() - t0
+
+        df = pd.DataFrame(registros)
+        var_name = variable_destino or "datos_web"
+        context.set_variable(var_name, df)
+
+        return success_result(
+            f"Extraídas {len(df)} filas de {paginas} página(s) en {segundos:.2f}s",
+            variables={var_name: f"DataFrame con {len(df)} filas"}
+        )
+
+    except Exception as e:
+        return error_result(f"Error extrayendo datos: {str(e)}")
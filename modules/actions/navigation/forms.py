@@ -0,0 +1,86 @@
+# modules/actions/navigation/forms.py
+"""
+Acciones de carga de formularios web.
+"""
+
+import time
+from typing import Dict, Any
+import pandas as pd
+from modules.core import action, FlowContext
+from modules.actions.base import success_result, error_result, validate_required_params
+from modules.actions.navigation.browser import _parse_campos, ESPERA_SCHEMA
+from modules.utils.web_automation import ESPERA_TIMEOUT
+from modules.utils.web_dom import llenar_formularios
+
+
+@action(
+    category='navegacion',
+    name='Llenar formularios desde tabla',
+    description='Carga cada fila de una tabla en un formulario web con un solo script por fila y la envía.',
+    schema=[
+        {'key': 'variable', 'label': 'Variable con datos', 'type': 'text', 'required': True, 'placeholder': 'datos_excel'},
+        {'key': 'mapeo', 'label': 'Columnas → campos (columna=selector)', 'type': 'textarea', 'required': False, 'placeholder': 'nombre=#nombre, monto=input[name="monto"]  (vacío: [name="columna"])'},
+        {'key': 'enviar', 'label': 'Selector del botón enviar', 'type': 'text', 'required': False, 'placeholder': 'button[type="submit"]'},
+        {'key': 'url_formulario', 'label': 'URL del formulario (se abre antes de cada fila)', 'type': 'text', 'required': False}
+    ] + ESPERA_SCHEMA + [
+        {'key': 'variable_destino', 'label': 'Variable con el reporte', 'type': 'text', 'required': False, 'placeholder': 'reporte_formularios'}
+    ]
+)
+def llenar_formularios_action(context: FlowContext, variable: str, mapeo: str = "", enviar: str = "",
+                              url_formulario: str = "", espera: str = "documento", selector: str = "",
+                              timeout: float = ESPERA_TIMEOUT, variable_destino: str = "") -> Dict[str, Any]:
+    """
+    Llena un formulario por cada fila de un DataFrame.
+
+    Todos los campos de una fila se completan en un único execute_script
+    (con eventos input/change); luego se envía y se espera la condición de
+    finalización. El reporte tiene estado y tiempo por fila.
+    """
+    try:
+        error = validate_required_params({'variable': variable}, ['variable'])
+        if error:
+            return error_result(error)
+
+        driver = context.get_driver()
+        if not driver:
+            return error_result("No hay navegador abierto. Usar 'Abrir página web' primero.")
+
+        if not context.has_variable(variable):
+            return error_result(f"Variable '{variable}' no encontrada")
+        datos = context.get_variable(variable)
+        if isinstance(datos, dict):
+            datos = pd.DataFrame([datos])
+        if not isinstance(datos, pd.DataFrame):
+            return error_result(f"La variable '{variable}' debe contener una tabla")
+
+        campos = _parse_campos(mapeo) or {col: f'[name="{col}"]' for col in datos.columns}
+        faltantes = [col for col in campos if col not in datos.columns]
+        if faltantes:
+            return error_result(f"Columnas no encontradas: {', '.join(faltantes)}")
+
+        t0 = time.perf_counter()
+        reporte = llenar_formularios(
+            driver, datos.to_dict(orient='records'), campos,
+            enviar=enviar or None,
+            url_formulario=url_formulario or None,
+            espera=espera,
+            selector_espera=selector or None,
+            timeout=float(timeout or ESPERA_TIMEOUT)
+        )
+        segundos = time.perf_counter() - t0
+
+        df = pd.DataFrame(reporte)
+        var_name = variable_destino or "reporte_formularios"
+        context.set_variable(var_name, df)
+
+        fallidas = int((df['estado'] != 'ok').sum()) if len(df) else 0
+        if len(df) and fallidas == len(df):
+            return error_result(f"Ninguna fila se pudo cargar: {df['error'].iloc[0]}")
+
+        return success_result(
+            f"{len(df) - fallidas} de {len(df)} filas cargadas en {segundos:.2f}s ({fallidas} con error)",
+            variables={var_name: f"DataFrame con {len(df)} filas"}
+        )
+
+    except Exception as e:
+        return error_result(f"Error llenando formularios: {str(e)}")
@@ -0,0 +1,311 @@
+# modules/actions/navigation/http.py
+"""
+Acciones HTTP directas (sin navegador): descargas y llamadas a APIs.
+"""
+
+import json
+import re
+import time
+from typing import Dict, Any, List, Optional
+from urllib.parse import quote
+import pandas as pd
+from modules.core import action, FlowContext
+from modules.actions.base import success_result, error_result, validate_required_params, parse_bool
+from modules.actions.navigation.browser import _resolver_urls
+from modules.utils.http_client import ClienteHTTP, SesionNavegador, descargar_varios, solicitar, \
+    solicitar_varias, json_a_dataframe
+
+METODOS = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE']
+
+
+def _cliente(context: FlowContext) -> ClienteHTTP:
+    """Cliente con pool keep-alive compartido por los pasos del flujo."""
+    return context.get_or_create_resource('http', ClienteHTTP)
+
+
+def _parse_pares(texto: Any, separador: str) -> Dict[str, Any]:
+    """
+    Acepta un dict, un objeto JSON o líneas 'clave<separador>valor'
+    ('=' para parámetros, ':' para cabeceras).
+    """
+    if isinstance(texto, dict):
+        return dict(texto)
+    texto = str(texto or '').strip()
+    if not texto:
+        return {}
+    if texto.startswith('{'):
+        return json.loads(texto)
+    resultado = {}
+    for linea in re.split(r'[\n&]+' if separador == '=' else r'\n+', texto):
+        if separador in linea:
+            clave, valor = linea.split(separador, 1)
+            if clave.strip():
+                resultado[clave.strip()] = valor.strip()
+    return resultado
+
+
+def _sesion(context: FlowContext, usar_sesion: str) -> Optional[SesionNavegador]:
+    """Cookies y cabeceras del navegador abierto, si se pidió usarlas."""
+    if not parse_bool(usar_sesion):
+        return None
+    driver = context.get_driver()
+    return SesionNavegador(driver) if driver else None
+
+
+def _cabeceras(sesion: Optional[SesionNavegador], cabeceras: Dict[str, str], url: str) -> Dict[str, str]:
+    """
+    Cabeceras del usuario sobre las del navegador. Las cookies se eligen
+    por URL: cada host recibe solo las de su dominio.
+    """
+    resultado: Dict[str, str] = sesion.cabeceras_para(url) if sesion else {}
+    resultado.update(cabeceras)
+    return resultado
+
+
+def _resolver_cuerpo(context: FlowContext, cuerpo: Any) -> Any:
+    """Nombre de variable, objeto JSON en texto o texto plano."""
+    if isinstance(cuerpo, str):
+        texto = cuerpo.strip()
+        if not texto:
+            return None
+        if context.has_variable(texto):
+            cuerpo = context.get_variable(texto)
+        elif texto[:1] in ('{', '['):
+            return json.loads(texto)
+        else:
+            return texto
+    if isinstance(cuerpo, pd.DataFrame):
+        return json.loads(cuerpo.to_json(orient='records', date_format='iso'))
+    return cuerpo
+
+
+def _rellenar_plantilla(plantilla: str, fila: Dict[str, Any]) -> str:
+    """Reemplaza {columna} por el valor de la fila, codificado para URL."""
+    def valor(coincidencia: Any) -> str:
+        nombre = coincidencia.group(1)
+        if nombre not in fila:
+            raise KeyError(f"Columna '{nombre}' no encontrada")
+        return quote(str(fila[nombre]), safe='')
+    return re.sub(r'\{([^{}]+)\}', valor, plantilla)
+
+
+def _guardar_respuesta(context: FlowContext, var_name: str, datos: Any, ruta_datos: str,
+                       como_tabla: bool) -> str:
+    """Guarda la respuesta como DataFrame si es JSON (y se pidió tabla), si no tal cual."""
+    if como_tabla and isinstance(datos, (dict, list)):
+        df = json_a_dataframe(datos, ruta_datos or None)
+        context.set_variable(var_name, df)
+        return f"DataFrame con {len(df)} filas"
+    context.set_variable(var_name, datos)
+    return type(datos).__name__
+
+
+@action(
+    category='navegacion',
+    name='Descargar archivos',
+    description='Descarga URLs directamente por HTTP, usando las cookies del navegador abierto si se desea.',
+    schema=[
+        {'key': 'urls', 'label': 'URLs (variable o lista)', 'type': 'textarea', 'required': True, 'placeholder': 'links_reportes  o  https://a.com/r.pdf'},
+        {'key': 'columna', 'label': 'Columna de URLs (si es tabla)', 'type': 'text', 'required': False, 'placeholder': 'url'},
+        {'key': 'carpeta_destino', 'label': 'Carpeta destino', 'type': 'text', 'required': True, 'placeholder': 'C:\\descargas'},
+        {'key': 'usar_sesion', 'label': 'Usar sesión del navegador (cookies)', 'type': 'select', 'required': False, 'options': ['sí', 'no'], 'default': 'sí'},
+        {'key': 'hilos', 'label': 'Descargas simultáneas', 'type': 'number', 'required': False, 'placeholder': '4', 'default': 4},
+        {'key': 'reanudar', 'label': 'Reanudar descargas parciales', 'type': 'select', 'required': False, 'options': ['sí', 'no'], 'default': 'sí'},
+        {'key': 'variable_destino', 'label': 'Variable con el reporte', 'type': 'text', 'required': False, 'placeholder': 'reporte_descargas'}
+    ]
+)
+def descargar_archivos_action(context: FlowContext, urls: Any, carpeta_destino: str, columna: str = "",
+                              usar_sesion: str = "sí", hilos: int = 4, reanudar: str = "sí",
+                              variable_destino: str = "") -> Dict[str, Any]:
+    """
+    Descarga archivos sin pasar por el gestor de descargas del navegador.
+    
+    Con usar_sesion se copian las cookies y el User-Agent del driver activo,
+    así se accede a reportes que requieren login. Las descargas se escriben
+    en streaming y un .part existente se completa con Range.
+    """
+    try:
+        error = validate_required_params({'urls': urls, 'carpeta_destino': carpeta_destino},
+                                         ['urls', 'carpeta_destino'])
+        if error:
+            return error_result(error)
+        
+        lista = _resolver_urls(context, urls, columna)
+        if not lista:
+            return error_result("No hay URLs para descargar")
+        
+        sesion = None
+        if parse_bool(usar_sesion):
+            driver = context.get_driver()
+            if driver:
+                sesion = SesionNavegador(driver)
+        
+        reporte = descargar_varios(_cliente(context), lista, carpeta_destino, sesion=sesion,
+                                   max_workers=int(hilos or 4), reanudar=parse_bool(reanudar))
+        
+        df = pd.DataFrame(reporte)
+        var_name = variable_destino or "reporte_descargas"
+        context.set_variable(var_name, df)
+        
+        fallidas = int((df['estado'] != 'ok').sum())
+        if fallidas == len(df):
+            return error_result(f"No se pudo descargar ningún archivo: {df['error'].iloc[0]}")
+        
+        return success_result(
+            f"{len(df) - fallidas} de {len(df)} archivos descargados ({int(df['bytes'].sum())} bytes)",
+            variables={var_name: f"DataFrame con {len(df)} filas"}
+        )
+        
+    except Exception as e:
+        return error_result(f"Error descargando archivos: {str(e)}")
+
+
+@action(
+    category='navegacion',
+    name='Petición HTTP',
+    description='Llama a una API REST (GET/POST/...) sin navegador; las respuestas JSON quedan como tabla.',
+    schema=[
+        {'key': 'url', 'label': 'URL', 'type': 'text', 'required': True, 'placeholder': 'https://api.interna/clientes'},
+        {'key': 'metodo', 'label': 'Método', 'type': 'select', 'required': False, 'options': METODOS, 'default': 'GET'},
+        {'key': 'parametros', 'label': 'Parámetros de consulta (clave=valor)', 'type': 'textarea', 'required': False, 'placeholder': 'pagina=1\nestado=activo'},
+        {'key': 'cuerpo', 'label': 'Cuerpo (JSON, texto o variable)', 'type': 'textarea', 'required': False, 'placeholder': '{"nombre": "Ana"}'},
+        {'key': 'cabeceras', 'label': 'Cabeceras (Nombre: valor)', 'type': 'textarea', 'required': False, 'placeholder': 'Authorization: Bearer ...'},
+        {'key': 'usar_sesion', 'label': 'Usar sesión del navegador (cookies)', 'type': 'select', 'required': False, 'options': ['sí', 'no'], 'default': 'no'},
+        {'key': 'ruta_datos', 'label': 'Ruta de los datos en el JSON', 'type': 'text', 'required': False, 'placeholder': 'data.items'},
+        {'key': 'como_tabla', 'label': 'Convertir JSON a tabla', 'type': 'select', 'required': False, 'options': ['sí', 'no'], 'default': 'sí'},
+        {'key': 'variable_destino', 'label': 'Variable destino', 'type': 'text', 'required': False, 'placeholder': 'respuesta_api'}
+    ]
+)
+def peticion_http_action(context: FlowContext, url: str, metodo: str = "GET", parametros: str = "",
+                         cuerpo: Any = "", cabeceras: str = "", usar_sesion: str = "no", ruta_datos: str = "",
+                         como_tabla: str = "sí", variable_destino: str = "") -> Dict[str, Any]:
+    """
+    Hace una petición HTTP con el pool keep-alive del flujo.
+    
+    Los fallos transitorios se reintentan con espera exponencial antes de
+    informar error: conexión y 429 en cualquier método; lectura y 502-504
+    solo en métodos idempotentes (un POST no se envía dos veces).
+    """
+    try:
+        error = validate_required_params({'url': url}, ['url'])
+        if error:
+            return error_result(error)
+        
+        registro = solicitar(_cliente(context), metodo, url.strip(),
+                             parametros=_parse_pares(parametros, '='),
+                             cuerpo=_resolver_cuerpo(context, cuerpo),
+                             cabeceras=_cabeceras(_sesion(context, usar_sesion), _parse_pares(cabeceras, ':'), url))
+        if registro['estado'] != 'ok':
+            return error_result(f"Petición {registro['metodo']} fallida: {registro['error']}")
+        
+        var_name = variable_destino or "respuesta_api"
+        descripcion = _guardar_respuesta(context, var_name, registro['datos'], ruta_datos, parse_bool(como_tabla))
+        
+        return success_result(
+            f"{registro['metodo']} {registro['status']} en {registro['segundos']:.2f}s",
+            variables={var_name: descripcion}
+        )
+        
+    except Exception as e:
+        return error_result(f"Error en la petición HTTP: {str(e)}")
+
+
+def _filas_entrada(context: FlowContext, datos: Any) -> Optional[List[Dict[str, Any]]]:
+    """Filas de una variable tabla/lista de dicts, o None si son URLs sueltas."""
+    if isinstance(datos, str) and context.has_variable(datos.strip()):
+        datos = context.get_variable(datos.strip())
+    if isinstance(datos, pd.DataFrame):
+        return json.loads(datos.to_json(orient='records', date_format='iso'))
+    if isinstance(datos, list) and datos and all(isinstance(d, dict) for d in datos):
+        return datos
+    return None
+
+
+@action(
+    category='navegacion',
+    name='Peticiones HTTP en lote',
+    description='Hace una petición por URL o por fila de una tabla, con varias en paralelo, y junta las respuestas.',
+    schema=[
+        {'key': 'datos', 'label': 'URLs o tabla (variable o lista)', 'type': 'textarea', 'required': True, 'placeholder': 'clientes  o  https://api/a, https://api/b'},
+        {'key': 'url', 'label': 'URL con {columna} (si es tabla)', 'type': 'text', 'required': False, 'placeholder': 'https://api.interna/clientes/{id}'},
+        {'key': 'columna', 'label': 'Columna de URLs (si no hay plantilla)', 'type': 'text', 'required': False, 'placeholder': 'url'},
+        {'key': 'metodo', 'label': 'Método', 'type': 'select', 'required': False, 'options': METODOS, 'default': 'GET'},
+        {'key': 'columnas_cuerpo', 'label': 'Columnas a enviar como cuerpo JSON', 'type': 'text', 'required': False, 'placeholder': 'nombre, email  (vacío = ninguna; * = todas)'},
+        {'key': 'cabeceras', 'label': 'Cabeceras (Nombre: valor)', 'type': 'textarea', 'required': False, 'placeholder': 'Authorization: Bearer ...'},
+        {'key': 'usar_sesion', 'label': 'Usar sesión del navegador (cookies)', 'type': 'select', 'required': False, 'options': ['sí', 'no'], 'default': 'no'},
+        {'key': 'hilos', 'label': 'Peticiones simultáneas', 'type': 'number', 'required': False, 'placeholder': '8', 'default': 8},
+        {'key': 'ruta_datos', 'label': 'Ruta de los datos en el JSON', 'type': 'text', 'required': False, 'placeholder': 'data.items'},
+        {'key': 'variable_destino', 'label': 'Variable destino', 'type': 'text', 'required': False, 'placeholder': 'respuestas_api'}
+    ]
+)
+def peticiones_http_lote_action(context: FlowContext, datos: Any, url: str = "", columna: str = "",
+                                metodo: str = "GET", columnas_cuerpo: str = "", cabeceras: str = "",
+                                usar_sesion: str = "no", hilos: int = 8, ruta_datos: str = "",
+                                variable_destino: str = "") -> Dict[str, Any]:
+    """
+    Peticiones por lote sobre el mismo pool de conexiones.
+    
+    Las respuestas JSON se aplanan y se concatenan en una tabla con la
+    columna '_fila' (posición de la entrada, desde 1). El estado de cada
+    petición queda en '<variable>_reporte'.
+    """
+    try:
+        error = validate_required_params({'datos': datos}, ['datos'])
+        if error:
+            return error_result(error)
+        
+        filas = _filas_entrada(context, datos) if url else None
+        if url and filas is None:
+            return error_result("La plantilla de URL requiere una tabla de entrada")
+        if filas is not None:
+            urls = [_rellenar_plantilla(url.strip(), fila) for fila in filas]
+        else:
+            urls = _resolver_urls(context, datos, columna)
+            filas = [{} for _ in urls]
+        if not urls:
+            return error_result("No hay peticiones para hacer")
+        
+        seleccion = [c.strip() for c in (columnas_cuerpo or '').split(',') if c.strip()]
+        sesion = _sesion(context, usar_sesion)
+        propias = _parse_pares(cabeceras, ':')
+        peticiones = []
+        for destino, fila in zip(urls, filas):
+            cuerpo = None
+            if seleccion == ['*']:
+                cuerpo = fila
+            elif seleccion:
+                cuerpo = {c: fila.get(c) for c in seleccion}
+            peticiones.append({'metodo': metodo, 'url': destino, 'cuerpo': cuerpo,
+                               'cabeceras': _cabeceras(sesion, propias, destino)})
+        
+        t0 = time.perf_counter()
+        registros = solicitar_varias(_cliente(context), peticiones, max_workers=int(hilos or 8))
+        
+        segundos = time.perf_counter() - t0
+        
+        partes = []
+        for numero, registro in enumerate(registros, start=1):
+            if registro['estado'] == 'ok' and isinstance(registro['datos'], (dict, list)):
+                parte = json_a_dataframe(registro['datos'], ruta_datos or None)
+                parte.insert(0, '_fila', numero)
+                partes.append(parte)
+        df = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(columns=['_fila'])
+        reporte = pd.DataFrame(registros).drop(columns=['datos'])
+        reporte.insert(0, 'fila', range(1, len(reporte) + 1))
+        
+        var_name = variable_destino or "respuestas_api"
+        context.set_variable(var_name, df)
+        context.set_variable(f"{var_name}_reporte", reporte)
+        
+        fallidas = int((reporte['estado'] != 'ok').sum())
+        if fallidas == len(reporte):
+            return error_result(f"Fallaron todas las peticiones: {reporte['error'].iloc[0]}")
+        
+        return success_result(
+            f"{len(reporte) - fallidas} de {len(reporte)} peticiones correctas en {segundos:.2f}s",
+            variables={var_name: f"DataFrame con {len(df)} filas",
+                       f"{var_name}_reporte": f"DataFrame con {len(reporte)} filas"}
+        )
+        
+    except Exception as e:
+        return error_result(f"Error en las peticiones HTTP: {str(e)}")
@@ -4,11 +4,10 @@ Configuración y gestión de navegadores para modo aplicación de escritorio.
 Soporta Chrome y Edge con fallback controlado.
 """
 
-import os
-import shutil
 import subprocess
 from eel import browsers
 from typing import Dict, Optional, List, Tuple
+from modules.utils.web_automation import detectar_navegadores
 
 
 class BrowserConfig:
@@ -22,37 +21,10 @@ class BrowserConfig:
     
     def _detect_browsers(self) -> None:
         """Detecta navegadores disponibles en el sistema."""
-        # Rutas comunes de instalación
-        pf = os.environ.get('ProgramFiles', r"C:\Program Files")
-        pf86 = os.environ.get('ProgramFiles(x86)', r"C:\Program Files (x86)")
-        lad = os.environ.get('LOCALAPPDATA', os.path.expanduser(r"~\AppData\Local"))
-        
-        # Chrome
-        chrome_paths = [
-            os.path.join(pf, r"Google\Chrome\Application\chrome.exe"),
-            os.path.join(pf86, r"Google\Chrome\Application\chrome.exe"),
-            os.path.join(lad, r"Google\Chrome\Application\chrome.exe"),
-            shutil.which("chrome"),
-            shutil.which("chrome.exe"),
-        ]
-        
-        chrome = next((p for p in chrome_paths if p and os.path.exists(p)), None)
-        if chrome:
-            self.detected_browsers["chrome"] = chrome
-            print(f"[BROWSER] Chrome detectado: {chrome}")
-        
-        # Edge
-        edge_paths = [
-            os.path.join(pf, r"Microsoft\Edge\Application\msedge.exe"),
-            os.path.join(pf86, r"Microsoft\Edge\Application\msedge.exe"),
-            shutil.which("msedge"),
-            shutil.which("msedge.exe"),
-        ]
-        
-        edge = next((p for p in edge_paths if p and os.path.exists(p)), None)
-        if edge:
-            self.detected_browsers["edge"] = edge
-            print(f"[BROWSER] Edge detectado: {edge}")
+        # Misma detección que usa Selenium para ubicar los binarios
+        self.detected_browsers = detectar_navegadores()
+        for nombre, ruta in self.detected_browsers.items():
+            print(f"[BROWSER] {nombre.capitalize()} detectado: {ruta}")
         
         if not self.detected_browsers:
             print("[BROWSER] No se detectaron navegadores compatibles")
@@ -5,14 +5,20 @@ Maneja el registro automático de acciones, contexto y ejecución.
 """
 
 from .context import FlowContext
+from .cancellation import CancellationToken, FlowCancelled
 from .executor import FlowExecutor
 from .registry import ActionRegistry
+from .runs import RunManager, RunQueueFull
 from .decorators import action, require_context, provide_driver
 
 __all__ = [
     'FlowContext',
+    'CancellationToken',
+    'FlowCancelled',
     'FlowExecutor', 
     'ActionRegistry',
+    'RunManager',
+    'RunQueueFull',
     'action',
     'require_context',
     'provide_driver'
@@ -0,0 +1,137 @@
+# modules/core/cancellation.py
+"""
+Cancelación y pausa cooperativas.
+
+Cada ejecución tiene un CancellationToken (FlowContext.token). El ejecutor
+lo revisa entre pasos y los bucles largos (lecturas y escrituras por
+bloques, copias, descargas, filas) llaman a checkpoint() entre
+iteraciones: en pausa el hilo espera ahí sin perder su estado, y si la
+ejecución fue cancelada se lanza FlowCancelled.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+
+class FlowCancelled(BaseException):
+    """
+    La ejecución fue cancelada.
+
+    Hereda de BaseException (como KeyboardInterrupt) para atravesar los
+    `except Exception` de las acciones y llegar hasta el ejecutor.
+    """
+
+
+class CancellationToken:
+    """
+    Estado de cancelación/pausa compartido por todos los hilos de una ejecución.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._cancelled = False
+        self._paused = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    @property
+    def paused(self) -> bool:
+        return self._paused and not self._cancelled
+
+    def cancel(self) -> None:
+        """Cancela la ejecución; los hilos en pausa se liberan para terminar."""
+        with self._cond:
+            self._cancelled = True
+            self._cond.notify_all()
+
+    def pause(self) -> None:
+        with self._cond:
+            self._paused = True
+            self._cond.notify_all()
+
+    def resume(self) -> None:
+        with self._cond:
+            self._paused = False
+            self._cond.notify_all()
+
+    def check(self) -> None:
+        """
+        Punto de control: espera mientras esté en pausa y lanza
+        FlowCancelled si se canceló.
+        """
+        if not self._paused and not self._cancelled:
+            return
+        with self._cond:
+            while self._paused and not self._cancelled:
+                self._cond.wait()
+            if self._cancelled:
+                raise FlowCancelled("Ejecución cancelada")
+
+    def wait(self, seconds: float) -> None:
+        """
+        Equivalente a time.sleep que despierta al cancelar. El tiempo que la
+        ejecución pasa en pausa no cuenta.
+        """
+        fin = time.monotonic() + seconds
+        with self._cond:
+            while True:
+                if self._cancelled:
+                    raise FlowCancelled("Ejecución cancelada")
+                if self._paused:
+                    inicio_pausa = time.monotonic()
+                    self._cond.wait()
+                    fin += time.monotonic() - inicio_pausa
+                    continue
+                restante = fin - time.monotonic()
+                if restante <= 0:
+                    return
+                self._cond.wait(restante)
+
+
+_local = threading.local()
+
+
+def current_token() -> Optional[CancellationToken]:
+    """Token de la ejecución que corre en este hilo (o None fuera de un flujo)."""
+    return getattr(_local, 'token', None)
+
+
+@contextmanager
+def bind_token(token: Optional[CancellationToken]) -> Iterator[Optional[CancellationToken]]:
+    """Asocia el token al hilo actual mientras dura el bloque."""
+    previous = current_token()
+    _local.token = token
+    try:
+        yield token
+    finally:
+        _local.token = previous
+
+
+def checkpoint(token: Optional[CancellationToken] = None) -> None:
+    """
+    Punto de control para bucles largos de las utilidades; sin token
+    asociado (uso fuera de un flujo) no hace nada.
+    """
+    token = token or current_token()
+    if token is not None:
+        token.check()
+
+
+def propagate_token(func: Callable) -> Callable:
+    """
+    Envuelve `func` para que, ejecutada en un pool de hilos, vea el token
+    del hilo que la envolvió.
+    """
+    token = current_token()
+    if token is None:
+        return func
+
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with bind_token(token):
+            token.check()
+            return func(*args, **kwargs)
+    return wrapper
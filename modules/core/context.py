@@ -4,9 +4,11 @@ Contexto de ejecución para FlowRunner.
 Maneja variables, estado y recursos compartidos durante la ejecución.
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Callable
 import threading
 
+from .cancellation import CancellationToken
+
 
 class FlowContext:
     """
@@ -17,9 +19,14 @@ class FlowContext:
         self.variables: Dict[str, Any] = {}
         self.drivers: Dict[str, Any] = {}
         self.resources: Dict[str, Any] = {}
-        self._lock = threading.Lock()
+        self._borrowed: Dict[str, Any] = {}
+        self.loop_counters: Dict[str, int] = {}
+        self._lock = threading.RLock()
         self.execution_id: Optional[str] = None
         self.current_step: Optional[str] = None
+        # Subflujos en curso (rutas), para rechazar llamadas recursivas
+        self.call_stack: List[str] = []
+        self.token = CancellationToken()
     
     def set_variable(self, name: str, value: Any) -> None:
         """
@@ -52,7 +59,32 @@ class FlowContext:
         with self._lock:
             return self.variables.copy()
     
-    def set_driver(self, driver_type: str, driver: Any) -> None:
+    def restore_variables(self, variables: Dict[str, Any]) -> None:
+        """
+        Reemplaza todas las variables por una copia previa (de list_variables).
+        """
+        with self._lock:
+            self.variables = dict(variables)
+    
+    def child(self) -> 'FlowContext':
+        """
+        Contexto hijo para ejecutar en otro hilo.
+        
+        Parte de una copia de las variables y comparte los recursos (pools,
+        conexiones) y el token de cancelación; los drivers son propios,
+        porque una sesión de navegador no se puede usar desde dos hilos a la vez.
+        """
+        hijo = FlowContext()
+        with self._lock:
+            hijo.variables = dict(self.variables)
+        hijo.resources = self.resources
+        hijo._lock = self._lock
+        hijo.token = self.token
+        hijo.execution_id = self.execution_id
+        hijo.call_stack = list(self.call_stack)
+        return hijo
+    
+    def set_driver(self, driver_type: str = 'driver', driver: Any = None) -> None:
         """
         Establece un driver (navegador, etc.) en el contexto.
         """
@@ -60,20 +92,42 @@ class FlowContext:
             self.drivers[driver_type] = driver
             print(f"[CONTEXT] Driver '{driver_type}' establecido")
     
-    def get_driver(self, driver_type: str) -> Any:
+    def get_driver(self, driver_type: str = 'driver') -> Any:
         """
         Obtiene un driver del contexto.
         """
         with self._lock:
             return self.drivers.get(driver_type)
     
-    def clear_driver(self, driver_type: str) -> None:
+    def borrow_driver(self, pool: Any, driver_type: str = 'driver', timeout: Optional[float] = None) -> Any:
+        """
+        Toma prestada una sesión del pool (si aún no hay una) y la registra.
+        
+        Al limpiar el driver se devuelve al pool en lugar de cerrarse.
+        """
+        with self._lock:
+            driver = self.drivers.get(driver_type)
+            if driver is not None:
+                return driver
+        driver = pool.tomar(timeout)
+        with self._lock:
+            self.drivers[driver_type] = driver
+            self._borrowed[driver_type] = pool
+            print(f"[CONTEXT] Driver '{driver_type}' tomado del pool")
+        return driver
+    
+    def clear_driver(self, driver_type: str = 'driver') -> None:
         """
         Limpia un driver del contexto.
         """
         with self._lock:
             if driver_type in self.drivers:
                 driver = self.drivers.pop(driver_type)
+                pool = self._borrowed.pop(driver_type, None)
+                if pool is not None:
+                    pool.devolver(driver)
+                    print(f"[CONTEXT] Driver '{driver_type}' devuelto al pool")
+                    return
                 # Intentar cerrar el driver si tiene método close/quit
                 if hasattr(driver, 'quit'):
                     try:
@@ -109,13 +163,38 @@ class FlowContext:
         with self._lock:
             return self.resources.get(name, default)
     
+    def get_or_create_resource(self, name: str, factory: Callable[[], Any]) -> Any:
+        """
+        Obtiene un recurso compartido o lo crea una única vez con `factory`.
+        """
+        with self._lock:
+            if name not in self.resources:
+                self.resources[name] = factory()
+                print(f"[CONTEXT] Recurso '{name}' creado")
+            return self.resources[name]
+    
+    def close_resources(self) -> None:
+        """
+        Cierra los recursos que lo permitan (conexiones, pools) y los descarta.
+        """
+        with self._lock:
+            resources = list(self.resources.items())
+            self.resources.clear()
+        for name, resource in resources:
+            if hasattr(resource, 'close'):
+                try:
+                    resource.close()
+                    print(f"[CONTEXT] Recurso '{name}' cerrado")
+                except Exception as e:
+                    print(f"[CONTEXT] Error cerrando recurso '{name}': {e}")
+    
     def cleanup(self) -> None:
         """
         Limpia todos los recursos del contexto.
         """
         print("[CONTEXT] Iniciando limpieza del contexto")
         self.clear_all_drivers()
+        self.close_resources()
         with self._lock:
             self.variables.clear()
-            self.resources.clear()
         print("[CONTEXT] Contexto limpiado")
@@ -11,7 +11,8 @@ from .registry import ActionRegistry
 def action(category: str, name: str, description: str = "", 
           schema: List[Dict] = None, 
           provides: Optional[str] = None,
-          clear_driver: bool = False):
+          clear_driver: bool = False,
+          branches: bool = False):
     """
     Decorador para registrar automáticamente una acción.
     
@@ -22,6 +23,7 @@ def action(category: str, name: str, description: str = "",
         schema: Esquema de parámetros para el frontend
         provides: Si retorna un recurso a mantener (ej: 'driver')
         clear_driver: Si debe limpiar el driver después
+        branches: Si devuelve una 'rama' a seguir (condiciones y bucles)
     """
     def decorator(func: Callable):
         # Registro automático
@@ -33,7 +35,8 @@ def action(category: str, name: str, description: str = "",
             schema=schema or [],
             callable_func=func,
             provides=provides,
-            clear_driver=clear_driver
+            clear_driver=clear_driver,
+            branches=branches
         )
         
         return func
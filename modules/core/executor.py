@@ -4,11 +4,192 @@ Motor de ejecución mejorado para FlowRunner.
 Maneja la ejecución de flujos con el nuevo sistema de registro.
 """
 
+import os
 import json
+import heapq
 import inspect
-from typing import Dict, Any, List, Callable, Optional
+import functools
+import threading
+from typing import Dict, Any, List, Callable, Optional, Tuple
 from .context import FlowContext
+from .cancellation import CancellationToken, FlowCancelled, bind_token
 from .registry import ActionRegistry, ActionSpec
+from .expressions import resolver_valor as resolve_value
+
+
+# Conexiones por defecto de cada rama: puerto derecho (E) para verdadero /
+# cuerpo del bucle y puerto inferior (S) para falso / salida del bucle.
+# Una conexión con campo 'rama' explícito tiene prioridad.
+BRANCH_PORTS = {'verdadero': 'E', 'cuerpo': 'E', 'falso': 'S', 'salida': 'S'}
+
+# Tope de seguridad ante ciclos sin condición de salida
+MAX_STEP_EXECUTIONS = 100000
+
+
+# Flujos compilados por ruta: (mtime_ns, tamaño) -> pasos ordenados
+_flow_cache: Dict[str, Tuple[Tuple[int, int], List[Dict[str, Any]]]] = {}
+_flow_cache_lock = threading.Lock()
+
+
+def _endpoint(value: Any) -> Tuple[Optional[str], Optional[str]]:
+    """Extremo de una conexión: {'step', 'port'} o solo el id del paso."""
+    if isinstance(value, dict):
+        return value.get('step'), value.get('port')
+    return value, None
+
+
+@functools.lru_cache(maxsize=None)
+def _signature(func: Callable) -> inspect.Signature:
+    return inspect.signature(func)
+
+
+_expression_keys_cache: Dict[str, frozenset] = {}
+
+
+def _expression_keys(action_spec: ActionSpec) -> frozenset:
+    """Propiedades marcadas 'expresion' en el schema: llegan sin resolver."""
+    keys = _expression_keys_cache.get(action_spec.id)
+    if keys is None:
+        keys = frozenset(f['key'] for f in action_spec.schema if f.get('expresion'))
+        _expression_keys_cache[action_spec.id] = keys
+    return keys
+
+
+class CompiledFlow:
+    """
+    Grafo de pasos listo para ejecutar.
+    
+    Las conexiones que vuelven a un paso anterior (detectadas con DFS) son
+    retornos de bucle; sin ellas el grafo es acíclico y se calcula un orden
+    topológico estable (a igualdad, por id del paso). Los pasos sin
+    conexiones de entrada son los puntos de inicio; un flujo sin conexiones
+    se ejecuta en orden de id, como antes.
+    """
+    
+    def __init__(self, steps: List[Dict[str, Any]], edges: List[Dict[str, Any]]):
+        ordered = sorted(steps, key=lambda x: x.get('id', ''))
+        self.steps: Dict[str, Dict[str, Any]] = {s['id']: s for s in ordered}
+        self._bodies: Dict[Tuple[str, str], 'CompiledFlow'] = {}
+        self.plans: Dict[str, Any] = {}
+        self.outgoing: Dict[str, List[Dict[str, Any]]] = {step_id: [] for step_id in self.steps}
+        for edge in edges or []:
+            source, port = _endpoint(edge.get('from'))
+            target, _ = _endpoint(edge.get('to'))
+            if source in self.steps and target in self.steps:
+                self.outgoing[source].append({
+                    'to': target,
+                    'port': port,
+                    'rama': edge.get('rama'),
+                })
+        
+        self.back_edges = back_edges = self._find_back_edges()
+        indegree = {step_id: 0 for step_id in self.steps}
+        for source, targets in self.outgoing.items():
+            for edge in targets:
+                if (source, edge['to']) not in back_edges:
+                    indegree[edge['to']] += 1
+        self.starts = [step_id for step_id in self.steps if indegree[step_id] == 0]
+        
+        # Kahn con desempate por posición en el orden por id
+        position = {step_id: i for i, step_id in enumerate(self.steps)}
+        heap = [(position[s], s) for s in self.starts]
+        heapq.heapify(heap)
+        self.rank: Dict[str, int] = {}
+        while heap:
+            _, step_id = heapq.heappop(heap)
+            self.rank[step_id] = len(self.rank)
+            for edge in self.outgoing[step_id]:
+                if (step_id, edge['to']) in back_edges:
+                    continue
+                indegree[edge['to']] -= 1
+                if indegree[edge['to']] == 0:
+                    heapq.heappush(heap, (position[edge['to']], edge['to']))
+    
+    def _find_back_edges(self) -> set:
+        """
+        Conexiones hacia un paso que está en la pila del DFS (ciclos).
+        
+        El recorrido parte de los pasos sin conexiones de entrada: así el
+        retorno detectado es el que vuelve a la cabecera del bucle, no la
+        entrada al cuerpo aunque el id del cuerpo ordene antes. Un ciclo sin
+        entrada (un bucle al inicio del flujo) se recorre desde su cabecera:
+        el paso de control o el que emite conexiones con 'rama'. Si el ciclo
+        no tiene cabecera, el flujo se rechaza.
+        """
+        targets = {e['to'] for edges in self.outgoing.values() for e in edges}
+        back, state = set(), {}
+        
+        def visit(root: str) -> None:
+            state[root] = 'open'
+            stack = [(root, iter(self.outgoing[root]))]
+            while stack:
+                node, pending = stack[-1]
+                edge = next(pending, None)
+                if edge is None:
+                    state[node] = 'done'
+                    stack.pop()
+                    continue
+                target = edge['to']
+                if state.get(target) == 'open':
+                    back.add((node, target))
+                elif target not in state:
+                    state[target] = 'open'
+                    stack.append((target, iter(self.outgoing[target])))
+        
+        for root in self.steps:
+            if root not in targets:
+                visit(root)
+        for root in self.steps:
+            if root not in state and self._is_header(root):
+                visit(root)
+        loose = [s for s in self.steps if s not in state]
+        if loose:
+            raise ValueError(
+                f"Ciclo sin paso de control ({', '.join(loose)}): conectar el retorno a un "
+                f"'Repetir mientras' o 'Para cada fila', o agregar un paso de inicio"
+            )
+        return back
+    
+    def _is_header(self, step_id: str) -> bool:
+        """Paso de control (devuelve 'rama') o con conexiones de rama explícita."""
+        spec = ActionRegistry.get_action(self.steps[step_id].get('type'))
+        return bool(spec and spec.branches) or any(e['rama'] for e in self.outgoing[step_id])
+    
+    def next_steps(self, step_id: str, branch: Optional[str] = None) -> List[str]:
+        """Destinos a seguir tras un paso, filtrados por rama si la hay."""
+        edges = self.outgoing.get(step_id, [])
+        if branch is None:
+            return [e['to'] for e in edges]
+        port = BRANCH_PORTS.get(branch)
+        return [e['to'] for e in edges
+                if e['rama'] == branch or (e['rama'] is None and port is not None and e['port'] == port)]
+    
+    def body(self, step_id: str, branch: str = 'cuerpo') -> 'CompiledFlow':
+        """
+        Subgrafo que cuelga de una rama de `step_id` hasta volver a él
+        (el cuerpo de un bucle). Se calcula una vez y queda cacheado.
+        """
+        key = (step_id, branch)
+        if key not in self._bodies:
+            members, pending = set(), list(self.next_steps(step_id, branch))
+            while pending:
+                node = pending.pop()
+                if node == step_id or node in members:
+                    continue
+                members.add(node)
+                pending.extend(e['to'] for e in self.outgoing[node])
+            edges = [{'from': {'step': source, 'port': e['port']}, 'to': {'step': e['to']}, 'rama': e['rama']}
+                     for source in members for e in self.outgoing[source] if e['to'] in members]
+            self._bodies[key] = CompiledFlow([self.steps[m] for m in members], edges)
+        return self._bodies[key]
+    
+    def is_chain(self) -> bool:
+        """Un único camino sin bifurcaciones ni ciclos."""
+        return len(self.starts) <= 1 and not self.back_edges and \
+            all(len(edges) <= 1 for edges in self.outgoing.values())
+    
+    def __len__(self) -> int:
+        return len(self.steps)
 
 
 class FlowExecutor:
@@ -20,7 +201,6 @@ class FlowExecutor:
         self.context = FlowContext()
         self.notifier = notifier or (lambda x: None)
         self.is_running = False
-        self.should_stop = False
     
     def execute_flow(self, flow: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -34,51 +214,34 @@ class FlowExecutor:
         """
         try:
             self.is_running = True
-            self.should_stop = False
             
             # Auto-descubrir acciones si no se ha hecho
             ActionRegistry.auto_discover_actions()
             
             steps = flow.get('steps', [])
-            edges = flow.get('edges', [])
-            
             if not steps:
                 return {"ok": False, "error": "No hay pasos en el flujo"}
             
-            # Ordenar pasos según edges (topological sort)
-            ordered_steps = self._sort_steps_by_edges(steps, edges)
+            compiled = self.compile_flow(flow)
             
-            print(f"[EXECUTOR] Iniciando flujo con {len(ordered_steps)} pasos")
+            print(f"[EXECUTOR] Iniciando flujo con {len(compiled)} pasos")
             
-            # Ejecutar cada paso
-            for i, step in enumerate(ordered_steps):
-                if self.should_stop:
-                    break
-                    
-                self.context.current_step = step.get('id', f'step_{i}')
-                
-                # Notificar progreso
-                self._notify_progress(step['id'], f"Ejecutando: {step.get('type', 'unknown')}")
-                
-                # Ejecutar el paso
-                result = self._execute_step(step)
-                
-                if not result.get('ok', False):
-                    error_msg = result.get('error', 'Error desconocido')
-                    self._notify_progress(step['id'], f"Error: {error_msg}", "error")
-                    return result
-                
-                # Mostrar variables si hay preview
-                if result.get('variables'):
-                    self._notify_progress(step['id'], "Completado", "success", 
-                                        {"variables": result.get('variables')})
+            result = self.run_steps(compiled)
+            if not result.get('ok', False):
+                return result
             
             return {
                 "ok": True, 
                 "variables": list(self.context.list_variables().keys()),
-                "message": f"Flujo completado exitosamente ({len(ordered_steps)} pasos)"
+                "message": f"Flujo completado exitosamente ({len(compiled)} pasos)"
             }
             
+        except FlowCancelled:
+            print("[EXECUTOR] Ejecución cancelada")
+            if self.context.current_step:
+                self._notify_progress(self.context.current_step, "Cancelado", "error")
+            return {"ok": False, "cancelled": True, "error": "Ejecución cancelada por el usuario"}
+            
         except Exception as e:
             error_msg = f"Error ejecutando flujo: {str(e)}"
             print(f"[EXECUTOR] {error_msg}")
@@ -87,11 +250,119 @@ class FlowExecutor:
         finally:
             self.is_running = False
             self.context.cleanup()
+            # Un stop() previo al inicio sí cancela; el token se renueva al terminar
+            self.context.token = CancellationToken()
+    
+    def compile_flow(self, flow: Dict[str, Any]) -> 'CompiledFlow':
+        """
+        Valida las acciones y arma el grafo de ejecución.
+        
+        Acepta 'type', 'defId' (formato exportado por el editor) o 'typeId'
+        (el que envía el botón Ejecutar).
+        """
+        steps = []
+        for i, step in enumerate(flow.get('steps', [])):
+            step_type = step.get('type') or step.get('defId') or step.get('typeId')
+            if not ActionRegistry.get_action(step_type):
+                raise ValueError(f"Acción no encontrada: {step_type} (paso {step.get('id')})")
+            steps.append(dict(step, type=step_type, id=step.get('id') or f'step_{i}'))
+        return CompiledFlow(steps, flow.get('edges', []))
+    
+    def load_flow(self, path: str) -> 'CompiledFlow':
+        """
+        Lee y compila un flujo exportado, reutilizando la versión cacheada
+        mientras el archivo no cambie.
+        """
+        path = os.path.abspath(path)
+        info = os.stat(path)
+        key = (info.st_mtime_ns, info.st_size)
+        with _flow_cache_lock:
+            cached = _flow_cache.get(path)
+            if cached and cached[0] == key:
+                return cached[1]
+        
+        with open(path, 'r', encoding='utf-8') as f:
+            flow = json.load(f)
+        ActionRegistry.auto_discover_actions()
+        compiled = self.compile_flow(flow)
+        with _flow_cache_lock:
+            _flow_cache[path] = (key, compiled)
+        print(f"[EXECUTOR] Flujo compilado: {path} ({len(compiled)} pasos)")
+        return compiled
     
-    def _execute_step(self, step: Dict[str, Any]) -> Dict[str, Any]:
+    def run_steps(self, flow: 'CompiledFlow', notify: bool = True,
+                  context: Optional[FlowContext] = None) -> Dict[str, Any]:
+        """
+        Recorre el grafo compilado sobre el contexto actual (o `context`,
+        que usan las ejecuciones por fila en paralelo).
+        
+        Los pasos listos se ejecutan en orden topológico. Tras cada paso se
+        siguen todas sus conexiones de salida o, si el resultado trae
+        'rama', solo las de esa rama; así una condición elige camino y un
+        bucle vuelve a su paso de control por la conexión de retorno.
+        Se detiene en el primer error y lo devuelve. Sin notify no se
+        informa progreso por paso (lo usan los subflujos, cuyo avance se
+        muestra en el paso que los invoca).
+        
+        Antes de cada paso se revisa el token de cancelación: en pausa se
+        espera ahí y si se canceló se lanza FlowCancelled, que atraviesa
+        subflujos y bucles hasta execute_flow.
+        """
+        context = context or self.context
+        with bind_token(context.token):
+            return self._run_graph(flow, notify, context)
+    
+    def _run_graph(self, flow: 'CompiledFlow', notify: bool, context: FlowContext) -> Dict[str, Any]:
+        ready = [(flow.rank[step_id], step_id) for step_id in flow.starts]
+        heapq.heapify(ready)
+        queued = set(flow.starts)
+        executed = 0
+        
+        while ready:
+            context.token.check()
+            _, step_id = heapq.heappop(ready)
+            queued.discard(step_id)
+            step = flow.steps[step_id]
+            
+            executed += 1
+            if executed > MAX_STEP_EXECUTIONS:
+                return {"ok": False, "error": f"Se superaron {MAX_STEP_EXECUTIONS} pasos ejecutados; "
+                                              f"revisar ciclos sin condición de salida"}
+            
+            previous_step = context.current_step
+            context.current_step = step_id
+            
+            if notify:
+                self._notify_progress(step_id, f"Ejecutando: {step.get('type', 'unknown')}")
+            
+            result = self._execute_step(step, context, flow)
+            if not notify:
+                context.current_step = previous_step
+            
+            if not result.get('ok', False):
+                if notify:
+                    error_msg = result.get('error', 'Error desconocido')
+                    self._notify_progress(step_id, f"Error: {error_msg}", "error")
+                return result
+            
+            # Mostrar variables si hay preview
+            if notify and result.get('variables'):
+                self._notify_progress(step_id, "Completado", "success", 
+                                    {"variables": result.get('variables')})
+            
+            for target in flow.next_steps(step_id, result.get('rama')):
+                if target not in queued:
+                    heapq.heappush(ready, (flow.rank[target], target))
+                    queued.add(target)
+        
+        return {"ok": True}
+    
+    def _execute_step(self, step: Dict[str, Any], context: Optional[FlowContext] = None,
+                      flow: Optional['CompiledFlow'] = None) -> Dict[str, Any]:
         """
         Ejecuta un paso individual.
         """
+        context = context or self.context
         step_type = step.get('type')
         if not step_type:
             return {"ok": False, "error": "Paso sin tipo definido"}
@@ -104,47 +375,56 @@ class FlowExecutor:
         try:
             # Preparar parámetros
             props = step.get('props', {})
-            params = self._prepare_parameters(action_spec, props)
+            params = self._prepare_parameters(action_spec, props, context, flow)
             
             # Ejecutar la función
             result = action_spec.callable_func(**params)
             
             # Procesar resultado
-            return self._process_step_result(result, action_spec)
+            return self._process_step_result(result, action_spec, context)
             
         except Exception as e:
             error_msg = f"Error en paso {step_type}: {str(e)}"
             print(f"[EXECUTOR] {error_msg}")
             return {"ok": False, "error": error_msg}
     
-    def _prepare_parameters(self, action_spec: ActionSpec, props: Dict[str, Any]) -> Dict[str, Any]:
+    def _prepare_parameters(self, action_spec: ActionSpec, props: Dict[str, Any],
+                            context: FlowContext, flow: Optional['CompiledFlow'] = None) -> Dict[str, Any]:
         """
         Prepara los parámetros para llamar a la función.
         """
         params = {}
         
         # Obtener la signatura de la función
-        sig = inspect.signature(action_spec.callable_func)
+        sig = _signature(action_spec.callable_func)
+        raw_keys = _expression_keys(action_spec)
         
         for param_name, param in sig.parameters.items():
             # Inyección automática del contexto
             if param_name == 'context' or param_name == 'contexto':
-                params[param_name] = self.context
+                params[param_name] = context
+                continue
+            
+            # Inyección del ejecutor y del grafo en curso (subflujos, bucles por fila)
+            if param_name == 'executor':
+                params[param_name] = self
+                continue
+            if param_name == 'flow':
+                params[param_name] = flow
                 continue
             
             # Inyección automática de drivers
-            if param_name == 'driver' and 'driver' in self.context.drivers:
-                params[param_name] = self.context.get_driver('driver')
+            if param_name == 'driver' and 'driver' in context.drivers:
+                params[param_name] = context.get_driver('driver')
                 continue
             
             # Mapear desde props
             if param_name in props and props[param_name] != '':
                 value = props[param_name]
                 
-                # Resolver variables si es necesario
-                if isinstance(value, str) and value.startswith('$'):
-                    var_name = value[1:]  # remover $
-                    value = self.context.get_variable(var_name, value)
+                # Resolver $variable / ${ruta}; las expresiones las evalúa la acción
+                if param_name not in raw_keys:
+                    value = resolve_value(value, context.variables)
                 
                 params[param_name] = value
             elif param.default is not inspect.Parameter.empty:
@@ -156,17 +436,19 @@ class FlowExecutor:
         
         return params
     
-    def _process_step_result(self, result: Any, action_spec: ActionSpec) -> Dict[str, Any]:
+    def _process_step_result(self, result: Any, action_spec: ActionSpec,
+                             context: FlowContext) -> Dict[str, Any]:
         """
         Procesa el resultado de un paso.
         """
-        # Si la función devuelve un driver, guardarlo
-        if action_spec.provides and result:
-            self.context.set_driver(action_spec.provides, result)
+        # Si la función devuelve un driver, guardarlo (las acciones que devuelven
+        # un resultado estándar ya lo registraron en el contexto)
+        if action_spec.provides and result and not (isinstance(result, dict) and 'ok' in result):
+            context.set_driver(action_spec.provides, result)
         
         # Si debe limpiar driver después
         if action_spec.clear_driver:
-            self.context.clear_all_drivers()
+            context.clear_all_drivers()
         
         # Formatear resultado
         if isinstance(result, dict) and 'ok' in result:
@@ -175,14 +457,6 @@ class FlowExecutor:
         # Resultado simple, convertir a formato estándar
         return {"ok": True, "result": result}
     
-    def _sort_steps_by_edges(self, steps: List[Dict], edges: List[Dict]) -> List[Dict]:
-        """
-        Ordena los pasos según las conexiones (edges).
-        """
-        # Por ahora usar ordenamiento simple por ID
-        # TODO: Implementar topological sort real
-        return sorted(steps, key=lambda x: x.get('id', ''))
-    
     def _notify_progress(self, step_id: str, message: str, 
                         level: str = "info", preview: Dict = None) -> None:
         """
@@ -199,8 +473,26 @@ class FlowExecutor:
         
         self.notifier(payload)
     
+    @property
+    def should_stop(self) -> bool:
+        return self.context.token.cancelled
+    
     def stop(self) -> None:
         """
-        Detiene la ejecución del flujo.
+        Cancela la ejecución: el paso en curso se interrumpe en su próximo
+        punto de control y los navegadores se cierran en la limpieza.
+        """
+        self.context.token.cancel()
+    
+    def pause(self) -> None:
+        """
+        Pausa la ejecución en el próximo punto de control (entre pasos,
+        filas o bloques); variables, navegadores y recursos se conservan.
+        """
+        self.context.token.pause()
+    
+    def resume(self) -> None:
+        """
+        Reanuda una ejecución pausada.
         """
-        self.should_stop = True
+        self.context.token.resume()
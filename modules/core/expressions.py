@@ -0,0 +1,292 @@
+# modules/core/expressions.py
+"""
+Expresiones seguras sobre las variables del flujo.
+
+Una expresión como `$total > 1000 and ${fila.estado} == "ok"` se traduce a
+Python, se valida nodo por nodo contra una lista blanca y se compila una
+sola vez; cada evaluación solo busca las variables y ejecuta el código ya
+compilado.
+"""
+
+import ast
+import functools
+import re
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+
+_TOKENS = re.compile(
+    r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')'   # literal de texto
+    r'|\$\{([^}]+)\}'                              # ${ruta.con.puntos}
+    r'|\$([A-Za-z_]\w*)'                           # $nombre
+    r'|\b(y|o|no)\b'                               # operadores en español
+)
+
+_OPERADORES = {'y': 'and', 'o': 'or', 'no': 'not'}
+
+_VARIABLE_SOLA = re.compile(r'^\$([A-Za-z_]\w*)$')
+_RUTA_SOLA = re.compile(r'^\$\{([^}]+)\}$')
+_RUTA_EN_TEXTO = re.compile(r'\$\{([^}]+)\}')
+
+
+def _vacio(valor: Any) -> bool:
+    """None, NaN, texto vacío o colección/tabla sin elementos."""
+    if valor is None:
+        return True
+    if isinstance(valor, float) and valor != valor:
+        return True
+    if isinstance(valor, str):
+        return not valor.strip()
+    if hasattr(valor, 'empty'):
+        return bool(valor.empty)
+    try:
+        return len(valor) == 0
+    except TypeError:
+        return False
+
+
+FUNCIONES: Dict[str, Callable] = {
+    'len': len, 'abs': abs, 'min': min, 'max': max, 'round': round, 'sum': sum,
+    'int': int, 'float': float, 'str': str, 'bool': bool, 'vacio': _vacio,
+}
+
+CONSTANTES: Dict[str, Any] = {
+    'true': True, 'false': False, 'verdadero': True, 'falso': False, 'null': None, 'nulo': None,
+}
+
+_NODOS_PERMITIDOS = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn, ast.Is, ast.IsNot,
+    ast.IfExp, ast.Constant, ast.Name, ast.Load, ast.List, ast.Tuple, ast.Subscript, ast.Slice, ast.Call,
+)
+
+
+class ExpresionInvalida(ValueError):
+    """La expresión no se puede interpretar o usa algo no permitido."""
+
+
+def resolver_ruta(variables: Mapping[str, Any], ruta: str) -> Any:
+    """
+    Valor de 'fila.importe' → variables['fila']['importe'].
+
+    Cada tramo se busca como clave (dict, fila o tabla), índice de lista o
+    atributo público. Lanza KeyError si algún tramo no existe.
+    """
+    partes = [p.strip() for p in ruta.split('.')]
+    if partes[0] not in variables:
+        raise KeyError(partes[0])
+    valor = variables[partes[0]]
+    for parte in partes[1:]:
+        if isinstance(valor, (list, tuple)) and parte.lstrip('-').isdigit():
+            valor = valor[int(parte)]
+        elif hasattr(valor, 'keys') and parte in valor.keys():
+            valor = valor[parte]
+        elif not parte.startswith('_') and hasattr(valor, parte):
+            valor = getattr(valor, parte)
+        else:
+            raise KeyError(ruta)
+    return valor
+
+
+class Expresion:
+    """Expresión compilada; `evaluar` recibe el diccionario de variables."""
+
+    def __init__(self, texto: str, codigo: Any, rutas: List[Tuple[str, str]],
+                 funciones: Optional[Dict[str, Callable]] = None):
+        self.texto = texto
+        self._codigo = codigo
+        self._rutas = rutas
+        self._funciones = FUNCIONES if funciones is None else funciones
+
+    def evaluar(self, variables: Mapping[str, Any]) -> Any:
+        entorno = dict(CONSTANTES)
+        entorno.update(self._funciones)
+        for nombre, ruta in self._rutas:
+            try:
+                entorno[nombre] = resolver_ruta(variables, ruta)
+            except (KeyError, IndexError):
+                raise NameError(f"Variable no definida: ${{{ruta}}}" if '.' in ruta else f"Variable no definida: ${ruta}")
+        return eval(self._codigo, {'__builtins__': {}}, entorno)
+
+    def __repr__(self) -> str:
+        return f"Expresion({self.texto!r})"
+
+
+def _traducir(texto: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """Reemplaza $nombre/${ruta} por nombres internos y y/o/no por and/or/not."""
+    rutas: Dict[str, str] = {}
+
+    def reemplazo(m: Any) -> str:
+        if m.group(1):
+            return m.group(1)
+        if m.group(4):
+            return _OPERADORES[m.group(4)]
+        ruta = (m.group(2) or m.group(3)).strip()
+        if ruta not in rutas:
+            rutas[ruta] = f"__v{len(rutas)}"
+        return rutas[ruta]
+
+    fuente = _TOKENS.sub(reemplazo, texto)
+    return fuente, [(nombre, ruta) for ruta, nombre in rutas.items()]
+
+
+def _validar(arbol: ast.AST, nombres: set) -> None:
+    for nodo in ast.walk(arbol):
+        if not isinstance(nodo, _NODOS_PERMITIDOS):
+            raise ExpresionInvalida(f"Elemento no permitido: {type(nodo).__name__}")
+        if isinstance(nodo, ast.Name) and nodo.id not in nombres:
+            raise ExpresionInvalida(f"Nombre desconocido: {nodo.id} (las variables se escriben $nombre)")
+        if isinstance(nodo, ast.Call):
+            if not isinstance(nodo.func, ast.Name) or nodo.func.id not in FUNCIONES or nodo.keywords:
+                raise ExpresionInvalida("Solo se pueden llamar funciones: " + ", ".join(FUNCIONES))
+
+
+@functools.lru_cache(maxsize=1024)
+def compilar(texto: str) -> Expresion:
+    """
+    Compila una expresión (cacheado por texto: cada paso se analiza una vez).
+
+    Admite comparaciones, and/or/not (o y/o/no), aritmética, `in`, listas,
+    índices y las funciones de FUNCIONES.
+    """
+    texto = str(texto or '').strip()
+    if not texto:
+        raise ExpresionInvalida("Expresión vacía")
+    fuente, rutas = _traducir(texto)
+    try:
+        arbol = ast.parse(fuente, mode='eval')
+    except SyntaxError as e:
+        raise ExpresionInvalida(f"Expresión inválida '{texto}': {e.msg}")
+    _validar(arbol, {n for n, _ in rutas} | set(FUNCIONES) | set(CONSTANTES))
+    return Expresion(texto, compile(arbol, '<expresion>', 'eval'), rutas)
+
+
+# ---- versión por columnas ----
+
+def _v_y(*valores: Any) -> Any:
+    resultado = valores[0]
+    for valor in valores[1:]:
+        resultado = np.logical_and(resultado, valor)
+    return resultado
+
+
+def _v_o(*valores: Any) -> Any:
+    resultado = valores[0]
+    for valor in valores[1:]:
+        resultado = np.logical_or(resultado, valor)
+    return resultado
+
+
+def _v_en(valor: Any, coleccion: Any) -> Any:
+    return valor.isin(list(coleccion)) if hasattr(valor, 'isin') else valor in coleccion
+
+
+def _v_si(condicion: Any, si: Any, no: Any) -> Any:
+    if np.ndim(condicion) == 0:
+        return si if condicion else no
+    return np.where(condicion, si, no)
+
+
+FUNCIONES_VECTORIALES: Dict[str, Callable] = {
+    'abs': abs, 'round': round,
+    '__y': _v_y, '__o': _v_o, '__no': np.logical_not, '__en': _v_en, '__si': _v_si,
+}
+
+_COMPARACIONES_VECTORIALES = (ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn)
+
+
+class _AVectorial(ast.NodeTransformer):
+    """
+    Reescribe and/or/not, comparaciones encadenadas, `in` y el operador
+    ternario con funciones que operan elemento a elemento.
+    """
+
+    def _llamada(self, nombre: str, argumentos: List[ast.AST]) -> ast.Call:
+        return ast.Call(func=ast.Name(id=nombre, ctx=ast.Load()), args=argumentos, keywords=[])
+
+    def visit_BoolOp(self, nodo: ast.BoolOp) -> ast.AST:
+        self.generic_visit(nodo)
+        return self._llamada('__y' if isinstance(nodo.op, ast.And) else '__o', nodo.values)
+
+    def visit_UnaryOp(self, nodo: ast.UnaryOp) -> ast.AST:
+        self.generic_visit(nodo)
+        return self._llamada('__no', [nodo.operand]) if isinstance(nodo.op, ast.Not) else nodo
+
+    def visit_IfExp(self, nodo: ast.IfExp) -> ast.AST:
+        self.generic_visit(nodo)
+        return self._llamada('__si', [nodo.test, nodo.body, nodo.orelse])
+
+    def visit_Compare(self, nodo: ast.Compare) -> ast.AST:
+        self.generic_visit(nodo)
+        partes, izquierda = [], nodo.left
+        for operador, derecha in zip(nodo.ops, nodo.comparators):
+            if not isinstance(operador, _COMPARACIONES_VECTORIALES):
+                raise ExpresionInvalida("Comparación no vectorizable")
+            if isinstance(operador, (ast.In, ast.NotIn)):
+                parte = self._llamada('__en', [izquierda, derecha])
+                if isinstance(operador, ast.NotIn):
+                    parte = self._llamada('__no', [parte])
+            else:
+                parte = ast.Compare(left=izquierda, ops=[operador], comparators=[derecha])
+            partes.append(parte)
+            izquierda = derecha
+        return partes[0] if len(partes) == 1 else self._llamada('__y', partes)
+
+
+@functools.lru_cache(maxsize=1024)
+def compilar_vectorial(texto: str) -> Optional[Expresion]:
+    """
+    Variante que evalúa sobre columnas enteras (las variables de tabla se
+    resuelven a Series). Devuelve None si la expresión usa algo que no
+    tiene equivalente por columnas (índices, len, str, vacio, ...).
+    """
+    base = compilar(texto)
+    fuente, rutas = _traducir(base.texto)
+    arbol = ast.parse(fuente, mode='eval')
+    for nodo in ast.walk(arbol):
+        if isinstance(nodo, (ast.Subscript, ast.Slice)):
+            return None
+        if isinstance(nodo, ast.Call) and nodo.func.id not in FUNCIONES_VECTORIALES:
+            return None
+    try:
+        arbol = ast.fix_missing_locations(_AVectorial().visit(arbol))
+    except ExpresionInvalida:
+        return None
+    return Expresion(base.texto, compile(arbol, '<expresion>', 'eval'), rutas, FUNCIONES_VECTORIALES)
+
+
+def evaluar(texto: str, variables: Mapping[str, Any]) -> Any:
+    """Compila (o toma de la caché) y evalúa."""
+    return compilar(texto).evaluar(variables)
+
+
+def resolver_valor(valor: Any, variables: Mapping[str, Any]) -> Any:
+    """
+    Resuelve referencias en el valor de una propiedad.
+
+    '$nombre' y '${ruta}' solos devuelven el objeto (tabla, lista, ...);
+    '${ruta}' dentro de un texto se reemplaza por su valor como texto. Una
+    referencia inexistente se deja tal cual. Como antes, '$' seguido del
+    nombre exacto de una variable la devuelve aunque el nombre no sea un
+    identificador ('$mi-variable', '$datos.col').
+    """
+    if not isinstance(valor, str) or '$' not in valor:
+        return valor
+    if valor.startswith('$') and valor[1:] in variables:
+        return variables[valor[1:]]
+    solo = _VARIABLE_SOLA.match(valor) or _RUTA_SOLA.match(valor)
+    if solo:
+        try:
+            return resolver_ruta(variables, solo.group(1))
+        except (KeyError, IndexError):
+            return valor
+
+    def reemplazo(m: Any) -> str:
+        try:
+            return str(resolver_ruta(variables, m.group(1)))
+        except (KeyError, IndexError):
+            return m.group(0)
+
+    return _RUTA_EN_TEXTO.sub(reemplazo, valor)
@@ -9,6 +9,7 @@ from dataclasses import dataclass, field
 import importlib
 import inspect
 import os
+import threading
 
 
 @dataclass
@@ -24,6 +25,7 @@ class ActionSpec:
     callable_func: Callable
     provides: Optional[str] = None
     clear_driver: bool = False
+    branches: bool = False
     module_path: str = ""
 
 
@@ -35,12 +37,14 @@ class ActionRegistry:
     _actions: Dict[str, ActionSpec] = {}
     _categories: Dict[str, List[ActionSpec]] = {}
     _initialized = False
+    # Reentrante: importar un módulo de acciones registra acciones en el mismo hilo
+    _lock = threading.RLock()
     
     @classmethod
     def register_action(cls, id: str, category: str, name: str, 
                        description: str, schema: List[Dict], 
                        callable_func: Callable, provides: Optional[str] = None,
-                       clear_driver: bool = False) -> None:
+                       clear_driver: bool = False, branches: bool = False) -> None:
         """
         Registra una nueva acción.
         """
@@ -53,15 +57,17 @@ class ActionRegistry:
             callable_func=callable_func,
             provides=provides,
             clear_driver=clear_driver,
+            branches=branches,
             module_path=callable_func.__module__ if callable_func else ""
         )
         
-        cls._actions[id] = spec
-        
-        # Organizar por categorías
-        if category not in cls._categories:
-            cls._categories[category] = []
-        cls._categories[category].append(spec)
+        with cls._lock:
+            cls._actions[id] = spec
+            
+            # Organizar por categorías
+            if category not in cls._categories:
+                cls._categories[category] = []
+            cls._categories[category].append(spec)
         
         print(f"[REGISTRY] Registrada acción: {id} ({category})")
     
@@ -102,20 +108,27 @@ class ActionRegistry:
     def auto_discover_actions(cls, base_path: str = "modules.actions") -> None:
         """
         Auto-descubre y carga todas las acciones desde el directorio actions.
+        
+        Varias ejecuciones pueden llamarlo a la vez: solo una importa y las
+        demás esperan a que termine.
         """
         if cls._initialized:
             return
-            
-        print(f"[REGISTRY] Iniciando auto-descubrimiento desde {base_path}")
         
-        try:
-            # Importar todos los módulos de actions
-            cls._import_actions_recursively(base_path)
-            cls._initialized = True
-            print(f"[REGISTRY] Auto-descubrimiento completado: {len(cls._actions)} acciones")
+        with cls._lock:
+            if cls._initialized:
+                return
             
-        except Exception as e:
-            print(f"[REGISTRY] Error en auto-descubrimiento: {e}")
+            print(f"[REGISTRY] Iniciando auto-descubrimiento desde {base_path}")
+            
+            try:
+                # Importar todos los módulos de actions
+                cls._import_actions_recursively(base_path)
+                cls._initialized = True
+                print(f"[REGISTRY] Auto-descubrimiento completado: {len(cls._actions)} acciones")
+                
+            except Exception as e:
+                print(f"[REGISTRY] Error en auto-descubrimiento: {e}")
     
     @classmethod
     def _import_actions_recursively(cls, module_path: str) -> None:
@@ -0,0 +1,271 @@
+# modules/core/runs.py
+"""
+Ejecuciones concurrentes de flujos.
+
+RunManager recibe flujos, les asigna un id y los pone en una cola con
+prioridad de tamaño acotado; un número configurable de hilos los ejecuta,
+cada uno con su propio FlowExecutor (y por lo tanto su propio FlowContext:
+variables, drivers y token de cancelación). Los pools de navegadores y la
+caché de flujos compilados son del proceso y se comparten.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Callable, Optional, Tuple
+
+from .executor import FlowExecutor
+
+
+QUEUED = 'en_cola'
+RUNNING = 'ejecutando'
+PAUSED = 'pausada'
+COMPLETED = 'completada'
+FAILED = 'fallida'
+CANCELLED = 'cancelada'
+
+FINISHED = (COMPLETED, FAILED, CANCELLED)
+
+
+class RunQueueFull(RuntimeError):
+    """La cola de ejecuciones llegó a su límite."""
+
+
+@dataclass
+class FlowRun:
+    """
+    Una ejecución enviada al RunManager.
+    """
+    id: str
+    flow: Dict[str, Any]
+    priority: int = 0
+    name: str = ""
+    status: str = QUEUED
+    submitted: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    executor: Optional[FlowExecutor] = None
+    done: threading.Event = field(default_factory=threading.Event)
+
+    def summary(self) -> Dict[str, Any]:
+        end = self.finished or time.time()
+        return {
+            "id": self.id,
+            "nombre": self.name,
+            "estado": self.status,
+            "prioridad": self.priority,
+            "enviado": self.submitted,
+            "iniciado": self.started,
+            "terminado": self.finished,
+            "segundos": round(end - self.started, 3) if self.started else None,
+            "paso_actual": self.executor.context.current_step if self.executor and self.status in (RUNNING, PAUSED) else None,
+            "error": (self.result or {}).get('error'),
+        }
+
+
+class RunManager:
+    """
+    Cola de ejecuciones con prioridad y hilos de trabajo.
+
+    Mayor `priority` se ejecuta antes; a igual prioridad, en orden de
+    llegada. `notifier` recibe el progreso de todas las ejecuciones con la
+    clave 'runId' agregada. Se conservan las últimas `history` ejecuciones
+    terminadas para consultar su estado y resultado.
+    """
+
+    def __init__(self, max_concurrent: int = 2, max_queued: int = 20,
+                 notifier: Optional[Callable] = None, history: int = 100):
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.max_queued = max(1, int(max_queued))
+        self.notifier = notifier or (lambda x: None)
+        self.history = history
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[int, int, str]] = []
+        self._sequence = itertools.count()
+        self._runs: 'OrderedDict[str, FlowRun]' = OrderedDict()
+        self._workers = 0
+        self._closed = False
+
+    # ---- Envío y consulta ----
+
+    def submit(self, flow: Dict[str, Any], priority: int = 0, name: str = "") -> str:
+        """
+        Encola un flujo y devuelve el id de la ejecución.
+
+        Lanza RunQueueFull si ya hay `max_queued` ejecuciones esperando.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("El administrador de ejecuciones está cerrado")
+            if len(self._queue) >= self.max_queued:
+                raise RunQueueFull(f"Hay {len(self._queue)} ejecuciones en cola; intentar más tarde")
+            run = FlowRun(id=uuid.uuid4().hex[:12], flow=flow, priority=int(priority or 0),
+                          name=name or flow.get('name') or flow.get('nombre') or "")
+            self._runs[run.id] = run
+            heapq.heappush(self._queue, (-run.priority, next(self._sequence), run.id))
+            self._start_workers()
+            self._cond.notify()
+        print(f"[RUNS] Ejecución {run.id} en cola (prioridad {run.priority})")
+        return run.id
+
+    def get(self, run_id: str) -> Optional[FlowRun]:
+        with self._cond:
+            return self._runs.get(run_id)
+
+    def status(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Resumen de una ejecución, con su posición si está en cola."""
+        with self._cond:
+            run = self._runs.get(run_id)
+            if run is None:
+                return None
+            summary = run.summary()
+            if run.status == QUEUED:
+                pending = sorted(self._queue)
+                summary["posicion"] = next((i for i, e in enumerate(pending, start=1) if e[2] == run_id), None)
+            return summary
+
+    def list_runs(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            return [run.summary() for run in self._runs.values()]
+
+    def result(self, run_id: str, timeout: Optional[float] = 0) -> Optional[Dict[str, Any]]:
+        """
+        Resultado de execute_flow; espera hasta `timeout` segundos (None:
+        sin límite). Devuelve None si aún no terminó o el id no existe.
+        """
+        run = self.get(run_id)
+        if run is None:
+            return None
+        if timeout != 0:
+            run.done.wait(timeout)
+        return run.result if run.done.is_set() else None
+
+    def active(self) -> List[str]:
+        """Ids de las ejecuciones en curso o en pausa."""
+        with self._cond:
+            return [r.id for r in self._runs.values() if r.status in (RUNNING, PAUSED)]
+
+    # ---- Control ----
+
+    def cancel(self, run_id: str) -> bool:
+        """Quita de la cola una ejecución pendiente o cancela la que está en curso."""
+        with self._cond:
+            run = self._runs.get(run_id)
+            if run is None or run.status in FINISHED:
+                return False
+            executor = run.executor
+            if run.status == QUEUED:
+                self._queue = [e for e in self._queue if e[2] != run_id]
+                heapq.heapify(self._queue)
+                self._finish(run, {"ok": False, "cancelled": True, "error": "Ejecución cancelada antes de iniciar"})
+        if executor is None:
+            self._announce(run)
+        else:
+            executor.stop()
+        return True
+
+    def pause(self, run_id: str) -> bool:
+        with self._cond:
+            run = self._runs.get(run_id)
+            if run is None or run.status != RUNNING:
+                return False
+            run.status = PAUSED
+            executor = run.executor
+        executor.pause()
+        return True
+
+    def resume(self, run_id: str) -> bool:
+        with self._cond:
+            run = self._runs.get(run_id)
+            if run is None or run.status != PAUSED:
+                return False
+            run.status = RUNNING
+            executor = run.executor
+        executor.resume()
+        return True
+
+    def set_max_concurrent(self, max_concurrent: int) -> None:
+        """Cambia la cantidad de hilos; los que sobran terminan al quedar libres."""
+        with self._cond:
+            self.max_concurrent = max(1, int(max_concurrent))
+            self._start_workers()
+            self._cond.notify_all()
+
+    def shutdown(self, cancel_running: bool = True) -> None:
+        """Descarta la cola y, si se pide, cancela las ejecuciones en curso."""
+        with self._cond:
+            self._closed = True
+            pending = [self._runs[e[2]] for e in self._queue]
+            self._queue = []
+            for run in pending:
+                self._finish(run, {"ok": False, "cancelled": True, "error": "Ejecución descartada al cerrar"})
+            running = [r.executor for r in self._runs.values() if r.status in (RUNNING, PAUSED)]
+            self._cond.notify_all()
+        for run in pending:
+            self._announce(run)
+        if cancel_running:
+            for executor in running:
+                executor.stop()
+
+    # ---- Internos ----
+
+    def _start_workers(self) -> None:
+        while self._workers < self.max_concurrent and self._workers < len(self._queue) + self._busy():
+            self._workers += 1
+            threading.Thread(target=self._worker, name=f"flow-run-{self._workers}", daemon=True).start()
+
+    def _busy(self) -> int:
+        return sum(1 for r in self._runs.values() if r.status in (RUNNING, PAUSED))
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed and self._workers <= self.max_concurrent:
+                    self._cond.wait()
+                if self._closed or self._workers > self.max_concurrent or not self._queue:
+                    self._workers -= 1
+                    return
+                _, _, run_id = heapq.heappop(self._queue)
+                run = self._runs[run_id]
+                run.executor = FlowExecutor(notifier=lambda payload, run_id=run_id: self._notify(run_id, payload))
+                run.executor.context.execution_id = run_id
+                run.status = RUNNING
+                run.started = time.time()
+            print(f"[RUNS] Iniciando ejecución {run_id}")
+            try:
+                result = run.executor.execute_flow(run.flow)
+            except BaseException as e:
+                result = {"ok": False, "error": f"Error ejecutando flujo: {e}"}
+            with self._cond:
+                self._finish(run, result)
+            self._announce(run)
+
+    def _finish(self, run: FlowRun, result: Dict[str, Any]) -> None:
+        """
+        Registra el resultado (con el lock tomado) y poda el historial. El
+        aviso lo hace el llamador con _announce, ya sin el lock.
+        """
+        run.result = result
+        run.status = CANCELLED if result.get('cancelled') else COMPLETED if result.get('ok') else FAILED
+        run.finished = time.time()
+        run.flow = {}
+        run.done.set()
+        finished = [r.id for r in self._runs.values() if r.status in FINISHED]
+        for old in finished[:max(0, len(finished) - self.history)]:
+            del self._runs[old]
+
+    def _announce(self, run: FlowRun) -> None:
+        """Notifica el estado final; se llama fuera del lock."""
+        self._notify(run.id, {"level": "run", "estado": run.status})
+        print(f"[RUNS] Ejecución {run.id}: {run.status}")
+
+    def _notify(self, run_id: str, payload: Dict[str, Any]) -> None:
+        try:
+            self.notifier(dict(payload, runId=run_id))
+        except Exception:
+            pass
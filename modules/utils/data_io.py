@@ -2,10 +2,42 @@
 """
 Utilidades consolidadas para entrada/salida de datos.
 """
+import io
 import os
+import re
+import time
+import fnmatch
+import mmap
+import hashlib
+import threading
 import pandas as pd
-from typing import Any, Dict, Optional, List
-import glob
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+from modules.core.cancellation import FlowCancelled, checkpoint, current_token, propagate_token
+from modules.utils.query_plan import LazyFrame, CHUNK_FILAS
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Dentro de un flujo, los CSV más grandes se leen por bloques para poder
+# cancelar o pausar entre uno y otro
+LECTURA_POR_BLOQUES_BYTES = 64 * 1024 * 1024
+
+
+def _read_csv(ruta: str, encoding: str, opciones: Dict[str, Any]) -> pd.DataFrame:
+    if current_token() is None or os.path.getsize(ruta) < LECTURA_POR_BLOQUES_BYTES:
+        return pd.read_csv(ruta, encoding=encoding, **opciones)
+    bloques = []
+    with pd.read_csv(ruta, encoding=encoding, chunksize=CHUNK_FILAS, **opciones) as lector:
+        for bloque in lector:
+            checkpoint()
+            bloques.append(bloque)
+    return pd.concat(bloques, ignore_index=True, copy=False)
 
 
 def leer_csv(ruta: str, encoding: str = "utf-8", **kwargs) -> pd.DataFrame:
@@ -13,13 +45,12 @@ def leer_csv(ruta: str, encoding: str = "utf-8", **kwargs) -> pd.DataFrame:
     if not os.path.exists(ruta):
         raise FileNotFoundError(f"No se encontró el archivo: {ruta}")
     
+    opciones = {k: v for k, v in kwargs.items() if v not in (None, "")}
     try:
-        df = pd.read_csv(ruta, encoding=encoding, **{k:v for k,v in kwargs.items() if v not in (None, "")})
-        return df
+        return _read_csv(ruta, encoding, opciones)
     except UnicodeDecodeError:
         # Fallback a latin-1 si utf-8 falla
-        df = pd.read_csv(ruta, encoding='latin-1', **{k:v for k,v in kwargs.items() if v not in (None, "")})
-        return df
+        return _read_csv(ruta, 'latin-1', opciones)
 
 
 def leer_excel(ruta: str, hoja: str, **kwargs) -> pd.DataFrame:
@@ -67,33 +98,384 @@ def excel_leer_rango(ruta: str, hoja: str, rango: str) -> pd.DataFrame:
         return df
 
 
-def escribir_csv(df: pd.DataFrame, ruta_destino: str, encoding: str = "utf-8", **kwargs) -> None:
-    """Escribe DataFrame a CSV."""
+def materializar(datos: Any) -> Any:
+    """Ejecuta un plan diferido; cualquier otro valor se devuelve sin cambios."""
+    if isinstance(datos, LazyFrame):
+        return datos.collect()
+    return datos
+
+
+EXTENSIONES_EXCEL = ('.xlsx', '.xlsm', '.xls')
+
+
+def _leer_archivo_tabular(ruta: str, hoja: Any = 0) -> Tuple[pd.DataFrame, float]:
+    """Lee un CSV o Excel según la extensión y devuelve (df, segundos)."""
+    inicio = time.perf_counter()
+    if os.path.splitext(ruta)[1].lower() in EXTENSIONES_EXCEL:
+        df = leer_excel(ruta, hoja)
+    else:
+        df = leer_csv(ruta)
+    return df, time.perf_counter() - inicio
+
+
+def leer_archivos_carpeta(ruta: str, patron: str = "*.csv", hoja: Any = 0,
+                          columna_origen: str = "", max_workers: Optional[int] = None,
+                          usar_procesos: bool = False) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """
+    Lee en paralelo todos los CSV/Excel de una carpeta y los concatena.
+    
+    Las columnas se alinean por nombre (las faltantes quedan vacías) y la
+    concatenación se hace una sola vez al final. Devuelve (df, reporte) donde
+    el reporte tiene una entrada por archivo con filas, segundos y error.
+    Si un archivo ya tiene una columna llamada como columna_origen, su
+    contenido se reemplaza por el nombre del archivo.
+    """
+    archivos = sorted(registro["ruta"] for registro in carpeta_escanear(ruta, patron, con_metadatos=False))
+    if not archivos:
+        return pd.DataFrame(), []
+    
+    workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+    pool_cls = ProcessPoolExecutor if usar_procesos else ThreadPoolExecutor
+    resultados: Dict[str, pd.DataFrame] = {}
+    reporte: Dict[str, Dict[str, Any]] = {}
+    
+    with pool_cls(max_workers=min(workers, len(archivos))) as pool:
+        futuros = {pool.submit(_leer_archivo_tabular, archivo, hoja): archivo for archivo in archivos}
+        for futuro in as_completed(futuros):
+            try:
+                checkpoint()
+            except FlowCancelled:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+            archivo = futuros[futuro]
+            try:
+                df, segundos = futuro.result()
+                resultados[archivo] = df
+                reporte[archivo] = {"archivo": archivo, "filas": len(df),
+                                    "segundos": round(segundos, 4), "error": None}
+            except Exception as e:
+                reporte[archivo] = {"archivo": archivo, "filas": 0, "segundos": None, "error": str(e)}
+    
+    # Mantener el orden de los archivos y añadir el origen sin copiar cada frame
+    frames = []
+    for archivo in archivos:
+        df = resultados.get(archivo)
+        if df is None:
+            continue
+        if columna_origen in df.columns:
+            # El archivo ya trae una columna con ese nombre: se reemplaza
+            df[columna_origen] = os.path.basename(archivo)
+        elif columna_origen:
+            df.insert(0, columna_origen, os.path.basename(archivo))
+        frames.append(df)
+    
+    combinado = pd.concat(frames, ignore_index=True, sort=False, copy=False) if frames else pd.DataFrame()
+    return combinado, [reporte[archivo] for archivo in archivos]
+
+
+# Extensión por códec de compresión (y viceversa para inferir)
+EXTENSIONES_COMPRESION = {'gzip': '.gz', 'zstd': '.zst', 'xz': '.xz'}
+
+
+def compresion_de_ruta(ruta: str) -> Optional[str]:
+    """Infiere el códec a partir de la extensión ('.gz', '.zst', '.xz')."""
+    extension = os.path.splitext(ruta)[1].lower()
+    for codec, ext in EXTENSIONES_COMPRESION.items():
+        if extension == ext:
+            return codec
+    return None
+
+
+def ruta_con_compresion(ruta: str, compresion: Optional[str]) -> str:
+    """Agrega la extensión del códec si la ruta aún no la tiene."""
+    if compresion and compresion in EXTENSIONES_COMPRESION and compresion_de_ruta(ruta) != compresion:
+        return ruta + EXTENSIONES_COMPRESION[compresion]
+    return ruta
+
+
+def abrir_salida(ruta: str, compresion: Optional[str] = "auto", encoding: str = "utf-8",
+                 nivel: Optional[int] = None, hilos: int = 0, anexar: bool = False) -> Any:
+    """
+    Abre un archivo de texto para escritura en streaming, comprimido o no.
+    
+    Con 'auto' el códec se deduce de la extensión. zstd (paquete opcional
+    'zstandard') admite compresión multihilo; gzip y xz usan un solo hilo.
+    Con anexar, los formatos comprimidos agregan un nuevo bloque (frame) al
+    final, que los lectores concatenan de forma transparente.
+    """
+    modo = 'a' if anexar else 'w'
+    if compresion == "auto":
+        compresion = compresion_de_ruta(ruta)
+    if not compresion or compresion == "ninguna":
+        return open(ruta, modo, encoding=encoding, newline='')
+    if compresion == "gzip":
+        import gzip
+        return gzip.open(ruta, modo + 't', compresslevel=6 if nivel is None else nivel, encoding=encoding, newline='')
+    if compresion == "xz":
+        import lzma
+        return lzma.open(ruta, modo + 't', preset=6 if nivel is None else nivel, encoding=encoding, newline='')
+    if compresion == "zstd":
+        if zstandard is None:
+            raise ImportError("La compresión zstd requiere el paquete 'zstandard' (pip install zstandard)")
+        hilos = hilos or (os.cpu_count() or 1)
+        compresor = zstandard.ZstdCompressor(level=3 if nivel is None else nivel, threads=hilos)
+        crudo = open(ruta, modo + 'b')
+        return io.TextIOWrapper(compresor.stream_writer(crudo, closefd=True), encoding=encoding, newline='')
+    raise ValueError(f"Compresión no soportada: {compresion}")
+
+
+def abrir_entrada(ruta: str) -> Any:
+    """
+    Abre un archivo para lectura binaria, descomprimiendo según la extensión.
+    """
+    compresion = compresion_de_ruta(ruta)
+    if compresion == "gzip":
+        import gzip
+        return gzip.open(ruta, 'rb')
+    if compresion == "xz":
+        import lzma
+        return lzma.open(ruta, 'rb')
+    if compresion == "zstd":
+        if zstandard is None:
+            raise ImportError("La descompresión zstd requiere el paquete 'zstandard' (pip install zstandard)")
+        crudo = open(ruta, 'rb')
+        lector = zstandard.ZstdDecompressor().stream_reader(crudo, read_across_frames=True, closefd=True)
+        return io.BufferedReader(lector)
+    return open(ruta, 'rb')
+
+
+def escribir_csv(df: pd.DataFrame, ruta_destino: str, encoding: str = "utf-8",
+                 compresion: Optional[str] = "auto", nivel: Optional[int] = None, hilos: int = 0,
+                 **kwargs) -> None:
+    """Escribe DataFrame (o plan diferido, bloque a bloque) a CSV, opcionalmente comprimido."""
     # Crear directorio si no existe
     os.makedirs(os.path.dirname(ruta_destino), exist_ok=True)
-    df.to_csv(ruta_destino, encoding=encoding, index=False, **kwargs)
+    with abrir_salida(ruta_destino, compresion, encoding, nivel, hilos) as f:
+        if isinstance(df, LazyFrame):
+            for i, bloque in enumerate(df.iter_chunks()):
+                bloque.to_csv(f, index=False, header=(i == 0), **kwargs)
+        else:
+            # Por bloques: entre uno y otro se puede cancelar o pausar
+            for inicio in range(0, max(len(df), 1), CHUNK_FILAS):
+                checkpoint()
+                df.iloc[inicio:inicio + CHUNK_FILAS].to_csv(f, index=False, header=(inicio == 0), **kwargs)
 
 
 def escribir_excel(df: pd.DataFrame, ruta_destino: str, hoja: str = "Hoja1", **kwargs) -> None:
     """Escribe DataFrame a Excel."""
     # Crear directorio si no existe
     os.makedirs(os.path.dirname(ruta_destino), exist_ok=True)
+    df = materializar(df)
     df.to_excel(ruta_destino, sheet_name=hoja, index=False, engine="openpyxl", **kwargs)
 
 
-def carpeta_listar(ruta: str, patron: str = "*") -> List[str]:
-    """Lista archivos en una carpeta con patrón opcional."""
+def _compilar_patrones(patrones: Any) -> "re.Pattern":
+    """Une uno o varios patrones glob ('*.csv;*.xlsx') en una sola regex."""
+    if isinstance(patrones, str):
+        patrones = [p.strip() for p in re.split(r'[;,]', patrones)]
+    patrones = [p for p in (patrones or []) if p] or ["*"]
+    # Mismas reglas de mayúsculas que glob: insensible solo en Windows
+    flags = re.IGNORECASE if os.name == 'nt' else 0
+    return re.compile("|".join(fnmatch.translate(p) for p in patrones), flags)
+
+
+def carpeta_escanear(ruta: str, patrones: Any = "*", recursivo: bool = False,
+                     tamano_min: Optional[int] = None, tamano_max: Optional[int] = None,
+                     modificado_desde: Optional[float] = None, modificado_hasta: Optional[float] = None,
+                     con_metadatos: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Recorre una carpeta con os.scandir y produce un registro por archivo.
+    
+    Cada registro tiene 'ruta', 'nombre' y 'relativa'; con metadatos también
+    'tamano' (bytes) y 'modificado' (timestamp). El stat lo cachea DirEntry,
+    por lo que no hay llamadas extra por archivo. Es un generador: se puede
+    consumir de a poco en carpetas muy grandes.
+    """
     if not os.path.exists(ruta):
         raise FileNotFoundError(f"No se encontró la carpeta: {ruta}")
     
     if not os.path.isdir(ruta):
         raise NotADirectoryError(f"La ruta no es una carpeta: {ruta}")
     
-    patron_completo = os.path.join(ruta, patron)
-    archivos = glob.glob(patron_completo)
+    coincide = _compilar_patrones(patrones).match
+    filtra_metadatos = any(v is not None for v in (tamano_min, tamano_max, modificado_desde, modificado_hasta))
+    pendientes = [ruta]
+    
+    while pendientes:
+        checkpoint()
+        actual = pendientes.pop()
+        try:
+            entradas = os.scandir(actual)
+        except (PermissionError, FileNotFoundError):
+            continue
+        
+        with entradas:
+            for entrada in entradas:
+                # Igual que glob: ocultar archivos que empiezan con punto
+                if entrada.name.startswith('.'):
+                    continue
+                try:
+                    if entrada.is_dir(follow_symlinks=False):
+                        if recursivo:
+                            pendientes.append(entrada.path)
+                        continue
+                    if not entrada.is_file() or not coincide(entrada.name):
+                        continue
+                    
+                    registro = {
+                        "ruta": entrada.path,
+                        "nombre": entrada.name,
+                        "relativa": os.path.relpath(entrada.path, ruta) if recursivo else entrada.name,
+                    }
+                    if con_metadatos or filtra_metadatos:
+                        st = entrada.stat()
+                        if tamano_min is not None and st.st_size < tamano_min:
+                            continue
+                        if tamano_max is not None and st.st_size > tamano_max:
+                            continue
+                        if modificado_desde is not None and st.st_mtime < modificado_desde:
+                            continue
+                        if modificado_hasta is not None and st.st_mtime > modificado_hasta:
+                            continue
+                        registro["tamano"] = st.st_size
+                        registro["modificado"] = st.st_mtime
+                except OSError:
+                    # Archivo borrado o inaccesible durante el recorrido
+                    continue
+                yield registro
+
+
+def carpeta_listar_detalle(ruta: str, patrones: Any = "*", recursivo: bool = False,
+                           ordenar_por: str = "", descendente: bool = False, **filtros) -> pd.DataFrame:
+    """Lista archivos como DataFrame (ruta, nombre, relativa, tamano, modificado)."""
+    columnas = ["ruta", "nombre", "relativa", "tamano", "modificado"]
+    df = pd.DataFrame.from_records(carpeta_escanear(ruta, patrones, recursivo, **filtros), columns=columnas)
+    if ordenar_por:
+        df = df.sort_values(ordenar_por, ascending=not descendente, kind='stable', ignore_index=True)
+    return df
+
+
+def carpeta_listar(ruta: str, patron: str = "*", recursivo: bool = False) -> List[str]:
+    """Lista archivos en una carpeta con patrón opcional."""
+    # Devolver solo los nombres de archivo (o rutas relativas si es recursivo)
+    return [registro["relativa"] for registro in
+            carpeta_escanear(ruta, patron, recursivo=recursivo, con_metadatos=False)]
+
+
+# Caché de hashes por (ruta, tamaño, mtime, algoritmo, límite)
+_CACHE_HASHES: "OrderedDict[Tuple, str]" = OrderedDict()
+_CACHE_HASHES_MAX = 500_000
+_cache_hashes_lock = threading.Lock()
+
+
+def calcular_hash(ruta: str, algoritmo: str = "sha256", tamano_bloque: int = 1024 * 1024,
+                  limite: Optional[int] = None) -> str:
+    """
+    Calcula el hash del contenido de un archivo por bloques.
+    
+    Usa un mapeo en memoria (sin copiar a buffers de Python) y cae a lecturas
+    normales si el sistema de archivos no admite mmap. Con 'limite' solo se
+    procesan los primeros bytes.
+    """
+    h = hashlib.new(algoritmo)
+    with open(ruta, 'rb') as f:
+        tamano = os.fstat(f.fileno()).st_size
+        if limite is not None:
+            tamano = min(tamano, limite)
+        if tamano == 0:
+            return h.hexdigest()
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                vista = memoryview(mm)
+                try:
+                    for inicio in range(0, tamano, tamano_bloque):
+                        checkpoint()
+                        h.update(vista[inicio:min(inicio + tamano_bloque, tamano)])
+                finally:
+                    vista.release()
+        except (OSError, ValueError):
+            h = hashlib.new(algoritmo)
+            f.seek(0)
+            restante = tamano
+            while restante > 0:
+                checkpoint()
+                bloque = f.read(min(tamano_bloque, restante))
+                if not bloque:
+                    break
+                h.update(bloque)
+                restante -= len(bloque)
+    return h.hexdigest()
+
+
+def calcular_hash_cacheado(ruta: str, tamano: int, modificado: float, algoritmo: str = "sha256",
+                           limite: Optional[int] = None) -> str:
+    """calcular_hash con caché en memoria invalidada por tamaño y fecha."""
+    clave = (ruta, tamano, modificado, algoritmo, limite)
+    with _cache_hashes_lock:
+        valor = _CACHE_HASHES.get(clave)
+        if valor is not None:
+            _CACHE_HASHES.move_to_end(clave)
+            return valor
+    valor = calcular_hash(ruta, algoritmo, limite=limite)
+    with _cache_hashes_lock:
+        _CACHE_HASHES[clave] = valor
+        if len(_CACHE_HASHES) > _CACHE_HASHES_MAX:
+            _CACHE_HASHES.popitem(last=False)
+    return valor
+
+
+def buscar_duplicados(carpetas: List[str], patrones: Any = "*", recursivo: bool = True,
+                      algoritmo: str = "sha256", max_workers: Optional[int] = None,
+                      tamano_min: int = 1) -> pd.DataFrame:
+    """
+    Encuentra archivos con contenido idéntico en una o varias carpetas.
+    
+    Solo se hashean archivos que comparten tamaño; en archivos grandes se
+    compara primero un hash de los primeros 64 KB y solo los que coinciden
+    se hashean completos, en paralelo. Devuelve un DataFrame con columnas
+    grupo, hash, tamano, ruta y modificado (solo archivos duplicados).
+    """
+    prefijo = 64 * 1024
+    por_tamano: Dict[int, List[Dict[str, Any]]] = {}
+    vistos = set()
+    for carpeta in carpetas:
+        for registro in carpeta_escanear(carpeta, patrones, recursivo=recursivo, tamano_min=tamano_min):
+            ruta_real = os.path.realpath(registro["ruta"])
+            if ruta_real in vistos:
+                continue
+            vistos.add(ruta_real)
+            por_tamano.setdefault(registro["tamano"], []).append(registro)
+    
+    candidatos = [grupo for grupo in por_tamano.values() if len(grupo) > 1]
+    workers = max_workers or min(32, (os.cpu_count() or 1) * 2)
+    
+    def _hashear(registros: List[Dict[str, Any]], limite: Optional[int]) -> List[List[Dict[str, Any]]]:
+        """Reagrupa registros por hash (parcial o completo) y descarta únicos."""
+        if not registros:
+            return []
+        with ThreadPoolExecutor(max_workers=min(workers, len(registros))) as pool:
+            hashes = list(pool.map(propagate_token(
+                lambda r: calcular_hash_cacheado(r["ruta"], r["tamano"], r["modificado"], algoritmo, limite)),
+                registros))
+        grupos: Dict[Tuple[int, str], List[Dict[str, Any]]] = {}
+        for registro, valor in zip(registros, hashes):
+            grupos.setdefault((registro["tamano"], valor), []).append(dict(registro, hash=valor))
+        return [g for g in grupos.values() if len(g) > 1]
     
-    # Devolver solo los nombres de archivo, no las rutas completas
-    return [os.path.basename(archivo) for archivo in archivos if os.path.isfile(archivo)]
+    # Etapa 1: prefijo para archivos grandes; los pequeños pasan directo
+    grandes = [r for grupo in candidatos for r in grupo if r["tamano"] > prefijo]
+    pequenos = [r for grupo in candidatos for r in grupo if r["tamano"] <= prefijo]
+    sobrevivientes = [r for grupo in _hashear(grandes, prefijo) for r in grupo] + pequenos
+    
+    # Etapa 2: hash completo
+    duplicados = _hashear(sobrevivientes, None)
+    
+    filas = []
+    for numero, grupo in enumerate(sorted(duplicados, key=lambda g: -g[0]["tamano"]), start=1):
+        for registro in sorted(grupo, key=lambda r: r["ruta"]):
+            filas.append({"grupo": numero, "hash": registro["hash"], "tamano": registro["tamano"],
+                          "ruta": registro["ruta"], "modificado": registro["modificado"]})
+    return pd.DataFrame(filas, columns=["grupo", "hash", "tamano", "ruta", "modificado"])
 
 
 def crear_carpeta(ruta: str) -> None:
@@ -101,10 +483,76 @@ def crear_carpeta(ruta: str) -> None:
     os.makedirs(ruta, exist_ok=True)
 
 
-def mover_archivo(origen: str, destino: str, si_existe: str = "sobrescribir") -> None:
-    """Mueve un archivo."""
+def _nombres_en_carpeta(carpeta: str) -> set:
+    """Nombres existentes en una carpeta (un solo recorrido con scandir)."""
+    try:
+        with os.scandir(carpeta) as entradas:
+            return {entrada.name for entrada in entradas}
+    except FileNotFoundError:
+        return set()
+
+
+def _nombre_disponible(destino: str, ocupados: set) -> str:
+    """Primer 'base_N.ext' libre según el conjunto de nombres ocupados."""
+    carpeta, nombre = os.path.split(destino)
+    base, ext = os.path.splitext(nombre)
+    contador = 1
+    while f"{base}_{contador}{ext}" in ocupados:
+        contador += 1
+    return os.path.join(carpeta, f"{base}_{contador}{ext}")
+
+
+BLOQUE_COPIA = 64 * 1024 * 1024
+
+
+def _copiar_contenido(origen: str, destino: str) -> int:
+    """
+    Copia el contenido usando rutas de copia del kernel cuando existen.
+    
+    Intenta os.copy_file_range (copia en el servidor/reflink en sistemas que
+    lo soportan) y si no, shutil.copyfile, que ya usa sendfile/fcopyfile.
+    Conserva metadatos como shutil.copy2. Devuelve los bytes copiados. Si
+    la ejecución se cancela a mitad de copia se borra el destino parcial.
+    """
     import shutil
     
+    tamano = os.path.getsize(origen)
+    copiado = None
+    if hasattr(os, 'copy_file_range') and tamano:
+        copiado = 0
+        try:
+            with open(origen, 'rb') as fsrc, open(destino, 'wb') as fdst:
+                while copiado < tamano:
+                    checkpoint()
+                    n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), min(tamano - copiado, BLOQUE_COPIA))
+                    if n == 0:
+                        break
+                    copiado += n
+        except OSError:
+            copiado = None
+        except FlowCancelled:
+            os.remove(destino)
+            raise
+    if copiado != tamano:
+        shutil.copyfile(origen, destino)
+    shutil.copystat(origen, destino)
+    return tamano
+
+
+def _mover_contenido(origen: str, destino: str) -> int:
+    """Renombra si es el mismo volumen; si no, copia rápida y borra el origen."""
+    tamano = os.path.getsize(origen)
+    try:
+        os.replace(origen, destino)
+    except OSError:
+        # Distinto volumen (EXDEV): copiar y eliminar
+        _copiar_contenido(origen, destino)
+        os.remove(origen)
+    return tamano
+
+
+def mover_archivo(origen: str, destino: str, si_existe: str = "sobrescribir") -> None:
+    """Mueve un archivo."""
     if not os.path.exists(origen):
         raise FileNotFoundError(f"Archivo origen no encontrado: {origen}")
     
@@ -114,19 +562,13 @@ def mover_archivo(origen: str, destino: str, si_existe: str = "sobrescribir") ->
     if os.path.exists(destino) and si_existe == "saltar":
         return
     elif os.path.exists(destino) and si_existe == "renombrar":
-        base, ext = os.path.splitext(destino)
-        contador = 1
-        while os.path.exists(f"{base}_{contador}{ext}"):
-            contador += 1
-        destino = f"{base}_{contador}{ext}"
+        destino = _nombre_disponible(destino, _nombres_en_carpeta(os.path.dirname(destino)))
     
-    shutil.move(origen, destino)
+    _mover_contenido(origen, destino)
 
 
 def copiar_archivo(origen: str, destino: str, si_existe: str = "sobrescribir") -> None:
     """Copia un archivo."""
-    import shutil
-    
     if not os.path.exists(origen):
         raise FileNotFoundError(f"Archivo origen no encontrado: {origen}")
     
@@ -136,13 +578,170 @@ def copiar_archivo(origen: str, destino: str, si_existe: str = "sobrescribir") -
     if os.path.exists(destino) and si_existe == "saltar":
         return
     elif os.path.exists(destino) and si_existe == "renombrar":
-        base, ext = os.path.splitext(destino)
-        contador = 1
-        while os.path.exists(f"{base}_{contador}{ext}"):
-            contador += 1
-        destino = f"{base}_{contador}{ext}"
+        destino = _nombre_disponible(destino, _nombres_en_carpeta(os.path.dirname(destino)))
+    
+    _copiar_contenido(origen, destino)
+
+
+def planificar_transferencias(pares: List[Tuple[str, str]], si_existe: str = "sobrescribir") -> List[Tuple[str, Optional[str]]]:
+    """
+    Resuelve colisiones de nombres para un lote de (origen, destino).
+    
+    Lee cada carpeta destino una sola vez y reserva los nombres asignados,
+    así dos archivos del lote tampoco se pisan entre sí: al sobrescribir,
+    si varios orígenes van al mismo destino gana el último y los demás se
+    saltan (dos hilos escribiendo el mismo archivo lo dejarían corrupto).
+    Un destino None indica que el archivo se salta.
+    """
+    ocupados_por_carpeta: Dict[str, set] = {}
+    asignados: Dict[Tuple[str, str], int] = {}
+    plan = []
+    for origen, destino in pares:
+        carpeta, nombre = os.path.split(destino)
+        ocupados = ocupados_por_carpeta.get(carpeta)
+        if ocupados is None:
+            ocupados = ocupados_por_carpeta[carpeta] = _nombres_en_carpeta(carpeta)
+        
+        if nombre in ocupados:
+            if si_existe == "saltar":
+                plan.append((origen, None))
+                continue
+            if si_existe == "renombrar":
+                destino = _nombre_disponible(destino, ocupados)
+                nombre = os.path.basename(destino)
+            elif (carpeta, nombre) in asignados:
+                previo = asignados[(carpeta, nombre)]
+                plan[previo] = (plan[previo][0], None)
+        ocupados.add(nombre)
+        asignados[(carpeta, nombre)] = len(plan)
+        plan.append((origen, destino))
+    return plan
+
+
+def transferir_archivos(pares: List[Tuple[str, str]], operacion: str = "copiar",
+                        si_existe: str = "sobrescribir", max_workers: Optional[int] = None,
+                        verificar: bool = False) -> List[Dict[str, Any]]:
+    """
+    Copia o mueve un lote de archivos en paralelo.
+    
+    Devuelve un registro por archivo con destino, estado ('copiado',
+    'movido', 'saltado' o 'error'), bytes, segundos y error. Con verificar,
+    se compara el hash de origen y destino (en movimientos se calcula antes
+    de mover).
+    """
+    plan = planificar_transferencias(pares, si_existe)
+    for carpeta in {os.path.dirname(d) for _, d in plan if d}:
+        os.makedirs(carpeta, exist_ok=True)
+    
+    if not plan:
+        return []
+    with ThreadPoolExecutor(max_workers=min(_hilos_transferencia(max_workers), len(plan))) as pool:
+        return list(pool.map(propagate_token(lambda par: _transferir(*par, operacion, verificar)), plan))
+
+
+def _hilos_transferencia(max_workers: Optional[int]) -> int:
+    return max_workers or min(32, (os.cpu_count() or 1) * 4)
+
+
+def _transferir(origen: str, destino: Optional[str], operacion: str = "copiar",
+                verificar: bool = False) -> Dict[str, Any]:
+    """Copia o mueve un archivo y devuelve su registro para el reporte."""
+    registro = {"origen": origen, "destino": destino, "estado": "saltado",
+                "bytes": 0, "segundos": 0.0, "error": None}
+    if destino is None:
+        return registro
+    inicio = time.perf_counter()
+    try:
+        hash_origen = calcular_hash(origen) if verificar else None
+        if operacion == "mover":
+            registro["bytes"] = _mover_contenido(origen, destino)
+            registro["estado"] = "movido"
+        else:
+            registro["bytes"] = _copiar_contenido(origen, destino)
+            registro["estado"] = "copiado"
+        if verificar and calcular_hash(destino) != hash_origen:
+            raise IOError(f"Verificación fallida: el contenido de {destino} no coincide")
+    except Exception as e:
+        registro["estado"] = "error"
+        registro["error"] = str(e)
+    registro["segundos"] = round(time.perf_counter() - inicio, 4)
+    return registro
+
+
+def sincronizar_carpeta(origen: str, destino: str, patrones: Any = "*", usar_hash: bool = False,
+                        eliminar_huerfanos: bool = False, max_workers: Optional[int] = None,
+                        tolerancia_mtime: float = 2.0) -> Dict[str, Any]:
+    """
+    Replica 'origen' en 'destino' copiando solo archivos nuevos o cambiados.
+    
+    Compara por tamaño y fecha de modificación (con tolerancia para shares
+    con timestamps de baja resolución); con usar_hash, los archivos del
+    mismo tamaño se comparan por contenido. Las copias conservan la fecha, así
+    la siguiente ejecución las reconoce sin cambios. Las comparaciones por
+    hash corren en el mismo pool de hilos que las copias, y cada archivo se
+    copia apenas su comparación indica que cambió.
+    """
+    os.makedirs(destino, exist_ok=True)
+    fuente = {r["relativa"]: r for r in carpeta_escanear(origen, patrones, recursivo=True)}
+    actual = {r["relativa"]: r for r in carpeta_escanear(destino, patrones, recursivo=True)}
+    
+    def _sincronizar(ruta_origen: str, ruta_destino: str, comparar: bool) -> Optional[Dict[str, Any]]:
+        if comparar:
+            try:
+                iguales = calcular_hash(ruta_origen) == calcular_hash(ruta_destino)
+            except OSError as e:
+                # Un archivo ilegible no detiene la sincronización del resto
+                return {"origen": ruta_origen, "destino": ruta_destino, "estado": "error",
+                        "bytes": 0, "segundos": 0.0, "error": str(e)}
+            if iguales:
+                return None
+        return _transferir(ruta_origen, ruta_destino)
+    
+    tareas = []
+    sin_cambios = 0
+    for relativa, registro in fuente.items():
+        existente = actual.pop(relativa, None)
+        comparar = False
+        if existente is not None and existente["tamano"] == registro["tamano"]:
+            if usar_hash:
+                comparar = True
+            elif abs(existente["modificado"] - registro["modificado"]) <= tolerancia_mtime:
+                sin_cambios += 1
+                continue
+        tareas.append((registro["ruta"], os.path.join(destino, relativa), comparar))
+    
+    reporte = []
+    if tareas:
+        for carpeta in {os.path.dirname(d) for _, d, _ in tareas}:
+            os.makedirs(carpeta, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=min(_hilos_transferencia(max_workers), len(tareas))) as pool:
+            for resultado in pool.map(propagate_token(lambda tarea: _sincronizar(*tarea)), tareas):
+                if resultado is None:
+                    sin_cambios += 1
+                else:
+                    reporte.append(resultado)
+    
+    # Lo que quedó en 'actual' no existe en el origen
+    eliminados = []
+    if eliminar_huerfanos:
+        for registro in actual.values():
+            try:
+                os.remove(registro["ruta"])
+                eliminados.append(registro["ruta"])
+            except OSError as e:
+                reporte.append({"origen": None, "destino": registro["ruta"], "estado": "error",
+                                "bytes": 0, "segundos": 0.0, "error": str(e)})
     
-    shutil.copy2(origen, destino)
+    copiados = [r for r in reporte if r["estado"] == "copiado"]
+    return {
+        "copiados": len(copiados),
+        "bytes": sum(r["bytes"] for r in copiados),
+        "sin_cambios": sin_cambios,
+        "eliminados": len(eliminados),
+        "huerfanos": len(actual),
+        "errores": sum(1 for r in reporte if r["estado"] == "error"),
+        "reporte": reporte,
+    }
 
 
 def eliminar_archivo(ruta: str) -> None:
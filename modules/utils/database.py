@@ -0,0 +1,144 @@
+"""
+Utilidades de entrada/salida contra bases SQLite locales.
+"""
+import os
+import sqlite3
+import threading
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from modules.core.cancellation import checkpoint
+from modules.utils.query_plan import LazyFrame, Fuente, CHUNK_FILAS
+
+# Segundos que una conexión espera a que otra libere la base antes de fallar
+ESPERA_BLOQUEO = 60.0
+
+
+def abrir_sqlite(ruta: str) -> sqlite3.Connection:
+    """
+    Abre una conexión SQLite pensada para reutilizarse entre pasos.
+
+    WAL + synchronous=NORMAL permite lecturas mientras se escribe y evita
+    un fsync por transacción. Si otra conexión está escribiendo se espera
+    hasta ESPERA_BLOQUEO segundos. check_same_thread=False solo permite
+    cerrarla (o terminar de leer un plan diferido) desde otro hilo; cada
+    hilo escribe con su propia conexión.
+    """
+    carpeta = os.path.dirname(ruta)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    con = sqlite3.connect(ruta, timeout=ESPERA_BLOQUEO, check_same_thread=False)
+    con.execute("PRAGMA journal_mode=WAL")
+    con.execute("PRAGMA synchronous=NORMAL")
+    return con
+
+
+def obtener_conexion(context: Any, ruta: str) -> sqlite3.Connection:
+    """
+    Conexión SQLite del flujo para el hilo actual (context.resources).
+
+    Se crea en el primer uso y se reutiliza en los pasos siguientes del
+    mismo hilo. Los contextos hijos comparten los recursos, así las filas
+    de para_cada_fila o los sub-flujos en paralelo obtienen cada uno su
+    conexión en vez de intercalar transacciones en una sola. El contexto
+    las cierra en cleanup().
+    """
+    clave = f"sqlite:{os.path.abspath(ruta)}:{threading.get_ident()}"
+    return context.get_or_create_resource(clave, lambda: abrir_sqlite(ruta))
+
+
+def _identificador(nombre: str) -> str:
+    """Cita un nombre de tabla/columna para SQL."""
+    return '"' + str(nombre).replace('"', '""') + '"'
+
+
+class FuenteSQL(Fuente):
+    """Scan de una consulta SQL en bloques; las columnas se empujan a un SELECT externo."""
+
+    tipo = "sql"
+
+    def __init__(self, conexion: sqlite3.Connection, consulta: str, parametros: Optional[Sequence] = None):
+        self.conexion = conexion
+        self.consulta = consulta.strip().rstrip(';')
+        self.parametros = tuple(parametros or ())
+
+    def leer_bloques(self, columnas=None, chunk_filas=CHUNK_FILAS):
+        consulta = self.consulta
+        if columnas:
+            lista = ", ".join(_identificador(c) for c in columnas)
+            consulta = f"SELECT {lista} FROM ({self.consulta})"
+        yield from pd.read_sql_query(consulta, self.conexion, params=self.parametros, chunksize=chunk_filas)
+
+    def describir(self) -> str:
+        resumen = " ".join(self.consulta.split())
+        return f"sql({resumen[:60]}{'…' if len(resumen) > 60 else ''})"
+
+
+def leer_consulta(conexion: sqlite3.Connection, consulta: str, parametros: Optional[Sequence] = None,
+                  diferido: bool = False) -> Union[pd.DataFrame, LazyFrame]:
+    """
+    Ejecuta una consulta y devuelve un DataFrame.
+
+    Con diferido devuelve un LazyFrame que lee el resultado por bloques
+    recién cuando se necesita (útil para resultados grandes).
+    """
+    if diferido:
+        return LazyFrame(FuenteSQL(conexion, consulta, parametros))
+    return pd.read_sql_query(consulta, conexion, params=tuple(parametros or ()))
+
+
+def _tipo_sql(serie: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(serie) or pd.api.types.is_integer_dtype(serie):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(serie):
+        return "REAL"
+    return "TEXT"
+
+
+def _filas(df: pd.DataFrame) -> List[Tuple[Any, ...]]:
+    """Convierte un bloque a tuplas con tipos nativos que sqlite3 sabe enlazar."""
+    df = df.copy(deep=False)
+    for columna in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[columna]):
+            df[columna] = df[columna].dt.strftime('%Y-%m-%d %H:%M:%S')
+    objetos = df.astype(object).where(df.notna(), None)
+    return list(objetos.itertuples(index=False, name=None))
+
+
+def escribir_tabla(conexion: sqlite3.Connection, tabla: str, datos: Any, modo: str = "agregar",
+                   lote: int = 10_000) -> int:
+    """
+    Inserta un DataFrame (o plan diferido) en una tabla con executemany.
+
+    Todo ocurre en una sola transacción; los datos se envían en lotes de
+    `lote` filas. Crea la tabla si no existe. Devuelve las filas insertadas.
+    """
+    bloques: Iterator[pd.DataFrame]
+    if isinstance(datos, LazyFrame):
+        bloques = datos.iter_chunks(chunk_filas=lote)
+    elif isinstance(datos, pd.DataFrame):
+        bloques = iter([datos])
+    else:
+        bloques = iter([pd.DataFrame(datos)])
+
+    nombre = _identificador(tabla)
+    insertadas = 0
+    sentencia = None
+    with conexion:
+        if modo == "reemplazar":
+            conexion.execute(f"DROP TABLE IF EXISTS {nombre}")
+        for bloque in bloques:
+            if sentencia is None:
+                columnas = ", ".join(f"{_identificador(c)} {_tipo_sql(bloque[c])}" for c in bloque.columns)
+                conexion.execute(f"CREATE TABLE IF NOT EXISTS {nombre} ({columnas})")
+                marcadores = ", ".join("?" for _ in bloque.columns)
+                lista = ", ".join(_identificador(c) for c in bloque.columns)
+                sentencia = f"INSERT INTO {nombre} ({lista}) VALUES ({marcadores})"
+            for inicio in range(0, len(bloque), lote):
+                # Cancelar deshace la transacción completa
+                checkpoint()
+                filas = _filas(bloque.iloc[inicio:inicio + lote])
+                conexion.executemany(sentencia, filas)
+                insertadas += len(filas)
+    return insertadas
@@ -0,0 +1,301 @@
+"""
+Cliente HTTP con pool de conexiones keep-alive (urllib3).
+
+Sirve para descargar archivos y llamar APIs REST sin pasar por el navegador;
+las cookies y el User-Agent se pueden copiar de la sesión de Selenium para
+acceder a contenido que requiere login.
+"""
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit, unquote
+
+import pandas as pd
+import urllib3
+
+from modules.core.cancellation import checkpoint, propagate_token
+from modules.utils.json_io import registros_a_dataframe
+
+
+TAMANO_BLOQUE = 1024 * 1024
+TIMEOUT_CONEXION = 10.0
+TIMEOUT_LECTURA = 60.0
+
+
+class _Reintentos(urllib3.Retry):
+    """
+    Reintentos que no duplican peticiones ya procesadas.
+
+    Los errores de conexión se reintentan siempre (la petición no llegó) y
+    un 429 también, porque el servidor la rechazó sin procesarla. Los
+    errores de lectura y los 502-504 solo se reintentan en métodos
+    idempotentes (los `allowed_methods` por defecto de urllib3): un POST o
+    PATCH pudo haberse aplicado antes de fallar.
+    """
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if status_code == 429 and self.status_forcelist and 429 in self.status_forcelist:
+            return True
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+class ClienteHTTP:
+    """
+    PoolManager compartido: reutiliza conexiones TCP/TLS por host.
+
+    `maxsize` limita las conexiones simultáneas por host; se guarda en
+    FlowContext.resources y se cierra con el contexto.
+    """
+
+    def __init__(self, maxsize: int = 8, reintentos: int = 2):
+        self.pool = urllib3.PoolManager(
+            num_pools=20,
+            maxsize=maxsize,
+            block=False,
+            retries=_Reintentos(total=reintentos, connect=reintentos, read=reintentos,
+                                backoff_factor=0.5, status_forcelist=(429, 502, 503, 504),
+                                raise_on_status=False),
+            timeout=urllib3.Timeout(connect=TIMEOUT_CONEXION, read=TIMEOUT_LECTURA),
+        )
+
+    def request(self, metodo: str, url: str, **kwargs) -> Any:
+        return self.pool.request(metodo, url, **kwargs)
+
+    def close(self) -> None:
+        self.pool.clear()
+
+
+def _cookie_aplica(cookie: Dict[str, Any], host: str, ruta: str, https: bool) -> bool:
+    # El navegador marca con '.' las cookies de dominio; sin él la cookie es
+    # solo para ese host y no se envía a sus subdominios
+    dominio = (cookie.get("domain") or "").lower()
+    if dominio.startswith("."):
+        dominio = dominio[1:]
+        if not (host == dominio or host.endswith("." + dominio)):
+            return False
+    elif dominio and host != dominio:
+        return False
+    if not ruta.startswith(cookie.get("path") or "/"):
+        return False
+    return https or not cookie.get("secure")
+
+
+class SesionNavegador:
+    """
+    Cookies y cabeceras copiadas una vez de un driver de Selenium.
+
+    Se leen en el hilo del flujo; luego las descargas concurrentes solo
+    arman la cabecera Cookie que corresponde a cada URL.
+    """
+
+    def __init__(self, driver: Any):
+        self.cookies = driver.get_cookies() or []
+        self.cabeceras: Dict[str, str] = {}
+        try:
+            self.cabeceras["User-Agent"] = driver.execute_script("return navigator.userAgent")
+        except Exception:
+            pass
+        try:
+            if driver.current_url.startswith("http"):
+                self.cabeceras["Referer"] = driver.current_url
+        except Exception:
+            pass
+
+    def cabeceras_para(self, url: str) -> Dict[str, str]:
+        partes = urlsplit(url)
+        host = (partes.hostname or "").lower()
+        ruta = partes.path or "/"
+        https = partes.scheme == "https"
+        cookies = [f"{c['name']}={c['value']}" for c in self.cookies if _cookie_aplica(c, host, ruta, https)]
+        cabeceras = dict(self.cabeceras)
+        if cookies:
+            cabeceras["Cookie"] = "; ".join(cookies)
+        return cabeceras
+
+
+def nombre_desde_url(url: str) -> Optional[str]:
+    """Nombre de archivo tomado del final de la ruta de la URL."""
+    return os.path.basename(unquote(urlsplit(url).path)) or None
+
+
+def descargar(cliente: ClienteHTTP, url: str, destino: str, cabeceras: Optional[Dict[str, str]] = None,
+              reanudar: bool = True, tamano_bloque: int = TAMANO_BLOQUE) -> Dict[str, Any]:
+    """
+    Descarga una URL en streaming a `destino` y devuelve un registro.
+
+    Se escribe en '<destino>.part' y se renombra al terminar. Si ya existe
+    un .part y `reanudar`, se pide solo lo que falta con Range; si el
+    servidor no lo soporta (responde 200) se descarga de nuevo completo.
+    Una cancelación entre bloques deja el .part para reanudar después.
+    """
+    registro: Dict[str, Any] = {"url": url, "destino": destino, "estado": "ok", "bytes": 0,
+                                "segundos": 0.0, "reanudado": False, "error": None}
+    inicio = time.perf_counter()
+    parcial = destino + ".part"
+    cabeceras = dict(cabeceras or {})
+    ya_descargado = os.path.getsize(parcial) if reanudar and os.path.exists(parcial) else 0
+    if ya_descargado:
+        cabeceras["Range"] = f"bytes={ya_descargado}-"
+
+    respuesta = None
+    try:
+        carpeta = os.path.dirname(destino)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        respuesta = cliente.request("GET", url, headers=cabeceras, preload_content=False, redirect=True)
+
+        if respuesta.status == 416 and ya_descargado:
+            # El .part ya estaba completo
+            os.replace(parcial, destino)
+            registro.update(bytes=ya_descargado, reanudado=True)
+            return registro
+        if respuesta.status >= 400:
+            raise IOError(f"HTTP {respuesta.status}")
+
+        reanudado = respuesta.status == 206 and ya_descargado > 0
+        escritos = ya_descargado if reanudado else 0
+        with open(parcial, "ab" if reanudado else "wb") as f:
+            for bloque in respuesta.stream(tamano_bloque):
+                checkpoint()
+                f.write(bloque)
+                escritos += len(bloque)
+        os.replace(parcial, destino)
+        registro.update(bytes=escritos, reanudado=reanudado)
+    except Exception as e:
+        registro.update(estado="error", error=str(e))
+    finally:
+        if respuesta is not None:
+            respuesta.release_conn()
+        registro["segundos"] = round(time.perf_counter() - inicio, 3)
+    return registro
+
+
+def descargar_varios(cliente: ClienteHTTP, urls: List[str], carpeta: str,
+                     sesion: Optional[SesionNavegador] = None, max_workers: int = 4,
+                     reanudar: bool = True) -> List[Dict[str, Any]]:
+    """
+    Descarga varias URLs a una carpeta con `max_workers` en paralelo.
+
+    El nombre de cada archivo sale del final de la URL (o 'descarga_N');
+    nombres repetidos reciben sufijo. Devuelve los registros en el orden
+    de entrada.
+    """
+    pares: List[Tuple[str, str]] = []
+    usados: Dict[str, int] = {}
+    for i, url in enumerate(urls, start=1):
+        nombre = nombre_desde_url(url) or f"descarga_{i}"
+        clave = nombre.lower()
+        if clave in usados:
+            usados[clave] += 1
+            base, ext = os.path.splitext(nombre)
+            nombre = f"{base} ({usados[clave]}){ext}"
+        else:
+            usados[clave] = 1
+        pares.append((url, os.path.join(carpeta, nombre)))
+
+    def tarea(par: Tuple[str, str]) -> Dict[str, Any]:
+        url, destino = par
+        cabeceras = sesion.cabeceras_para(url) if sesion else None
+        return descargar(cliente, url, destino, cabeceras, reanudar=reanudar)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pares) or 1))) as ejecutor:
+        return list(ejecutor.map(propagate_token(tarea), pares))
+
+
+def _cuerpo_respuesta(respuesta: Any) -> Any:
+    """JSON decodificado si el servidor lo declara (o lo parece), si no texto."""
+    crudo = respuesta.data or b""
+    tipo = (respuesta.headers.get("Content-Type") or "").lower()
+    texto = crudo.decode("utf-8", errors="replace")
+    if "json" in tipo or texto.lstrip()[:1] in ("{", "["):
+        try:
+            return json.loads(texto)
+        except ValueError:
+            if "json" in tipo:
+                raise
+    return texto
+
+
+def solicitar(cliente: ClienteHTTP, metodo: str, url: str, parametros: Optional[Dict[str, Any]] = None,
+              cuerpo: Any = None, cabeceras: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Hace una petición y devuelve un registro con el resultado.
+
+    `parametros` va en la query string; `cuerpo` se envía como JSON salvo
+    que ya sea str/bytes. Los errores HTTP (>= 400) y de conexión quedan en
+    el registro en lugar de lanzar excepción.
+    """
+    metodo = (metodo or "GET").upper()
+    registro: Dict[str, Any] = {"url": url, "metodo": metodo, "estado": "ok", "status": None,
+                                "segundos": 0.0, "datos": None, "error": None}
+    inicio = time.perf_counter()
+    cabeceras = dict(cabeceras or {})
+    cabeceras.setdefault("Accept", "application/json, */*;q=0.5")
+    try:
+        if parametros:
+            url_final = url + ("&" if "?" in url else "?") + urlencode(parametros, doseq=True)
+        else:
+            url_final = url
+        datos_envio = None
+        if cuerpo is not None:
+            if isinstance(cuerpo, (bytes, str)):
+                datos_envio = cuerpo.encode("utf-8") if isinstance(cuerpo, str) else cuerpo
+            else:
+                datos_envio = json.dumps(cuerpo, ensure_ascii=False, default=str).encode("utf-8")
+                cabeceras.setdefault("Content-Type", "application/json")
+        respuesta = cliente.request(metodo, url_final, body=datos_envio, headers=cabeceras)
+        registro["status"] = respuesta.status
+        registro["datos"] = _cuerpo_respuesta(respuesta)
+        if respuesta.status >= 400:
+            registro.update(estado="error", error=f"HTTP {respuesta.status}")
+    except Exception as e:
+        registro.update(estado="error", error=str(e))
+    registro["segundos"] = round(time.perf_counter() - inicio, 3)
+    return registro
+
+
+def solicitar_varias(cliente: ClienteHTTP, peticiones: List[Dict[str, Any]],
+                     max_workers: int = 4) -> List[Dict[str, Any]]:
+    """
+    Ejecuta peticiones (dicts con los argumentos de `solicitar`) con a lo
+    sumo `max_workers` en vuelo. Devuelve los registros en el orden de entrada.
+    """
+    if not peticiones:
+        return []
+
+    def tarea(peticion: Dict[str, Any]) -> Dict[str, Any]:
+        return solicitar(cliente, **peticion)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(peticiones)))) as ejecutor:
+        return list(ejecutor.map(propagate_token(tarea), peticiones))
+
+
+def extraer_ruta(datos: Any, ruta: Optional[str]) -> Any:
+    """Baja por claves separadas por punto: 'data.items' → datos['data']['items']."""
+    for clave in [c for c in (ruta or "").split(".") if c]:
+        if isinstance(datos, list) and clave.isdigit():
+            datos = datos[int(clave)]
+        elif isinstance(datos, dict) and clave in datos:
+            datos = datos[clave]
+        else:
+            raise KeyError(f"La respuesta no contiene '{ruta}'")
+    return datos
+
+
+def json_a_dataframe(datos: Any, ruta: Optional[str] = None) -> pd.DataFrame:
+    """
+    Convierte una respuesta JSON en tabla.
+
+    Una lista da una fila por elemento y un objeto una sola fila; los
+    objetos anidados se aplanan a columnas 'padre.hijo'.
+    """
+    datos = extraer_ruta(datos, ruta)
+    if datos is None:
+        return pd.DataFrame()
+    if not isinstance(datos, list):
+        datos = [datos]
+    if datos and not all(isinstance(d, dict) for d in datos):
+        return pd.DataFrame({"valor": datos})
+    return registros_a_dataframe(datos)
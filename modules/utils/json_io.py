@@ -0,0 +1,165 @@
+"""
+Lectura y escritura de JSON Lines por bloques.
+
+Cada línea del archivo es un registro; se leen de a `chunk_filas` registros
+y se aplanan con json_normalize, de modo que un JSONL grande se procesa con
+el mismo mecanismo de planes diferidos que un CSV. Si está instalado
+'orjson' se usa para decodificar/codificar, si no el módulo json estándar.
+"""
+import json
+import os
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import pandas as pd
+
+from modules.core.cancellation import checkpoint
+from modules.utils.query_plan import LazyFrame, Fuente, CHUNK_FILAS
+from modules.utils.data_io import abrir_entrada, abrir_salida
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+SEPARADOR_ANIDADO = "."
+
+
+def _decodificar(linea: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(linea)
+    return json.loads(linea)
+
+
+def _codificar(registro: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(registro, default=str).decode("utf-8")
+    return json.dumps(registro, ensure_ascii=False, default=str)
+
+
+def leer_registros(ruta: str, chunk_filas: int = CHUNK_FILAS) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Produce listas de hasta `chunk_filas` registros de un archivo JSONL.
+
+    Un archivo .json con un arreglo en la raíz también se acepta, pero se
+    decodifica completo antes de dividirlo en bloques.
+    """
+    if not os.path.exists(ruta):
+        raise FileNotFoundError(f"No se encontró el archivo: {ruta}")
+
+    base = ruta
+    for extension in (".gz", ".zst", ".xz"):
+        if base.lower().endswith(extension):
+            base = base[:-len(extension)]
+
+    with abrir_entrada(ruta) as f:
+        if base.lower().endswith(".json"):
+            contenido = _decodificar(f.read())
+            registros = contenido if isinstance(contenido, list) else [contenido]
+            for inicio in range(0, len(registros), chunk_filas):
+                yield registros[inicio:inicio + chunk_filas]
+            return
+
+        bloque = []
+        for numero, linea in enumerate(f, start=1):
+            if not linea.strip():
+                continue
+            try:
+                bloque.append(_decodificar(linea))
+            except ValueError as e:
+                raise ValueError(f"JSON inválido en la línea {numero} de {ruta}: {e}")
+            if len(bloque) >= chunk_filas:
+                yield bloque
+                bloque = []
+        if bloque:
+            yield bloque
+
+
+def registros_a_dataframe(registros: List[Any], columnas: Optional[List[str]] = None,
+                          aplanar: bool = True) -> pd.DataFrame:
+    """
+    Convierte registros en DataFrame.
+
+    Con aplanar los objetos anidados pasan a columnas 'padre.hijo'. Con
+    columnas el resultado tiene exactamente esas columnas (las ausentes
+    quedan vacías), así todos los bloques comparten el mismo esquema.
+    """
+    if aplanar:
+        df = pd.json_normalize(registros, sep=SEPARADOR_ANIDADO)
+    else:
+        df = pd.DataFrame.from_records(registros)
+    if columnas:
+        df = df.reindex(columns=columnas)
+    return df
+
+
+class FuenteJSONL(Fuente):
+    """Scan de un archivo JSONL en bloques de registros aplanados."""
+
+    tipo = "jsonl"
+
+    def __init__(self, ruta: str, columnas: Optional[List[str]] = None, aplanar: bool = True):
+        if not os.path.exists(ruta):
+            raise FileNotFoundError(f"No se encontró el archivo: {ruta}")
+        self.ruta = ruta
+        self.columnas = list(columnas) if columnas else None
+        self.aplanar = aplanar
+
+    def leer_bloques(self, columnas=None, chunk_filas=CHUNK_FILAS):
+        seleccion = list(columnas) if columnas else self.columnas
+        for registros in leer_registros(self.ruta, chunk_filas):
+            yield registros_a_dataframe(registros, seleccion, self.aplanar)
+
+    def columnas_conocidas(self) -> Optional[List[str]]:
+        return self.columnas
+
+    def describir(self) -> str:
+        return f"jsonl({os.path.basename(self.ruta)})"
+
+
+def leer_jsonl(ruta: str, columnas: Optional[List[str]] = None, aplanar: bool = True,
+               diferido: bool = False) -> Union[pd.DataFrame, LazyFrame]:
+    """Lee un JSONL completo, o devuelve un plan diferido que lo lee por bloques."""
+    plan = LazyFrame(FuenteJSONL(ruta, columnas, aplanar))
+    if diferido:
+        return plan
+    return plan.collect()
+
+
+def escribir_jsonl(datos: Any, ruta_destino: str, compresion: Optional[str] = "auto",
+                   anexar: bool = False, chunk_filas: int = CHUNK_FILAS) -> int:
+    """
+    Escribe registros en JSONL de forma incremental y devuelve cuántos escribió.
+
+    Acepta DataFrame, plan diferido (bloque a bloque), lista de registros o
+    un valor suelto. Cada bloque se serializa y se escribe por separado, sin
+    armar el archivo completo en memoria. Con anexar se agrega al final.
+    """
+    carpeta = os.path.dirname(ruta_destino)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+
+    if isinstance(datos, LazyFrame):
+        bloques = datos.iter_chunks(chunk_filas)
+    elif isinstance(datos, pd.DataFrame):
+        bloques = (datos.iloc[i:i + chunk_filas] for i in range(0, len(datos), chunk_filas))
+    else:
+        bloques = None
+        registros = datos if isinstance(datos, (list, tuple)) else [datos]
+
+    escritos = 0
+    with abrir_salida(ruta_destino, compresion, anexar=anexar) as f:
+        if bloques is None:
+            for registro in registros:
+                f.write(_codificar(registro) + "\n")
+                escritos += 1
+        else:
+            for bloque in bloques:
+                checkpoint()
+                if bloque.empty:
+                    continue
+                # to_json ya convierte NaN a null y fechas a ISO
+                texto = bloque.to_json(orient="records", lines=True, force_ascii=False, date_format="iso")
+                f.write(texto if texto.endswith("\n") else texto + "\n")
+                escritos += len(bloque)
+    return escritos
@@ -0,0 +1,509 @@
+"""
+Planes de consulta diferidos sobre DataFrames.
+
+Un LazyFrame describe una cadena scan → filtro → proyección → agregación → orden
+sin materializar DataFrames intermedios. El plan se optimiza (empuje de filtros
+y columnas hacia el lector, pasadas fusionadas por bloque) y solo se ejecuta
+cuando un escritor o una vista previa necesitan datos concretos.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+import os
+
+import pandas as pd
+
+from modules.core.cancellation import checkpoint
+
+
+# Tamaño de bloque por defecto para lecturas en streaming
+CHUNK_FILAS = 100_000
+
+# Funciones de agregación soportadas (nombre → parciales combinables)
+AGREGACIONES = {
+    'suma': ('sum',),
+    'conteo': ('count',),
+    'min': ('min',),
+    'max': ('max',),
+    'promedio': ('sum', 'count'),
+}
+
+OPERADORES = ('==', '!=', '>', '>=', '<', '<=', 'contiene', 'en', 'nulo', 'no_nulo')
+
+
+@dataclass(frozen=True)
+class Filtro:
+    """Predicado simple sobre una columna."""
+    columna: str
+    operador: str
+    valor: Any = None
+
+    def columnas(self) -> List[str]:
+        return [self.columna]
+
+    def evaluar(self, df: pd.DataFrame) -> pd.Series:
+        """Devuelve la máscara booleana del predicado sobre el bloque."""
+        serie = df[self.columna]
+        op = self.operador
+        if op == '==':
+            return serie == self.valor
+        if op == '!=':
+            return serie != self.valor
+        if op == '>':
+            return serie > self.valor
+        if op == '>=':
+            return serie >= self.valor
+        if op == '<':
+            return serie < self.valor
+        if op == '<=':
+            return serie <= self.valor
+        if op == 'contiene':
+            return serie.astype(str).str.contains(str(self.valor), regex=False, na=False)
+        if op == 'en':
+            return serie.isin(list(self.valor))
+        if op == 'nulo':
+            return serie.isna()
+        if op == 'no_nulo':
+            return serie.notna()
+        raise ValueError(f"Operador no soportado: {op}")
+
+
+@dataclass(frozen=True)
+class Proyeccion:
+    """Selección de columnas."""
+    columnas_salida: Tuple[str, ...]
+
+    def columnas(self) -> List[str]:
+        return list(self.columnas_salida)
+
+
+@dataclass(frozen=True)
+class Agregacion:
+    """Agrupación por columnas con funciones de agregación."""
+    por: Tuple[str, ...]
+    funciones: Tuple[Tuple[str, str], ...]  # (columna, funcion)
+
+    def columnas(self) -> List[str]:
+        return list(self.por) + [col for col, _ in self.funciones]
+
+    def nombres_salida(self) -> List[str]:
+        return list(self.por) + [f"{col}_{func}" for col, func in self.funciones]
+
+
+@dataclass(frozen=True)
+class Orden:
+    """Ordenamiento por una o más columnas."""
+    por: Tuple[str, ...]
+    ascendente: Union[bool, Tuple[bool, ...]] = True
+
+    def columnas(self) -> List[str]:
+        return list(self.por)
+
+    def direcciones(self) -> List[bool]:
+        if isinstance(self.ascendente, tuple):
+            return list(self.ascendente)
+        return [self.ascendente] * len(self.por)
+
+    def seguido_de(self, siguiente: 'Orden') -> 'Orden':
+        """
+        Orden equivalente a aplicar `self` y luego `siguiente` (estable):
+        manda `siguiente` y los empates conservan el orden de `self`.
+        """
+        por = list(siguiente.por)
+        direcciones = siguiente.direcciones()
+        for col, asc in zip(self.por, self.direcciones()):
+            if col not in por:
+                por.append(col)
+                direcciones.append(asc)
+        return Orden(tuple(por), tuple(direcciones))
+
+
+@dataclass
+class PlanFisico:
+    """Resultado de optimizar la lista lógica de operaciones."""
+    columnas_scan: Optional[List[str]] = None
+    filtros: List[Filtro] = field(default_factory=list)
+    proyeccion: Optional[List[str]] = None
+    orden: Optional[Orden] = None
+    proyeccion_final: Optional[List[str]] = None
+    agregacion: Optional[Agregacion] = None
+    posteriores: List[Any] = field(default_factory=list)
+
+    @property
+    def es_streaming(self) -> bool:
+        """True si el resultado puede producirse bloque a bloque."""
+        return self.agregacion is None and self.orden is None and not self.posteriores
+
+
+class Fuente:
+    """Origen de datos de un plan (scan)."""
+
+    tipo = "base"
+
+    def leer_bloques(self, columnas: Optional[List[str]] = None,
+                     chunk_filas: int = CHUNK_FILAS) -> Iterator[pd.DataFrame]:
+        raise NotImplementedError
+
+    def columnas_conocidas(self) -> Optional[List[str]]:
+        return None
+
+    def describir(self) -> str:
+        return self.tipo
+
+
+class FuenteCSV(Fuente):
+    """Scan de un CSV en bloques con columnas empujadas a `usecols`."""
+
+    tipo = "csv"
+
+    def __init__(self, ruta: str, encoding: str = "utf-8", **opciones):
+        if not os.path.exists(ruta):
+            raise FileNotFoundError(f"No se encontró el archivo: {ruta}")
+        self.ruta = ruta
+        self.encoding = encoding
+        self.opciones = {k: v for k, v in opciones.items() if v not in (None, "")}
+
+    def leer_bloques(self, columnas=None, chunk_filas=CHUNK_FILAS):
+        usecols = list(columnas) if columnas else None
+        producidos = 0
+        try:
+            for bloque in self._leer(self.encoding, usecols, chunk_filas):
+                producidos += 1
+                yield bloque
+        except UnicodeDecodeError:
+            if producidos:
+                raise
+            # Mismo fallback que leer_csv: reintentar en latin-1
+            yield from self._leer('latin-1', usecols, chunk_filas)
+
+    def _leer(self, encoding, usecols, chunk_filas):
+        with pd.read_csv(self.ruta, encoding=encoding, usecols=usecols,
+                         chunksize=chunk_filas, **self.opciones) as lector:
+            for bloque in lector:
+                yield bloque
+
+    def describir(self) -> str:
+        return f"csv({os.path.basename(self.ruta)})"
+
+
+class FuenteExcel(Fuente):
+    """Scan de una hoja Excel; solo admite empuje de columnas."""
+
+    tipo = "excel"
+
+    def __init__(self, ruta: str, hoja: Any = 0):
+        if not os.path.exists(ruta):
+            raise FileNotFoundError(f"No se encontró el archivo: {ruta}")
+        self.ruta = ruta
+        self.hoja = hoja
+
+    def leer_bloques(self, columnas=None, chunk_filas=CHUNK_FILAS):
+        yield pd.read_excel(self.ruta, sheet_name=self.hoja, engine="openpyxl",
+                            usecols=list(columnas) if columnas else None)
+
+    def describir(self) -> str:
+        return f"excel({os.path.basename(self.ruta)}:{self.hoja})"
+
+
+class FuenteDataFrame(Fuente):
+    """Scan de un DataFrame ya cargado en memoria."""
+
+    tipo = "dataframe"
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+    def leer_bloques(self, columnas=None, chunk_filas=CHUNK_FILAS):
+        # Sin copia: la proyección se aplica junto al filtro en la pasada fusionada
+        yield self.df
+
+    def columnas_conocidas(self):
+        return list(self.df.columns)
+
+    def describir(self) -> str:
+        return f"dataframe({len(self.df)} filas)"
+
+
+class LazyFrame:
+    """
+    Consulta diferida e inmutable sobre una fuente de datos.
+
+    Cada operación devuelve un LazyFrame nuevo; nada se lee hasta llamar a
+    `collect()`, `head()` o `iter_chunks()`.
+    """
+
+    def __init__(self, fuente: Fuente, operaciones: Tuple[Any, ...] = ()):
+        self.fuente = fuente
+        self.operaciones = tuple(operaciones)
+
+    # ---- Construcción -------------------------------------------------
+
+    @classmethod
+    def desde_csv(cls, ruta: str, **opciones) -> 'LazyFrame':
+        return cls(FuenteCSV(ruta, **opciones))
+
+    @classmethod
+    def desde_excel(cls, ruta: str, hoja: Any = 0) -> 'LazyFrame':
+        return cls(FuenteExcel(ruta, hoja))
+
+    @classmethod
+    def desde_dataframe(cls, df: pd.DataFrame) -> 'LazyFrame':
+        return cls(FuenteDataFrame(df))
+
+    @classmethod
+    def desde(cls, datos: Any) -> 'LazyFrame':
+        """Envuelve un DataFrame o devuelve el LazyFrame tal cual."""
+        if isinstance(datos, LazyFrame):
+            return datos
+        if isinstance(datos, pd.DataFrame):
+            return cls.desde_dataframe(datos)
+        if hasattr(datos, "como_plan"):
+            # Variables diferidas propias (p. ej. ArchivoTexto) exponen su propio scan
+            return datos.como_plan()
+        raise TypeError("Se esperaba un DataFrame o un plan diferido")
+
+    def _agregar(self, operacion: Any) -> 'LazyFrame':
+        visibles = self.columnas()
+        if visibles is not None:
+            faltantes = [c for c in operacion.columnas() if c not in visibles]
+            if faltantes:
+                raise KeyError(f"Columnas no disponibles en el plan: {', '.join(faltantes)}")
+        return LazyFrame(self.fuente, self.operaciones + (operacion,))
+
+    def filtrar(self, columna: str, operador: str, valor: Any = None) -> 'LazyFrame':
+        if operador not in OPERADORES:
+            raise ValueError(f"Operador no soportado: {operador}")
+        if operador == 'en' and isinstance(valor, str):
+            valor = tuple(v.strip() for v in valor.split(','))
+        elif operador == 'en':
+            valor = tuple(valor)
+        return self._agregar(Filtro(columna, operador, valor))
+
+    def seleccionar(self, columnas: List[str]) -> 'LazyFrame':
+        return self._agregar(Proyeccion(tuple(columnas)))
+
+    def agrupar(self, por: List[str], funciones: List[Tuple[str, str]]) -> 'LazyFrame':
+        for _, func in funciones:
+            if func not in AGREGACIONES:
+                raise ValueError(f"Agregación no soportada: {func}")
+        return self._agregar(Agregacion(tuple(por), tuple(funciones)))
+
+    def ordenar(self, por: List[str], ascendente: bool = True) -> 'LazyFrame':
+        return self._agregar(Orden(tuple(por), ascendente))
+
+    def columnas(self) -> Optional[List[str]]:
+        """Columnas visibles al final del plan, si se conocen sin leer datos."""
+        visibles = self.fuente.columnas_conocidas()
+        for op in self.operaciones:
+            if isinstance(op, Proyeccion):
+                visibles = op.columnas()
+            elif isinstance(op, Agregacion):
+                visibles = op.nombres_salida()
+        return visibles
+
+    # ---- Optimización -------------------------------------------------
+
+    def optimizar(self) -> PlanFisico:
+        """
+        Traduce las operaciones lógicas a un plan físico.
+
+        Los filtros anteriores a la primera agregación se fusionan y empujan
+        al scan (los ordenamientos no cambian qué filas pasan), los
+        ordenamientos sucesivos se combinan en uno solo equivalente, la
+        última proyección se aplica en la misma pasada y el lector solo
+        carga las columnas que el plan realmente usa.
+        """
+        plan = PlanFisico()
+        corte = next((i for i, op in enumerate(self.operaciones)
+                      if isinstance(op, Agregacion)), len(self.operaciones))
+        previas = self.operaciones[:corte]
+
+        for op in previas:
+            if isinstance(op, Filtro):
+                plan.filtros.append(op)
+            elif isinstance(op, Proyeccion):
+                plan.proyeccion = op.columnas()
+            elif isinstance(op, Orden):
+                plan.orden = op if plan.orden is None else plan.orden.seguido_de(op)
+
+        if corte < len(self.operaciones):
+            plan.agregacion = self.operaciones[corte]
+            plan.posteriores = list(self.operaciones[corte + 1:])
+            # Ordenar antes de agrupar no altera el resultado
+            plan.orden = None
+            plan.proyeccion = None
+        elif plan.orden is not None and plan.proyeccion is not None:
+            # Ordenar por columnas descartadas exige conservarlas hasta el final
+            extra = [c for c in plan.orden.columnas() if c not in plan.proyeccion]
+            if extra:
+                plan.proyeccion_final = plan.proyeccion
+                plan.proyeccion = plan.proyeccion + extra
+
+        necesarias: Optional[List[str]] = None
+        if plan.agregacion is not None:
+            necesarias = plan.agregacion.columnas()
+        elif plan.proyeccion is not None:
+            necesarias = list(plan.proyeccion)
+        if necesarias is not None:
+            for f in plan.filtros:
+                necesarias += f.columnas()
+            plan.columnas_scan = list(dict.fromkeys(necesarias))
+        return plan
+
+    def explicar(self) -> str:
+        """Descripción legible del plan optimizado."""
+        plan = self.optimizar()
+        partes = [f"scan {self.fuente.describir()}"]
+        if plan.columnas_scan:
+            partes[0] += f" [{', '.join(plan.columnas_scan)}]"
+        if plan.filtros:
+            partes.append("filtro(" + " y ".join(
+                f"{f.columna} {f.operador} {f.valor!r}" for f in plan.filtros) + ")")
+        if plan.proyeccion:
+            partes.append(f"proyección({', '.join(plan.proyeccion)})")
+        if plan.agregacion:
+            partes.append(f"agregación({', '.join(plan.agregacion.nombres_salida())})")
+        if plan.orden:
+            partes.append(f"orden({', '.join(plan.orden.por)})")
+        for op in plan.posteriores:
+            partes.append(type(op).__name__.lower())
+        return " → ".join(partes)
+
+    def __repr__(self) -> str:
+        return f"LazyFrame<{self.explicar()}>"
+
+    # ---- Ejecución ----------------------------------------------------
+
+    def iter_chunks(self, chunk_filas: int = CHUNK_FILAS) -> Iterator[pd.DataFrame]:
+        """
+        Produce el resultado bloque a bloque.
+
+        Si el plan necesita ver todos los datos (agregación u orden) se
+        produce un único bloque con el resultado completo.
+        """
+        plan = self.optimizar()
+        if not plan.es_streaming:
+            yield self._ejecutar(plan, chunk_filas)
+            return
+        yield from self._escanear(plan, chunk_filas)
+
+    def collect(self, chunk_filas: int = CHUNK_FILAS) -> pd.DataFrame:
+        """Ejecuta el plan y devuelve un DataFrame concreto."""
+        return self._ejecutar(self.optimizar(), chunk_filas)
+
+    def head(self, n: int = 10, chunk_filas: int = CHUNK_FILAS) -> pd.DataFrame:
+        """Primeras `n` filas; en planes de streaming detiene el scan temprano."""
+        plan = self.optimizar()
+        if not plan.es_streaming:
+            return self._ejecutar(plan, chunk_filas).head(n)
+        bloques, total = [], 0
+        for bloque in self._escanear(plan, min(chunk_filas, max(n, 1_000))):
+            bloques.append(bloque)
+            total += len(bloque)
+            if total >= n:
+                break
+        if not bloques:
+            return pd.DataFrame(columns=plan.columnas_scan or [])
+        return pd.concat(bloques, ignore_index=True).head(n)
+
+    def _escanear(self, plan: PlanFisico, chunk_filas: int) -> Iterator[pd.DataFrame]:
+        """
+        Lee la fuente aplicando filtros y proyección en una sola pasada por
+        bloque. Entre bloques se revisa la cancelación/pausa del flujo.
+        """
+        for bloque in self.fuente.leer_bloques(plan.columnas_scan, chunk_filas):
+            checkpoint()
+            mascara = None
+            for f in plan.filtros:
+                m = f.evaluar(bloque)
+                mascara = m if mascara is None else (mascara & m)
+            if mascara is not None and plan.proyeccion is not None:
+                bloque = bloque.loc[mascara, plan.proyeccion]
+            elif mascara is not None:
+                bloque = bloque.loc[mascara]
+            elif plan.proyeccion is not None:
+                bloque = bloque[plan.proyeccion]
+            yield bloque
+
+    def _ejecutar(self, plan: PlanFisico, chunk_filas: int) -> pd.DataFrame:
+        if plan.agregacion is not None:
+            df = self._agregar_por_bloques(plan, chunk_filas)
+            for op in plan.posteriores:
+                df = _aplicar(df, op)
+            return df
+
+        bloques = list(self._escanear(plan, chunk_filas))
+        if not bloques:
+            df = pd.DataFrame(columns=plan.proyeccion or plan.columnas_scan or [])
+        elif len(bloques) == 1:
+            df = bloques[0]
+        else:
+            df = pd.concat(bloques, ignore_index=True, copy=False)
+        if plan.orden is not None:
+            df = _aplicar(df, plan.orden)
+        if plan.proyeccion_final is not None:
+            df = df[plan.proyeccion_final]
+        if isinstance(self.fuente, FuenteDataFrame) and df is self.fuente.df:
+            # No devolver un alias mutable de la variable original
+            df = df.copy()
+        return df
+
+    def _agregar_por_bloques(self, plan: PlanFisico, chunk_filas: int) -> pd.DataFrame:
+        """
+        Agregación parcial por bloque y combinación final.
+
+        Cada bloque filtrado se reduce a una fila por grupo, así nunca se
+        materializa el conjunto filtrado completo.
+        """
+        agg = plan.agregacion
+        por = list(agg.por) or ['__grupo']
+        parciales_spec = {}
+        for col, func in agg.funciones:
+            for parcial in AGREGACIONES[func]:
+                parciales_spec[f"{col}__{parcial}"] = (col, parcial)
+
+        parciales: List[pd.DataFrame] = []
+        for bloque in self._escanear(plan, chunk_filas):
+            if not agg.por:
+                bloque = bloque.assign(__grupo=0)
+            parcial = bloque.groupby(por, dropna=False).agg(**parciales_spec)
+            parciales.append(parcial)
+            if len(parciales) >= 32:
+                parciales = [_combinar_parciales(parciales, parciales_spec)]
+
+        if parciales:
+            combinado = _combinar_parciales(parciales, parciales_spec)
+        else:
+            vacio = pd.MultiIndex.from_arrays([[] for _ in por], names=por)
+            combinado = pd.DataFrame(columns=list(parciales_spec), index=vacio)
+
+        resultado = pd.DataFrame(index=combinado.index)
+        for col, func in agg.funciones:
+            if func == 'promedio':
+                resultado[f"{col}_{func}"] = combinado[f"{col}__sum"] / combinado[f"{col}__count"]
+            else:
+                resultado[f"{col}_{func}"] = combinado[f"{col}__{AGREGACIONES[func][0]}"]
+        resultado = resultado.reset_index()
+        if not agg.por:
+            resultado = resultado.drop(columns=['__grupo'], errors='ignore')
+        return resultado
+
+
+def _combinar_parciales(parciales: List[pd.DataFrame], spec: Dict[str, Tuple[str, str]]) -> pd.DataFrame:
+    """Combina agregados parciales: sumas y conteos se suman, min/max se reducen."""
+    unidos = pd.concat(parciales)
+    combinadores = {nombre: ('sum' if parcial in ('sum', 'count') else parcial)
+                    for nombre, (_, parcial) in spec.items()}
+    return unidos.groupby(level=list(range(unidos.index.nlevels)), dropna=False).agg(combinadores)
+
+
+def _aplicar(df: pd.DataFrame, op: Any) -> pd.DataFrame:
+    """Aplica una operación lógica sobre un DataFrame ya materializado."""
+    if isinstance(op, Filtro):
+        return df.loc[op.evaluar(df)]
+    if isinstance(op, Proyeccion):
+        return df[op.columnas()]
+    if isinstance(op, Orden):
+        return df.sort_values(list(op.por), ascending=op.direcciones(), kind='stable', ignore_index=True)
+    if isinstance(op, Agregacion):
+        return LazyFrame.desde_dataframe(df)._agregar(op).collect()
+    raise TypeError(f"Operación desconocida: {op!r}")
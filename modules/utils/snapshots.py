@@ -0,0 +1,127 @@
+"""
+Índice persistente de carpetas para detectar cambios entre ejecuciones.
+
+Guarda en SQLite ruta, tamaño, fecha de modificación y (opcionalmente) hash
+de cada archivo listado, de modo que un flujo programado procese solo los
+archivos nuevos, modificados o eliminados desde la última instantánea.
+"""
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from modules.utils.data_io import carpeta_escanear, calcular_hash
+
+
+RUTA_INDICE_DEFECTO = os.path.join(os.path.expanduser("~"), ".flowrunner", "indice_carpetas.sqlite")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS archivos (
+    clave TEXT NOT NULL,
+    relativa TEXT NOT NULL,
+    tamano INTEGER NOT NULL,
+    modificado REAL NOT NULL,
+    hash TEXT,
+    PRIMARY KEY (clave, relativa)
+)
+"""
+
+
+class IndiceCarpetas:
+    """
+    Instantáneas de carpetas almacenadas en un archivo SQLite.
+
+    Cada instantánea se identifica por una clave (por defecto carpeta +
+    patrones + recursión), así varios flujos pueden vigilar la misma carpeta
+    con filtros distintos sin pisarse.
+    """
+
+    def __init__(self, ruta_indice: str = RUTA_INDICE_DEFECTO):
+        self.ruta_indice = ruta_indice
+        carpeta = os.path.dirname(ruta_indice)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        with self._conectar() as con:
+            con.execute(ESQUEMA)
+
+    @contextmanager
+    def _conectar(self) -> Iterator[sqlite3.Connection]:
+        """Conexión con commit/rollback automático que se cierra al salir."""
+        con = sqlite3.connect(self.ruta_indice)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    @staticmethod
+    def clave_para(carpeta: str, patrones: Any = "*", recursivo: bool = False) -> str:
+        if not isinstance(patrones, str):
+            patrones = ";".join(patrones)
+        return f"{os.path.abspath(carpeta)}|{patrones}|{int(bool(recursivo))}"
+
+    def cargar(self, clave: str) -> Dict[str, Dict[str, Any]]:
+        """Devuelve la instantánea guardada: {relativa: {tamano, modificado, hash}}."""
+        with self._conectar() as con:
+            filas = con.execute(
+                "SELECT relativa, tamano, modificado, hash FROM archivos WHERE clave = ?", (clave,)
+            ).fetchall()
+        return {rel: {"tamano": tam, "modificado": mod, "hash": h} for rel, tam, mod, h in filas}
+
+    def guardar(self, clave: str, registros: List[Dict[str, Any]]) -> None:
+        """Reemplaza la instantánea de la clave en una sola transacción."""
+        with self._conectar() as con:
+            con.execute("DELETE FROM archivos WHERE clave = ?", (clave,))
+            con.executemany(
+                "INSERT INTO archivos (clave, relativa, tamano, modificado, hash) VALUES (?, ?, ?, ?, ?)",
+                ((clave, r["relativa"], r["tamano"], r["modificado"], r.get("hash")) for r in registros)
+            )
+
+    def detectar_cambios(self, carpeta: str, patrones: Any = "*", recursivo: bool = False,
+                         usar_hash: bool = False, actualizar: bool = True,
+                         clave: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Compara la carpeta con la última instantánea.
+
+        Devuelve un registro por archivo cambiado con 'estado' igual a
+        'nuevo', 'modificado' o 'eliminado'. Solo se calcula el hash de los
+        archivos nuevos o cuyo tamaño/fecha cambió; con hash, un archivo
+        tocado pero con el mismo contenido no se informa como modificado.
+        """
+        clave = clave or self.clave_para(carpeta, patrones, recursivo)
+        previos = self.cargar(clave)
+        actuales = []
+        cambios = []
+
+        for registro in carpeta_escanear(carpeta, patrones, recursivo=recursivo):
+            previo = previos.pop(registro["relativa"], None)
+            sin_cambios = (previo is not None
+                           and previo["tamano"] == registro["tamano"]
+                           and previo["modificado"] == registro["modificado"])
+
+            if sin_cambios:
+                registro["hash"] = previo["hash"]
+            elif usar_hash:
+                registro["hash"] = calcular_hash(registro["ruta"])
+                if previo is not None and previo["hash"] == registro["hash"]:
+                    sin_cambios = True
+
+            actuales.append(registro)
+            if not sin_cambios:
+                cambios.append(dict(registro, estado="nuevo" if previo is None else "modificado"))
+
+        # Lo que quedó en la instantánea previa ya no existe en la carpeta
+        for relativa, previo in previos.items():
+            cambios.append({
+                "ruta": os.path.join(carpeta, relativa),
+                "nombre": os.path.basename(relativa),
+                "relativa": relativa,
+                "tamano": previo["tamano"],
+                "modificado": previo["modificado"],
+                "hash": previo["hash"],
+                "estado": "eliminado",
+            })
+
+        if actualizar:
+            self.guardar(clave, actuales)
+        return cambios
@@ -0,0 +1,273 @@
+"""
+Lectura diferida de archivos de texto grandes (logs) mediante mmap.
+
+Se construye un índice con el desplazamiento de inicio de cada línea y se
+guarda en disco, así las ejecuciones siguientes abren el archivo sin
+recorrerlo. Con el índice se pueden leer rangos de líneas, buscar con
+expresiones regulares o iterar sin cargar el archivo completo en memoria.
+"""
+import hashlib
+import mmap
+import os
+import re
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.utils.query_plan import LazyFrame, Fuente, CHUNK_FILAS
+
+
+CARPETA_INDICES_DEFECTO = os.path.join(os.path.expanduser("~"), ".flowrunner", "indices_lineas")
+
+BLOQUE_INDEXADO = 16 * 1024 * 1024
+COLA_VERIFICACION = 4096
+
+
+def _huella_cola(mapa: Any, fin: int) -> str:
+    """Hash de los últimos bytes antes de `fin`; detecta si el archivo solo creció."""
+    inicio = max(0, fin - COLA_VERIFICACION)
+    return hashlib.sha1(mapa[inicio:fin]).hexdigest()
+
+
+class ArchivoTexto:
+    """
+    Archivo de texto indexado por líneas.
+
+    Es el valor que queda en la variable del flujo: no guarda el contenido,
+    solo la ruta y el arreglo de inicios de línea. Cada operación mapea el
+    archivo y decodifica únicamente las líneas pedidas.
+    """
+
+    def __init__(self, ruta: str, encoding: str = "utf-8",
+                 carpeta_indices: Optional[str] = CARPETA_INDICES_DEFECTO):
+        if not os.path.exists(ruta):
+            raise FileNotFoundError(f"No se encontró el archivo: {ruta}")
+        self.ruta = ruta
+        self.encoding = encoding
+        self.carpeta_indices = carpeta_indices
+        self.tamano = 0
+        self.inicios = np.zeros(0, dtype=np.int64)
+        self.indice_desde_cache = False
+        self._indexar()
+
+    # ---- índice ----
+
+    def _ruta_indice(self) -> Optional[str]:
+        if not self.carpeta_indices:
+            return None
+        clave = hashlib.sha1(os.path.abspath(self.ruta).encode("utf-8")).hexdigest()
+        return os.path.join(self.carpeta_indices, f"{clave}.npz")
+
+    def _indexar(self) -> None:
+        """
+        Carga el índice cacheado o lo construye.
+
+        Si el archivo solo creció desde la última vez (log que se sigue
+        escribiendo), se indexan únicamente los bytes nuevos.
+        """
+        estado = os.stat(self.ruta)
+        self.tamano = estado.st_size
+        ruta_indice = self._ruta_indice()
+
+        inicios = None
+        desde = 0
+        if ruta_indice and os.path.exists(ruta_indice):
+            try:
+                with np.load(ruta_indice) as cache:
+                    tamano_previo = int(cache["tamano"])
+                    mtime_previo = int(cache["mtime"])
+                    huella_previa = str(cache["huella"])
+                    inicios_previos = cache["inicios"]
+                if tamano_previo == self.tamano and mtime_previo == estado.st_mtime_ns:
+                    self.inicios = inicios_previos
+                    self.indice_desde_cache = True
+                    return
+                if 0 < tamano_previo < self.tamano:
+                    with self._mapa() as mapa:
+                        if _huella_cola(mapa, tamano_previo) == huella_previa:
+                            inicios, desde = inicios_previos, tamano_previo
+            except Exception:
+                inicios = None
+
+        nuevos = self._escanear_inicios(desde)
+        if inicios is None:
+            self.inicios = nuevos
+        else:
+            # La última línea previa pudo no tener salto: su inicio ya está en el índice
+            if len(nuevos) and len(inicios) and nuevos[0] == desde and not self._termina_en_salto(desde):
+                nuevos = nuevos[1:]
+            self.inicios = np.concatenate([inicios, nuevos])
+        self._guardar_indice(ruta_indice, estado.st_mtime_ns)
+
+    def _termina_en_salto(self, posicion: int) -> bool:
+        with self._mapa() as mapa:
+            return mapa[posicion - 1:posicion] == b"\n"
+
+    def _escanear_inicios(self, desde: int = 0) -> np.ndarray:
+        """Busca los saltos de línea por bloques con numpy directamente sobre el mmap."""
+        if self.tamano == 0:
+            return np.zeros(0, dtype=np.int64)
+        partes = [np.array([desde], dtype=np.int64)]
+        with self._mapa() as mapa:
+            posicion = desde
+            while posicion < self.tamano:
+                cantidad = min(BLOQUE_INDEXADO, self.tamano - posicion)
+                bloque = np.frombuffer(mapa, dtype=np.uint8, count=cantidad, offset=posicion)
+                saltos = np.flatnonzero(bloque == 10).astype(np.int64)
+                partes.append(saltos + posicion + 1)
+                del bloque
+                posicion += cantidad
+        inicios = np.concatenate(partes)
+        # Un salto al final del archivo no abre una línea nueva
+        if len(inicios) and inicios[-1] >= self.tamano:
+            inicios = inicios[:-1]
+        return inicios
+
+    def _guardar_indice(self, ruta_indice: Optional[str], mtime_ns: int) -> None:
+        if not ruta_indice:
+            return
+        try:
+            os.makedirs(os.path.dirname(ruta_indice), exist_ok=True)
+            huella = ""
+            if self.tamano:
+                with self._mapa() as mapa:
+                    huella = _huella_cola(mapa, self.tamano)
+            temporal = ruta_indice + ".tmp.npz"
+            np.savez(temporal, inicios=self.inicios, tamano=self.tamano, mtime=mtime_ns, huella=huella)
+            os.replace(temporal, ruta_indice)
+        except OSError as e:
+            # Sin caché se sigue funcionando; solo se reindexa la próxima vez
+            print(f"[TEXTO] No se pudo guardar el índice de líneas: {e}")
+
+    # ---- acceso ----
+
+    @contextmanager
+    def _mapa(self) -> Iterator[Any]:
+        """Mapeo de solo lectura que se libera al salir (no deja el archivo bloqueado)."""
+        if self.tamano == 0:
+            yield b""
+            return
+        with open(self.ruta, "rb") as f:
+            mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield mapa
+            finally:
+                mapa.close()
+
+    def __len__(self) -> int:
+        return len(self.inicios)
+
+    def _limites(self, numero: int) -> Tuple[int, int]:
+        inicio = int(self.inicios[numero])
+        fin = int(self.inicios[numero + 1]) if numero + 1 < len(self.inicios) else self.tamano
+        return inicio, fin
+
+    def _decodificar(self, crudo: bytes) -> str:
+        return crudo.rstrip(b"\r\n").decode(self.encoding, errors="replace")
+
+    def _rango(self, inicio: Optional[int], fin: Optional[int]) -> Tuple[int, int]:
+        inicio, fin, _ = slice(inicio, fin).indices(len(self))
+        return inicio, max(inicio, fin)
+
+    def iter_lineas(self, inicio: Optional[int] = None, fin: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """Itera (número, línea) en el rango [inicio, fin) decodificando de a una."""
+        inicio, fin = self._rango(inicio, fin)
+        if inicio >= fin:
+            return
+        with self._mapa() as mapa:
+            for numero in range(inicio, fin):
+                desde, hasta = self._limites(numero)
+                yield numero, self._decodificar(mapa[desde:hasta])
+
+    def lineas(self, inicio: Optional[int] = None, fin: Optional[int] = None) -> List[str]:
+        """Líneas del rango [inicio, fin) como lista de str (índices base 0)."""
+        return [linea for _, linea in self.iter_lineas(inicio, fin)]
+
+    def __getitem__(self, item: Any) -> Any:
+        if isinstance(item, slice):
+            if item.step not in (None, 1):
+                raise ValueError("Solo se admiten rangos contiguos de líneas")
+            return self.lineas(item.start, item.stop)
+        numero = int(item)
+        if numero < 0:
+            numero += len(self)
+        if not 0 <= numero < len(self):
+            raise IndexError("Número de línea fuera de rango")
+        return self.lineas(numero, numero + 1)[0]
+
+    def buscar(self, patron: str, ignorar_mayusculas: bool = False, max_resultados: Optional[int] = None,
+               inicio: Optional[int] = None, fin: Optional[int] = None) -> List[Tuple[int, str]]:
+        """
+        Devuelve (número, línea) de las líneas donde aparece el patrón.
+
+        La expresión se evalúa sobre los bytes mapeados, sin decodificar el
+        archivo; solo se decodifican las líneas que coinciden.
+        """
+        inicio, fin = self._rango(inicio, fin)
+        if inicio >= fin:
+            return []
+        banderas = re.MULTILINE | (re.IGNORECASE if ignorar_mayusculas else 0)
+        expresion = re.compile(patron.encode(self.encoding), banderas)
+        desde_byte = int(self.inicios[inicio])
+        hasta_byte = self._limites(fin - 1)[1]
+
+        resultados = []
+        with self._mapa() as mapa:
+            ultima = -1
+            posicion = desde_byte
+            while posicion <= hasta_byte:
+                coincidencia = expresion.search(mapa, posicion, hasta_byte)
+                if coincidencia is None:
+                    break
+                numero = int(np.searchsorted(self.inicios, coincidencia.start(), side="right")) - 1
+                if numero != ultima:
+                    a, b = self._limites(numero)
+                    resultados.append((numero, self._decodificar(mapa[a:b])))
+                    ultima = numero
+                    if max_resultados and len(resultados) >= max_resultados:
+                        break
+                # Continuar desde la línea siguiente: una línea se informa una sola vez
+                posicion = self._limites(numero)[1]
+        return resultados
+
+    # ---- integración con planes diferidos ----
+
+    def a_dataframe(self, inicio: Optional[int] = None, fin: Optional[int] = None) -> pd.DataFrame:
+        """Rango de líneas como tabla; 'numero' es el número de línea visible (desde 1)."""
+        return lineas_a_dataframe(self.iter_lineas(inicio, fin))
+
+    def como_plan(self) -> LazyFrame:
+        """Plan diferido con columnas numero/linea para filtrar o escribir por bloques."""
+        return LazyFrame(FuenteTexto(self))
+
+    def __repr__(self) -> str:
+        return f"ArchivoTexto({self.ruta!r}, {len(self)} líneas, {self.tamano} bytes)"
+
+
+def lineas_a_dataframe(filas: Any) -> pd.DataFrame:
+    """Convierte pares (índice, línea) en tabla numero/linea con numeración desde 1."""
+    df = pd.DataFrame(list(filas), columns=["numero", "linea"])
+    df["numero"] = df["numero"].astype("int64") + 1
+    return df
+
+
+class FuenteTexto(Fuente):
+    """Scan por bloques de líneas de un ArchivoTexto."""
+
+    tipo = "texto"
+
+    def __init__(self, archivo: ArchivoTexto):
+        self.archivo = archivo
+
+    def leer_bloques(self, columnas=None, chunk_filas=CHUNK_FILAS):
+        for inicio in range(0, len(self.archivo), chunk_filas):
+            bloque = self.archivo.a_dataframe(inicio, inicio + chunk_filas)
+            yield bloque[list(columnas)] if columnas else bloque
+
+    def columnas_conocidas(self) -> Optional[List[str]]:
+        return ["numero", "linea"]
+
+    def describir(self) -> str:
+        return f"texto({os.path.basename(self.archivo.ruta)})"
@@ -4,9 +4,25 @@ Utilidades consolidadas para automatización web.
 """
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.edge.options import Options as EdgeOptions
+from selenium.webdriver.edge.service import Service as EdgeService
+from selenium.webdriver.common.selenium_manager import SeleniumManager
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, SessionNotCreatedException
+import os
+import json
+import shutil
 import time
-from typing import Any, Optional
+import atexit
+import threading
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from modules.core.cancellation import checkpoint, propagate_token
 
 try:
     import pygetwindow as gw
@@ -14,51 +30,676 @@ except ImportError:
     gw = None
 
 
-def crear_driver_chrome() -> webdriver.Chrome:
-    """Crea un driver de Chrome con opciones optimizadas."""
-    options = ChromeOptions()
-    options.add_argument("--start-maximized")
-    options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+@dataclass(frozen=True)
+class PerfilNavegador:
+    """
+    Cómo se inicia una sesión de navegador.
     
-    # Selenium 4.6+ usa Selenium Manager automáticamente
-    driver = webdriver.Chrome(options=options)
-    return driver
+    `bloquear` admite categorías de BLOQUEOS ('imagenes', 'analitica', ...)
+    o patrones de URL propios ('*.mp4', '*tracker.example.com*').
+    """
+    sin_ventana: bool = False
+    bloquear: Tuple[str, ...] = ()
+    
+    def patrones_bloqueados(self) -> List[str]:
+        patrones: List[str] = []
+        for item in self.bloquear:
+            patrones.extend(BLOQUEOS.get(item, (item,)))
+        return list(dict.fromkeys(patrones))
 
 
-def crear_driver_edge() -> webdriver.Edge:
-    """Crea un driver de Edge con opciones optimizadas."""
-    options = EdgeOptions()
-    options.add_argument("--start-maximized")
+BLOQUEOS = {
+    'imagenes': ('*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.bmp', '*.avif'),
+    'medios': ('*.mp4', '*.webm', '*.mp3', '*.ogg', '*.wav', '*.m4a', '*.avi', '*.mov', '*.m3u8'),
+    'fuentes': ('*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'),
+    'estilos': ('*.css',),
+    'analitica': ('*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+                  '*facebook.net*', '*hotjar.com*', '*clarity.ms*', '*segment.io*'),
+}
+
+
+def _configurar_opciones(options: Any, perfil: 'PerfilNavegador') -> None:
+    """Opciones comunes a Chrome y Edge (ambos Chromium)."""
+    # driver.get vuelve con el DOM listo; el resto lo deciden las esperas por condición
+    options.page_load_strategy = "eager"
+    if perfil.sin_ventana:
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1920,1080")
+        # Funciones que un scraping sin ventana no usa
+        for argumento in ("--disable-extensions", "--disable-notifications", "--mute-audio",
+                          "--no-first-run", "--disable-sync", "--disable-background-networking",
+                          "--disable-default-apps"):
+            options.add_argument(argumento)
+    else:
+        options.add_argument("--start-maximized")
     options.add_argument("--disable-blink-features=AutomationControlled")
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    if 'imagenes' in perfil.bloquear:
+        # Además del bloqueo por URL: el motor ni siquiera decodifica imágenes
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+
+def _aplicar_bloqueos(driver: Any, perfil: 'PerfilNavegador') -> None:
+    patrones = perfil.patrones_bloqueados()
+    if not patrones:
+        return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patrones})
+    except Exception as e:
+        # Sin CDP la sesión sigue siendo útil, solo que descarga todo
+        print(f"[WEB] No se pudieron bloquear recursos: {e}")
+
+
+RUTA_CACHE_DRIVERS = os.path.join(os.path.expanduser("~"), ".flowrunner", "navegadores.json")
+
+# Nombre del navegador para Selenium Manager y ejecutable del driver
+_DRIVERS = {
+    "chrome": ("chrome", "chromedriver"),
+    "edge": ("MicrosoftEdge", "msedgedriver"),
+}
+
+_cache_drivers: Optional[Dict[str, Any]] = None
+_cache_lock = threading.Lock()
+
+
+def detectar_navegadores() -> Dict[str, str]:
+    """Rutas de los navegadores instalados: {'chrome': ruta, 'edge': ruta}."""
+    pf = os.environ.get('ProgramFiles', r"C:\Program Files")
+    pf86 = os.environ.get('ProgramFiles(x86)', r"C:\Program Files (x86)")
+    lad = os.environ.get('LOCALAPPDATA', os.path.expanduser(r"~\AppData\Local"))
     
-    driver = webdriver.Edge(options=options)
-    return driver
+    candidatos = {
+        "chrome": [
+            os.path.join(pf, r"Google\Chrome\Application\chrome.exe"),
+            os.path.join(pf86, r"Google\Chrome\Application\chrome.exe"),
+            os.path.join(lad, r"Google\Chrome\Application\chrome.exe"),
+            shutil.which("chrome"),
+            shutil.which("chrome.exe"),
+            shutil.which("google-chrome"),
+        ],
+        "edge": [
+            os.path.join(pf, r"Microsoft\Edge\Application\msedge.exe"),
+            os.path.join(pf86, r"Microsoft\Edge\Application\msedge.exe"),
+            shutil.which("msedge"),
+            shutil.which("msedge.exe"),
+            shutil.which("microsoft-edge"),
+        ],
+    }
+    detectados = {}
+    for nombre, rutas in candidatos.items():
+        ruta = next((r for r in rutas if r and os.path.exists(r)), None)
+        if ruta:
+            detectados[nombre] = ruta
+    return detectados
+
+
+def _cache() -> Dict[str, Any]:
+    """Caché persistente de rutas; se lee del disco una vez por proceso."""
+    global _cache_drivers
+    if _cache_drivers is None:
+        try:
+            with open(RUTA_CACHE_DRIVERS, "r", encoding="utf-8") as f:
+                _cache_drivers = json.load(f)
+        except (OSError, ValueError):
+            _cache_drivers = {}
+    return _cache_drivers
 
 
-def abrir_pagina_web(url: str) -> webdriver.Chrome:
-    """Abre una página web en Chrome."""
+def _guardar_cache() -> None:
     try:
-        driver = crear_driver_chrome()
-        driver.get(url)
-        time.sleep(1.5)
+        os.makedirs(os.path.dirname(RUTA_CACHE_DRIVERS), exist_ok=True)
+        temporal = RUTA_CACHE_DRIVERS + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(_cache_drivers, f, indent=2)
+        os.replace(temporal, RUTA_CACHE_DRIVERS)
+    except OSError as e:
+        print(f"[WEB] No se pudo guardar la caché de drivers: {e}")
+
+
+def _mtime(ruta: Optional[str]) -> Optional[float]:
+    try:
+        return os.path.getmtime(ruta) if ruta else None
+    except OSError:
+        return None
+
+
+def _entrada_valida(entrada: Optional[Dict[str, Any]]) -> bool:
+    """El driver sigue en disco y el navegador no se actualizó desde que se resolvió."""
+    if not entrada or not entrada.get("driver") or not os.path.isfile(entrada["driver"]):
+        return False
+    return _mtime(entrada.get("navegador")) == entrada.get("mtime_navegador")
+
+
+def resolver_driver(navegador: str, forzar: bool = False) -> Dict[str, Any]:
+    """
+    Rutas {'driver', 'navegador'} para 'chrome' o 'edge'.
+    
+    Se usa la caché mientras el driver exista y el navegador no haya
+    cambiado; si no, un driver en el PATH y, como último recurso, Selenium
+    Manager (que puede descargarlo). El resultado se guarda en disco para
+    que los arranques siguientes no consulten nada.
+    """
+    nombre_sm, ejecutable = _DRIVERS[navegador]
+    with _cache_lock:
+        cache = _cache()
+        entrada = cache.get(navegador)
+        if not forzar and _entrada_valida(entrada):
+            return entrada
+        
+        ruta_navegador = detectar_navegadores().get(navegador)
+        ruta_driver = None if forzar else shutil.which(ejecutable)
+        if not ruta_driver:
+            argumentos = [str(SeleniumManager.get_binary()), "--browser", nombre_sm]
+            if ruta_navegador:
+                argumentos += ["--browser-path", ruta_navegador]
+            resultado = SeleniumManager.run(argumentos)
+            ruta_driver = resultado["driver_path"]
+            ruta_navegador = resultado.get("browser_path") or ruta_navegador
+        
+        entrada = {"driver": ruta_driver, "navegador": ruta_navegador,
+                   "mtime_navegador": _mtime(ruta_navegador)}
+        cache[navegador] = entrada
+        _guardar_cache()
+        print(f"[WEB] Driver de {navegador} resuelto: {ruta_driver}")
+        return entrada
+
+
+def _iniciar(navegador: str, perfil: Optional['PerfilNavegador']) -> Any:
+    """Inicia el navegador con las rutas cacheadas, sin pasar por Selenium Manager."""
+    perfil = perfil or perfil_defecto()
+    clase, clase_opciones, clase_servicio = {
+        "chrome": (webdriver.Chrome, ChromeOptions, ChromeService),
+        "edge": (webdriver.Edge, EdgeOptions, EdgeService),
+    }[navegador]
+    
+    for intento in range(2):
+        rutas = resolver_driver(navegador, forzar=intento > 0)
+        options = clase_opciones()
+        _configurar_opciones(options, perfil)
+        if rutas.get("navegador"):
+            options.binary_location = rutas["navegador"]
+        try:
+            driver = clase(options=options, service=clase_servicio(executable_path=rutas["driver"]))
+            break
+        except SessionNotCreatedException:
+            # Suele ser un driver que ya no coincide con la versión del navegador
+            if intento:
+                raise
+            print(f"[WEB] El driver cacheado de {navegador} no sirve; se resuelve de nuevo")
+    _aplicar_bloqueos(driver, perfil)
+    return driver
+
+
+def crear_driver_chrome(perfil: Optional['PerfilNavegador'] = None) -> webdriver.Chrome:
+    """Crea un driver de Chrome con opciones optimizadas."""
+    return _iniciar("chrome", perfil)
+
+
+def crear_driver_edge(perfil: Optional['PerfilNavegador'] = None) -> webdriver.Edge:
+    """Crea un driver de Edge con opciones optimizadas."""
+    return _iniciar("edge", perfil)
+
+
+_CREADORES = {"chrome": crear_driver_chrome, "edge": crear_driver_edge}
+
+
+def crear_driver(perfil: Optional['PerfilNavegador'] = None) -> Any:
+    """
+    Crea un driver empezando por el último navegador que funcionó.
+    
+    Si falla se prueba el otro y, si ese arranca, pasa a ser el preferido
+    para las próximas sesiones (también entre ejecuciones).
+    """
+    with _cache_lock:
+        preferido = _cache().get("preferido", "chrome")
+    orden = [preferido] + [n for n in _CREADORES if n != preferido]
+    
+    error = None
+    for navegador in orden:
+        try:
+            driver = _CREADORES[navegador](perfil)
+        except Exception as e:
+            print(f"[WEB] No se pudo iniciar {navegador}: {_primera_linea(e)}")
+            error = e
+            continue
+        if navegador != preferido:
+            with _cache_lock:
+                _cache()["preferido"] = navegador
+                _guardar_cache()
         return driver
-    except Exception:
-        # Fallback a Edge si Chrome falla
-        driver = crear_driver_edge()
-        driver.get(url)
-        time.sleep(1.5)
+    raise error
+
+
+class DriverPool:
+    """
+    Pool de sesiones de navegador ya iniciadas.
+    
+    Arrancar Chrome + chromedriver cuesta varios segundos; el pool mantiene
+    hasta `tamano` sesiones vivas y las presta a los flujos. Al devolverlas
+    se limpian (cookies, storage, pestañas extra) y se reciclan tras
+    `max_usos` préstamos o si el heap JS supera `max_memoria_mb`.
+    Es seguro usarlo desde varios hilos.
+    """
+    
+    def __init__(self, fabrica: Callable[[], Any] = None, tamano: int = 2,
+                 max_usos: int = 50, max_memoria_mb: Optional[int] = None):
+        self.fabrica = fabrica or crear_driver
+        self.tamano = max(1, int(tamano))
+        self.max_usos = max_usos
+        self.max_memoria_mb = max_memoria_mb
+        self._libres: List[Any] = []
+        self._usos: Dict[int, int] = {}
+        self._prestados = 0
+        self._cerrado = False
+        self._condicion = threading.Condition()
+    
+    def configurar(self, tamano: Optional[int] = None, max_usos: Optional[int] = None,
+                   max_memoria_mb: Optional[int] = None) -> None:
+        """Cambia los límites; las sesiones sobrantes se cierran al devolverse."""
+        with self._condicion:
+            if tamano:
+                self.tamano = max(1, int(tamano))
+            if max_usos:
+                self.max_usos = int(max_usos)
+            if max_memoria_mb is not None:
+                self.max_memoria_mb = int(max_memoria_mb) or None
+            self._condicion.notify_all()
+    
+    def tomar(self, timeout: Optional[float] = None, excedente: bool = False) -> Any:
+        """
+        Presta una sesión sana; crea una nueva si hay cupo.
+        
+        Si todas están prestadas espera hasta `timeout` segundos a que se
+        devuelva alguna (None = sin límite). Con `excedente` se crea una
+        sesión por encima de `tamano` en lugar de esperar; al devolverse
+        sobra y se cierra, así el tamaño del pool no cambia.
+        """
+        limite = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._condicion:
+                if self._cerrado:
+                    raise RuntimeError("El pool de navegadores está cerrado")
+                driver = self._libres.pop() if self._libres else None
+                if driver is None:
+                    if excedente or self._prestados < self.tamano:
+                        self._prestados += 1
+                        break
+                    restante = None if limite is None else limite - time.monotonic()
+                    if restante is not None and restante <= 0:
+                        raise TimeoutError("No hay sesiones de navegador disponibles")
+                    self._condicion.wait(restante)
+                    continue
+                self._prestados += 1
+            
+            # El chequeo se hace fuera del lock: puede tardar si el navegador murió
+            if self._esta_sano(driver):
+                return driver
+            self._descartar(driver)
+        
+        # Cupo reservado: crear una sesión nueva
+        try:
+            driver = self.fabrica()
+        except Exception:
+            with self._condicion:
+                self._prestados -= 1
+                self._condicion.notify()
+            raise
+        self._usos[id(driver)] = 0
+        print(f"[POOL] Nueva sesión de navegador ({self._prestados}/{self.tamano} en uso)")
         return driver
+    
+    def devolver(self, driver: Any, descartar: bool = False) -> None:
+        """Limpia la sesión y la deja disponible, o la cierra si corresponde reciclarla."""
+        if driver is None:
+            return
+        self._usos[id(driver)] = self._usos.get(id(driver), 0) + 1
+        reciclar = (descartar or self._cerrado
+                    or self._usos[id(driver)] >= self.max_usos
+                    or self._excede_memoria(driver)
+                    or not self._reiniciar(driver))
+        
+        with self._condicion:
+            self._prestados -= 1
+            if not reciclar and len(self._libres) + self._prestados >= self.tamano:
+                reciclar = True
+            if not reciclar:
+                self._libres.append(driver)
+            self._condicion.notify()
+        
+        if reciclar:
+            self._cerrar_driver(driver)
+    
+    def _descartar(self, driver: Any) -> None:
+        with self._condicion:
+            self._prestados -= 1
+            self._condicion.notify()
+        self._cerrar_driver(driver)
+    
+    def _cerrar_driver(self, driver: Any) -> None:
+        self._usos.pop(id(driver), None)
+        cerrar_navegador(driver)
+    
+    @staticmethod
+    def _esta_sano(driver: Any) -> bool:
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+    
+    def _excede_memoria(self, driver: Any) -> bool:
+        if not self.max_memoria_mb:
+            return False
+        try:
+            usado = driver.execute_script(
+                "return (window.performance && performance.memory) ? performance.memory.usedJSHeapSize : 0")
+            return (usado or 0) / (1024 * 1024) > self.max_memoria_mb
+        except Exception:
+            return False
+    
+    @staticmethod
+    def _reiniciar(driver: Any) -> bool:
+        """
+        Deja la sesión como nueva: una pestaña en blanco, sin cookies ni
+        storage de ningún sitio.
+        
+        delete_all_cookies() y localStorage solo alcanzan al origen de la
+        página actual; el navegador completo se limpia por CDP (Chrome y
+        Edge). Si no se puede, la sesión no se reutiliza.
+        """
+        try:
+            ventanas = driver.window_handles
+            for extra in ventanas[1:]:
+                driver.switch_to.window(extra)
+                driver.close()
+            driver.switch_to.window(ventanas[0])
+            try:
+                driver.execute_script("window.sessionStorage.clear();")
+            except Exception:
+                # about:blank y otras páginas sin origen no tienen storage
+                pass
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.execute_cdp_cmd("Storage.clearDataForOrigin", {"origin": "*", "storageTypes": "all"})
+            driver.get("about:blank")
+            return True
+        except Exception:
+            return False
+    
+    def estado(self) -> Dict[str, int]:
+        with self._condicion:
+            return {"libres": len(self._libres), "prestadas": self._prestados, "tamano": self.tamano}
+    
+    def cerrar(self) -> None:
+        """Cierra las sesiones libres; las prestadas se cierran al devolverse."""
+        with self._condicion:
+            self._cerrado = True
+            libres, self._libres = self._libres, []
+            self._condicion.notify_all()
+        for driver in libres:
+            self._cerrar_driver(driver)
+
+
+_pools: Dict[PerfilNavegador, DriverPool] = {}
+_pool_lock = threading.Lock()
+_limites_pool: Dict[str, Any] = {"tamano": 2, "max_usos": 50, "max_memoria_mb": None}
+_perfil_defecto = PerfilNavegador()
 
 
-def cambiar_pagina_web(driver: Any, nueva_url: str) -> None:
-    """Cambia la URL en el navegador actual."""
+def perfil_defecto() -> PerfilNavegador:
+    """Perfil usado cuando un paso no indica uno propio."""
+    return _perfil_defecto
+
+
+def configurar_navegadores(tamano: Optional[int] = None, max_usos: Optional[int] = None,
+                           max_memoria_mb: Optional[int] = None,
+                           perfil: Optional[PerfilNavegador] = None) -> None:
+    """Ajusta los límites de los pools y, opcionalmente, el perfil por defecto."""
+    global _perfil_defecto
+    with _pool_lock:
+        if tamano:
+            _limites_pool["tamano"] = int(tamano)
+        if max_usos:
+            _limites_pool["max_usos"] = int(max_usos)
+        if max_memoria_mb is not None:
+            _limites_pool["max_memoria_mb"] = int(max_memoria_mb) or None
+        if perfil is not None:
+            _perfil_defecto = perfil
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.configurar(tamano, max_usos, max_memoria_mb)
+
+
+def obtener_pool(perfil: Optional[PerfilNavegador] = None) -> DriverPool:
+    """
+    Pool de navegadores compartido por todas las ejecuciones del proceso.
+    
+    Hay un pool por perfil: una sesión sin ventana no se presta a un paso
+    que pidió una visible, ni una con bloqueos a uno que no los quiere.
+    """
+    perfil = perfil or perfil_defecto()
+    with _pool_lock:
+        pool = _pools.get(perfil)
+        if pool is None or pool._cerrado:
+            pool = DriverPool(lambda: crear_driver(perfil), **_limites_pool)
+            _pools[perfil] = pool
+            atexit.register(pool.cerrar)
+        return pool
+
+
+ESPERAS = ('documento', 'selector', 'red', 'ninguna')
+ESPERA_TIMEOUT = 15.0
+TIMEOUT_CARGA_SELENIUM = 300.0  # valor por defecto de WebDriver para pageLoad
+QUIETUD_RED = 0.5
+
+
+def esperar_pagina(driver: Any, espera: str = "documento", selector: Optional[str] = None,
+                   timeout: float = ESPERA_TIMEOUT, quietud: float = QUIETUD_RED) -> float:
+    """
+    Espera a que la página cumpla una condición y devuelve los segundos esperados.
+    
+    - documento: document.readyState == 'complete'
+    - selector: aparece un elemento que coincide con el selector CSS
+    - red: documento completo y sin recursos nuevos durante `quietud` segundos
+    - ninguna: no espera
+    
+    Lanza TimeoutError si la condición no se cumple en `timeout` segundos.
+    """
+    inicio = time.perf_counter()
+    espera = (espera or "documento").lower()
+    if espera == "ninguna":
+        return 0.0
+    if espera not in ESPERAS:
+        raise ValueError(f"Espera no soportada: {espera}")
+    
+    espera_driver = WebDriverWait(driver, timeout, poll_frequency=0.1)
+    try:
+        if espera == "selector":
+            if not selector:
+                raise ValueError("La espera por selector requiere un selector CSS")
+            espera_driver.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
+        elif espera == "documento":
+            espera_driver.until(lambda d: d.execute_script("return document.readyState") == "complete")
+        else:
+            estado = {"recursos": -1, "desde": time.perf_counter()}
+            
+            def red_quieta(d: Any) -> bool:
+                listo, recursos = d.execute_script(
+                    "return [document.readyState, performance.getEntriesByType('resource').length]")
+                ahora = time.perf_counter()
+                if listo != "complete" or recursos != estado["recursos"]:
+                    estado["recursos"], estado["desde"] = recursos, ahora
+                    return False
+                return ahora - estado["desde"] >= quietud
+            
+            espera_driver.until(red_quieta)
+    except TimeoutException:
+        detalle = f" '{selector}'" if espera == "selector" else ""
+        raise TimeoutError(f"Espera '{espera}'{detalle} agotada tras {timeout:g}s")
+    
+    return time.perf_counter() - inicio
+
+
+def abrir_pagina_web(url: str, espera: str = "documento", selector: Optional[str] = None,
+                     timeout: float = ESPERA_TIMEOUT) -> Any:
+    """Abre una página web en Chrome (o Edge si Chrome no arranca)."""
+    driver = crear_driver()
+    cambiar_pagina_web(driver, url, espera, selector, timeout)
+    return driver
+
+
+def cambiar_pagina_web(driver: Any, nueva_url: str, espera: str = "documento",
+                       selector: Optional[str] = None, timeout: float = ESPERA_TIMEOUT) -> float:
+    """Cambia la URL en el navegador actual y devuelve los segundos de espera."""
     if driver is None:
         raise RuntimeError("Driver no inicializado. Usar 'abrir_pagina_web' primero.")
     
     driver.get(nueva_url)
-    time.sleep(1.2)
+    return esperar_pagina(driver, espera, selector, timeout)
+
+
+MEMORIA_POR_SESION_MB = 350
+
+SCRIPT_EXTRAER_CAMPOS = """
+const campos = arguments[0] || {};
+const r = {};
+for (const [nombre, sel] of Object.entries(campos)) {
+    const el = document.querySelector(sel);
+    r[nombre] = el ? (el.innerText || el.textContent || '').trim() : null;
+}
+return [document.title, location.href, r];
+"""
+
+
+def _memoria_disponible_mb() -> Optional[float]:
+    """Memoria física libre en MB, si el sistema permite averiguarla."""
+    try:
+        import psutil
+        return psutil.virtual_memory().available / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def _primera_linea(error: Exception) -> str:
+    """Mensaje corto de una excepción de Selenium (sin 'Message:' ni stacktrace)."""
+    texto = getattr(error, 'msg', None) or str(error)
+    return texto.strip().splitlines()[0] if texto.strip() else ""
+
+
+def sesiones_recomendadas(pedidas: Optional[int] = None) -> int:
+    """
+    Sesiones concurrentes que la máquina puede sostener.
+    
+    Cada navegador consume del orden de MEMORIA_POR_SESION_MB; en CPU se
+    admiten dos sesiones por núcleo, ya que buena parte del tiempo esperan
+    la red. Se toma el menor de ambos límites.
+    """
+    limite = 2 * max(1, os.cpu_count() or 1)
+    memoria = _memoria_disponible_mb()
+    if memoria is not None:
+        limite = min(limite, max(1, int(memoria // MEMORIA_POR_SESION_MB)))
+    return max(1, min(int(pedidas), limite)) if pedidas else limite
+
+
+def navegar_urls(urls: List[str], campos: Optional[Dict[str, str]] = None, sesiones: Optional[int] = None,
+                 perfil: Optional[PerfilNavegador] = None, espera: str = "documento",
+                 selector: Optional[str] = None, timeout: float = ESPERA_TIMEOUT) -> List[Dict[str, Any]]:
+    """
+    Visita las URLs repartidas entre varias sesiones del pool.
+    
+    Cada hilo toma una sesión y va sacando URLs de una cola compartida, así
+    ninguna sesión queda ociosa. Por URL se espera la condición, se extraen
+    `campos` ({columna: selector CSS}) en un solo execute_script y se arma
+    un registro; los errores y timeouts quedan en ese registro sin frenar el
+    resto. El resultado respeta el orden original.
+    
+    Las sesiones que superen el tamaño del pool se piden como excedente y
+    se cierran al terminar; el pool compartido conserva sus límites.
+    """
+    total = len(urls)
+    if not total:
+        return []
+    sesiones = min(sesiones_recomendadas(sesiones), total)
+    pool = obtener_pool(perfil)
+    
+    resultados: List[Optional[Dict[str, Any]]] = [None] * total
+    siguiente = iter(range(total))
+    lock = threading.Lock()
+    
+    def tomar_indice() -> Optional[int]:
+        with lock:
+            return next(siguiente, None)
+    
+    def visitar(driver: Any, indice: int) -> Dict[str, Any]:
+        url = urls[indice]
+        registro: Dict[str, Any] = {"url": url, "estado": "ok", "segundos": 0.0, "titulo": None,
+                                    "url_final": None, "error": None}
+        inicio = time.perf_counter()
+        try:
+            driver.get(url)
+            esperar_pagina(driver, espera, selector, timeout)
+            titulo, url_final, valores = driver.execute_script(SCRIPT_EXTRAER_CAMPOS, campos or {})
+            registro.update(titulo=titulo, url_final=url_final)
+            registro.update(valores or {})
+        except (TimeoutError, TimeoutException) as e:
+            registro.update(estado="timeout", error=_primera_linea(e) or "Tiempo de carga agotado")
+        except Exception as e:
+            registro.update(estado="error", error=_primera_linea(e) or type(e).__name__)
+        registro["segundos"] = round(time.perf_counter() - inicio, 3)
+        return registro
+    
+    def trabajador() -> None:
+        indice = tomar_indice()
+        while indice is not None:
+            try:
+                driver = pool.tomar(excedente=True)
+            except Exception as e:
+                # Sin sesión este hilo abandona; los demás siguen vaciando la cola
+                resultados[indice] = {"url": urls[indice], "estado": "error", "segundos": 0.0,
+                                      "titulo": None, "url_final": None,
+                                      "error": f"No se pudo iniciar el navegador: {e}"}
+                return
+            descartar = False
+            try:
+                previo = driver.timeouts.page_load
+            except Exception:
+                previo = TIMEOUT_CARGA_SELENIUM
+            try:
+                driver.set_page_load_timeout(timeout)
+                while indice is not None:
+                    checkpoint()
+                    registro = visitar(driver, indice)
+                    resultados[indice] = registro
+                    indice = tomar_indice()
+                    if registro["estado"] != "ok" and not DriverPool._esta_sano(driver):
+                        # El navegador murió: se reemplaza la sesión y se sigue con la cola
+                        descartar = True
+                        break
+            finally:
+                if not descartar:
+                    # La sesión vuelve al pool con el timeout de carga que tenía
+                    try:
+                        driver.set_page_load_timeout(previo)
+                    except Exception:
+                        descartar = True
+                pool.devolver(driver, descartar=descartar)
+    
+    with ThreadPoolExecutor(max_workers=sesiones) as ejecutor:
+        for futuro in [ejecutor.submit(propagate_token(trabajador)) for _ in range(sesiones)]:
+            futuro.result()
+    
+    for indice, registro in enumerate(resultados):
+        if registro is None:
+            registro = resultados[indice] = {"url": urls[indice], "estado": "error", "segundos": 0.0,
+                                             "titulo": None, "url_final": None,
+                                             "error": "Sin sesiones de navegador disponibles"}
+        for nombre in (campos or {}):
+            registro.setdefault(nombre, None)
+    return resultados
 
 
 def cerrar_navegador(driver: Any) -> None:
@@ -0,0 +1,261 @@
+"""
+Operaciones masivas sobre el DOM con un único execute_script.
+
+Leer una tabla celda por celda con find_elements + .text cuesta una llamada
+HTTP a WebDriver por elemento. Aquí el recorrido se hace dentro de la
+página y vuelve serializado como JSON en una sola respuesta.
+"""
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from modules.core.cancellation import checkpoint
+from modules.utils.web_automation import esperar_pagina, ESPERA_TIMEOUT
+
+
+SCRIPT_EXTRAER = r"""
+const [sel, modo, campos] = arguments;
+const limpiar = t => (t || '').replace(/\s+/g, ' ').trim();
+const valor = (el, spec) => {
+    const i = spec.lastIndexOf('@');
+    const css = i >= 0 ? spec.slice(0, i).trim() : spec.trim();
+    const attr = i >= 0 ? spec.slice(i + 1).trim() : '';
+    const t = css ? el.querySelector(css) : el;
+    if (!t) return null;
+    return attr ? t.getAttribute(attr) : limpiar(t.innerText || t.textContent);
+};
+const raiz = document.querySelector(sel);
+const huella = location.href + '|' + (raiz ? limpiar(raiz.innerText).slice(0, 500) : '');
+if (modo === 'tabla') {
+    if (!raiz || !raiz.rows) return JSON.stringify({columnas: null, filas: [], huella});
+    let filas = Array.from(raiz.rows);
+    let columnas = null;
+    const cabecera = raiz.tHead && raiz.tHead.rows.length ? raiz.tHead.rows[raiz.tHead.rows.length - 1] : null;
+    if (cabecera) {
+        columnas = Array.from(cabecera.cells).map(c => limpiar(c.innerText));
+        filas = filas.filter(tr => tr.parentElement !== raiz.tHead);
+    } else if (filas.length && filas[0].cells.length && Array.from(filas[0].cells).every(c => c.tagName === 'TH')) {
+        columnas = Array.from(filas[0].cells).map(c => limpiar(c.innerText));
+        filas = filas.slice(1);
+    }
+    const datos = filas.map(tr => Array.from(tr.cells).map(c => limpiar(c.innerText))).filter(f => f.length);
+    return JSON.stringify({columnas, filas: datos, huella});
+}
+const nombres = Object.keys(campos || {});
+const datos = Array.from(document.querySelectorAll(sel)).map(el => {
+    if (!nombres.length) return {texto: limpiar(el.innerText || el.textContent)};
+    const r = {};
+    for (const n of nombres) r[n] = valor(el, campos[n]);
+    return r;
+});
+return JSON.stringify({filas: datos, huella});
+"""
+
+SCRIPT_HUELLA = r"""
+const raiz = document.querySelector(arguments[0]);
+return location.href + '|' + (raiz ? (raiz.innerText || '').replace(/\s+/g, ' ').trim().slice(0, 500) : '');
+"""
+
+SCRIPT_SIGUIENTE = r"""
+const el = document.querySelector(arguments[0]);
+if (!el || el.disabled || el.getAttribute('aria-disabled') === 'true'
+        || (el.classList && el.classList.contains('disabled'))) return false;
+el.scrollIntoView({block: 'center'});
+el.click();
+return true;
+"""
+
+
+def _nombres_columnas(columnas: Optional[List[str]], ancho: int) -> List[str]:
+    """Completa y desambigua encabezados: vacíos → col_N, repetidos → nombre_2."""
+    nombres = list(columnas or [])[:ancho]
+    nombres += [""] * (ancho - len(nombres))
+    vistos: Dict[str, int] = {}
+    resultado = []
+    for i, nombre in enumerate(nombres, start=1):
+        nombre = nombre or f"col_{i}"
+        if nombre in vistos:
+            vistos[nombre] += 1
+            nombre = f"{nombre}_{vistos[nombre]}"
+        else:
+            vistos[nombre] = 1
+        resultado.append(nombre)
+    return resultado
+
+
+def extraer_elementos(driver: Any, selector: str, modo: str = "tabla",
+                      campos: Optional[Dict[str, str]] = None) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Extrae una tabla o elementos repetidos de la página actual.
+
+    - tabla: `selector` apunta a un <table>; encabezados de <thead> o de
+      una primera fila de <th>.
+    - elementos: un registro por elemento que coincide con `selector`;
+      `campos` es {columna: subselector} y 'a@href' toma un atributo.
+      Sin campos se toma el texto del elemento.
+
+    Devuelve (registros, huella); la huella identifica el contenido para
+    detectar el cambio de página al paginar.
+    """
+    crudo = driver.execute_script(SCRIPT_EXTRAER, selector, modo, campos or {})
+    datos = json.loads(crudo)
+    if modo != "tabla":
+        return datos["filas"], datos["huella"]
+
+    filas = datos["filas"]
+    # Filas más cortas que el encabezado (celdas vacías al final) conservan todas las columnas
+    ancho = max([len(datos["columnas"] or [])] + [len(f) for f in filas])
+    columnas = _nombres_columnas(datos["columnas"], ancho)
+    registros = [dict(zip(columnas, fila + [None] * (ancho - len(fila)))) for fila in filas]
+    return registros, datos["huella"]
+
+
+def _esperar_cambio(driver: Any, selector: str, huella: str, timeout: float) -> bool:
+    """Espera a que el contenido (o la URL) cambie tras pasar de página."""
+    def cambio(d: Any) -> bool:
+        try:
+            return d.execute_script(SCRIPT_HUELLA, selector) != huella
+        except Exception:
+            # La página anterior se está descargando
+            return False
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(cambio)
+        return True
+    except TimeoutException:
+        return False
+
+
+def extraer_paginas(driver: Any, selector: str, modo: str = "tabla", campos: Optional[Dict[str, str]] = None,
+                    siguiente: Optional[str] = None, max_paginas: int = 1,
+                    timeout: float = ESPERA_TIMEOUT) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Extrae de la página actual y, si hay selector `siguiente`, de las
+    siguientes hasta `max_paginas` o hasta que el botón falte, esté
+    deshabilitado o el contenido deje de cambiar.
+
+    Devuelve (registros con columna 'pagina', páginas recorridas).
+    """
+    registros: List[Dict[str, Any]] = []
+    pagina = 0
+    while True:
+        checkpoint()
+        pagina += 1
+        filas, huella = extraer_elementos(driver, selector, modo, campos)
+        for fila in filas:
+            fila["pagina"] = pagina
+        registros.extend(filas)
+
+        if not siguiente or pagina >= max_paginas:
+            break
+        if not driver.execute_script(SCRIPT_SIGUIENTE, siguiente):
+            break
+        if not _esperar_cambio(driver, selector, huella, timeout):
+            print(f"[WEB] El contenido no cambió tras pasar de página; se detiene en la página {pagina}")
+            break
+        esperar_pagina(driver, "documento", timeout=timeout)
+    return registros, pagina
+
+
+SCRIPT_LLENAR = r"""
+const [valores, enviar] = arguments;
+const faltantes = [];
+const asignar = (el, v) => {
+    const proto = Object.getPrototypeOf(el);
+    const desc = Object.getOwnPropertyDescriptor(proto, 'value');
+    // El setter nativo hace que React/Vue registren el cambio
+    if (desc && desc.set) desc.set.call(el, v); else el.value = v;
+};
+for (const [sel, v] of Object.entries(valores)) {
+    const el = document.querySelector(sel);
+    if (!el) { faltantes.push(sel); continue; }
+    const tipo = (el.type || '').toLowerCase();
+    if (tipo === 'checkbox' || tipo === 'radio') {
+        const marcar = v === true || ['1', 'true', 'si', 'sí', 'x', 'yes'].includes(String(v).toLowerCase());
+        // click() ya dispara input/change
+        if (el.checked !== marcar) el.click();
+        continue;
+    }
+    if (el.tagName === 'SELECT') {
+        const texto = v == null ? '' : String(v);
+        const opcion = Array.from(el.options).find(o => o.value === texto)
+            || Array.from(el.options).find(o => o.text.trim() === texto);
+        asignar(el, opcion ? opcion.value : texto);
+    } else {
+        asignar(el, v == null ? '' : String(v));
+    }
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+}
+if (enviar && !faltantes.length) {
+    const boton = document.querySelector(enviar);
+    if (!boton) faltantes.push(enviar); else boton.click();
+}
+return faltantes;
+"""
+
+
+def _valor_js(valor: Any) -> Any:
+    """Valor de celda serializable para execute_script (NaN → None, fechas → texto)."""
+    if valor is None:
+        return None
+    try:
+        if valor != valor:  # NaN / NaT
+            return None
+    except (TypeError, ValueError):
+        pass
+    if isinstance(valor, (bool, int, float, str)):
+        return valor
+    if hasattr(valor, "item"):
+        return valor.item()
+    return str(valor)
+
+
+def llenar_formulario(driver: Any, valores: Dict[str, Any], enviar: Optional[str] = None) -> List[str]:
+    """
+    Completa un formulario con un único execute_script.
+
+    `valores` es {selector CSS: valor}; se usan los setters nativos y se
+    disparan los eventos input/change. Si no falta ningún campo y se indicó
+    `enviar`, se hace clic en ese botón. Devuelve los selectores no hallados.
+    """
+    return driver.execute_script(SCRIPT_LLENAR, {s: _valor_js(v) for s, v in valores.items()}, enviar) or []
+
+
+def llenar_formularios(driver: Any, filas: List[Dict[str, Any]], mapeo: Dict[str, str],
+                       enviar: Optional[str] = None, url_formulario: Optional[str] = None,
+                       espera: str = "documento", selector_espera: Optional[str] = None,
+                       timeout: float = ESPERA_TIMEOUT) -> List[Dict[str, Any]]:
+    """
+    Carga una fila por envío y devuelve un registro de estado por fila.
+
+    `mapeo` es {columna: selector}. Antes de cada fila se abre
+    `url_formulario` si se indicó; después del envío se espera la condición
+    de finalización. Un error en una fila no detiene las siguientes.
+    """
+    reporte = []
+    for numero, fila in enumerate(filas, start=1):
+        checkpoint()
+        registro: Dict[str, Any] = {"fila": numero, "estado": "ok", "segundos": 0.0, "error": None}
+        inicio = time.perf_counter()
+        try:
+            if url_formulario:
+                driver.get(url_formulario)
+                esperar_pagina(driver, "documento", timeout=timeout)
+            valores = {selector: fila.get(columna) for columna, selector in mapeo.items()}
+            faltantes = llenar_formulario(driver, valores, enviar)
+            if faltantes:
+                raise ValueError(f"No se encontraron en la página: {', '.join(faltantes)}")
+            if enviar:
+                esperar_pagina(driver, espera, selector_espera, timeout)
+        except TimeoutError as e:
+            registro.update(estado="timeout", error=str(e))
+        except Exception as e:
+            texto = getattr(e, "msg", None) or str(e)
+            registro.update(estado="error", error=texto.strip().splitlines()[0] if texto.strip() else type(e).__name__)
+        registro["segundos"] = round(time.perf_counter() - inicio, 3)
+        reporte.append(registro)
+    return reporte
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la cancelación y pausa cooperativas.
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import modules.actions  # noqa: F401
+from modules.core import FlowExecutor
+from modules.core.cancellation import (CancellationToken, FlowCancelled, bind_token, checkpoint,
+                                       current_token, propagate_token)
+
+
+def test_espera_despierta_al_cancelar_y_no_cuenta_la_pausa():
+    token = CancellationToken()
+    threading.Timer(0.1, token.cancel).start()
+    inicio = time.monotonic()
+    with pytest.raises(FlowCancelled):
+        token.wait(30)
+    assert time.monotonic() - inicio < 5
+
+    token = CancellationToken()
+    token.pause()
+    threading.Timer(0.3, token.resume).start()
+    inicio = time.monotonic()
+    token.wait(0.2)
+    assert time.monotonic() - inicio >= 0.45
+
+
+def test_token_llega_a_los_hilos_del_pool():
+    checkpoint()  # fuera de un flujo no hace nada
+    token = CancellationToken()
+    with bind_token(token):
+        tarea = propagate_token(lambda: current_token())
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        assert pool.submit(tarea).result() is token
+        token.cancel()
+        with pytest.raises(FlowCancelled):
+            pool.submit(tarea).result()
+    assert current_token() is None
+
+
+def test_detener_interrumpe_un_paso_largo():
+    executor = FlowExecutor()
+    executor.context.cleanup = lambda: None
+    flow = {'steps': [{'id': 'a', 'type': 'pausa', 'props': {'segundos': 30}},
+                      {'id': 'b', 'type': 'variable_set', 'props': {'variable': 'despues', 'valor': 'x'}}],
+            'edges': [{'from': {'step': 'a'}, 'to': {'step': 'b'}}]}
+    threading.Timer(0.2, executor.stop).start()
+    inicio = time.monotonic()
+    resultado = executor.execute_flow(flow)
+    assert time.monotonic() - inicio < 5
+    assert not resultado['ok'] and resultado.get('cancelled')
+    assert 'despues' not in executor.context.variables
+
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de las utilidades de archivos: lectura de carpetas, salida
+comprimida, transferencias y sincronización.
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from modules.utils import data_io
+
+
+def _escribir(ruta, texto):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write(texto)
+
+
+def _leer(ruta):
+    with open(ruta, encoding='utf-8') as f:
+        return f.read()
+
+
+def test_leer_archivos_carpeta_alinea_columnas_y_reporta_errores(tmp_path):
+    _escribir(str(tmp_path / 'b.csv'), 'id,total\n3,30\n')
+    _escribir(str(tmp_path / 'a.csv'), 'id,nombre\n1,uno\n2,dos\n')
+    _escribir(str(tmp_path / 'c.csv'), '')
+    df, reporte = data_io.leer_archivos_carpeta(str(tmp_path), '*.csv', columna_origen='archivo', max_workers=3)
+    assert df['archivo'].tolist() == ['a.csv', 'a.csv', 'b.csv']
+    assert df['id'].tolist() == [1, 2, 3]
+    assert pd.isna(df.loc[2, 'nombre']) and df.loc[2, 'total'] == 30
+    assert [r['filas'] for r in reporte] == [2, 1, 0]
+    assert reporte[2]['error']
+
+
+def test_columna_origen_que_ya_existe_se_reemplaza(tmp_path):
+    _escribir(str(tmp_path / 'a.csv'), 'archivo,id\nviejo,1\n')
+    _escribir(str(tmp_path / 'b.csv'), 'id\n2\n')
+    df, reporte = data_io.leer_archivos_carpeta(str(tmp_path), '*.csv', columna_origen='archivo')
+    assert not any(r['error'] for r in reporte)
+    assert df['archivo'].tolist() == ['a.csv', 'b.csv']
+    assert df['id'].tolist() == [1, 2]
+
+
+def test_carpeta_escanear_recursivo_con_patrones_y_filtros(tmp_path):
+    _escribir(str(tmp_path / 'a.csv'), 'x' * 10)
+    _escribir(str(tmp_path / 'sub' / 'b.xlsx'), 'x' * 100)
+    _escribir(str(tmp_path / 'sub' / 'c.txt'), 'x')
+    _escribir(str(tmp_path / '.oculto.csv'), 'x')
+    raiz = str(tmp_path)
+    assert data_io.carpeta_listar(raiz, '*.csv;*.xlsx') == ['a.csv']
+    assert sorted(data_io.carpeta_listar(raiz, '*.csv;*.xlsx', recursivo=True)) == ['a.csv', os.path.join('sub', 'b.xlsx')]
+    grandes = list(data_io.carpeta_escanear(raiz, recursivo=True, tamano_min=50))
+    assert [r['nombre'] for r in grandes] == ['b.xlsx'] and grandes[0]['tamano'] == 100
+    detalle = data_io.carpeta_listar_detalle(raiz, recursivo=True, ordenar_por='tamano', descendente=True)
+    assert detalle['nombre'].tolist() == ['b.xlsx', 'a.csv', 'c.txt']
+
+
+def test_nivel_cero_de_compresion_se_respeta(tmp_path):
+    texto = 'fila,repetida\n' * 2000
+    tamanos = {}
+    for nivel in (0, 9):
+        ruta = str(tmp_path / f'salida_{nivel}.csv.gz')
+        with data_io.abrir_salida(ruta, nivel=nivel) as f:
+            f.write(texto)
+        with data_io.abrir_entrada(ruta) as f:
+            assert f.read().decode('utf-8') == texto
+        tamanos[nivel] = os.path.getsize(ruta)
+    # Nivel 0 solo empaqueta: el archivo no se comprime
+    assert tamanos[0] > len(texto) > 10 * tamanos[9]
+
+
+def test_buscar_duplicados_compara_prefijo_y_contenido_completo(tmp_path):
+    import hashlib
+    base = 'x' * 100_000
+    _escribir(str(tmp_path / 'a' / 'grande1.dat'), base + 'A')
+    _escribir(str(tmp_path / 'b' / 'grande2.dat'), base + 'A')
+    # Mismo tamaño y mismo prefijo, distinto final
+    _escribir(str(tmp_path / 'b' / 'grande3.dat'), base + 'B')
+    _escribir(str(tmp_path / 'a' / 'chico1.txt'), 'hola')
+    _escribir(str(tmp_path / 'a' / 'sub' / 'chico2.txt'), 'hola')
+    _escribir(str(tmp_path / 'a' / 'unico.txt'), 'chau')
+
+    df = data_io.buscar_duplicados([str(tmp_path / 'a'), str(tmp_path / 'b')], max_workers=2)
+    grupos = df.groupby('grupo')['ruta'].apply(lambda rutas: sorted(os.path.basename(r) for r in rutas)).tolist()
+    assert grupos == [['grande1.dat', 'grande2.dat'], ['chico1.txt', 'chico2.txt']]
+    assert df.loc[df['tamano'] == 4, 'hash'].iloc[0] == hashlib.sha256(b'hola').hexdigest()
+
+
+def test_transferir_archivos_renombra_colisiones_del_lote(tmp_path):
+    _escribir(str(tmp_path / 'a' / 'x.txt'), 'uno')
+    _escribir(str(tmp_path / 'b' / 'x.txt'), 'dos')
+    destino = str(tmp_path / 'destino' / 'x.txt')
+    _escribir(destino, 'previo')
+    pares = [(str(tmp_path / 'a' / 'x.txt'), destino), (str(tmp_path / 'b' / 'x.txt'), destino)]
+    reporte = data_io.transferir_archivos(pares, si_existe='renombrar', verificar=True)
+    assert [r['estado'] for r in reporte] == ['copiado', 'copiado']
+    assert len({r['destino'] for r in reporte} | {destino}) == 3
+    assert _leer(destino) == 'previo'
+
+
+def test_sobrescribir_el_mismo_destino_gana_el_ultimo(tmp_path):
+    destino = str(tmp_path / 'destino' / 'x.txt')
+    pares = []
+    for carpeta in ('a', 'b', 'c'):
+        _escribir(str(tmp_path / carpeta / 'x.txt'), carpeta * 100000)
+        pares.append((str(tmp_path / carpeta / 'x.txt'), destino))
+    reporte = data_io.transferir_archivos(pares, si_existe='sobrescribir', max_workers=3)
+    assert [r['estado'] for r in reporte] == ['saltado', 'saltado', 'copiado']
+    assert _leer(destino) == 'c' * 100000
+
+
+def test_mover_lote_saltando_existentes(tmp_path):
+    origenes = []
+    for nombre in ('a.bin', 'b.bin'):
+        ruta = str(tmp_path / 'origen' / nombre)
+        _escribir(ruta, nombre * 1000)
+        origenes.append(ruta)
+    _escribir(str(tmp_path / 'destino' / 'b.bin'), 'previo')
+    pares = [(o, str(tmp_path / 'destino' / os.path.basename(o))) for o in origenes]
+    reporte = data_io.transferir_archivos(pares, operacion='mover', si_existe='saltar', verificar=True)
+    assert [r['estado'] for r in reporte] == ['movido', 'saltado']
+    assert reporte[0]['bytes'] == 5000
+    assert not os.path.exists(origenes[0]) and os.path.exists(origenes[1])
+    assert _leer(str(tmp_path / 'destino' / 'b.bin')) == 'previo'
+
+
+def test_sincronizar_por_hash_detecta_cambios_del_mismo_tamano(tmp_path):
+    origen, destino = str(tmp_path / 'origen'), str(tmp_path / 'destino')
+    _escribir(os.path.join(origen, 'igual.txt'), 'aaaa')
+    _escribir(os.path.join(origen, 'sub', 'cambiado.txt'), 'bbbb')
+    _escribir(os.path.join(origen, 'nuevo.txt'), 'n')
+    _escribir(os.path.join(destino, 'igual.txt'), 'aaaa')
+    _escribir(os.path.join(destino, 'sub', 'cambiado.txt'), 'cccc')
+    _escribir(os.path.join(destino, 'huerfano.txt'), 'h')
+
+    resumen = data_io.sincronizar_carpeta(origen, destino, usar_hash=True, eliminar_huerfanos=True, max_workers=2)
+    assert (resumen['copiados'], resumen['sin_cambios'], resumen['eliminados'], resumen['errores']) == (2, 1, 1, 0)
+    assert _leer(os.path.join(destino, 'sub', 'cambiado.txt')) == 'bbbb'
+    assert not os.path.exists(os.path.join(destino, 'huerfano.txt'))
+
+    # Las copias conservan la fecha: la segunda pasada no copia nada
+    resumen = data_io.sincronizar_carpeta(origen, destino)
+    assert (resumen['copiados'], resumen['sin_cambios']) == (0, 3)
+
+
+def test_sincronizar_sigue_si_un_archivo_no_se_puede_leer(tmp_path, monkeypatch):
+    origen, destino = str(tmp_path / 'origen'), str(tmp_path / 'destino')
+    for nombre in ('bloqueado.txt', 'otro.txt'):
+        _escribir(os.path.join(origen, nombre), 'nuevo')
+        _escribir(os.path.join(destino, nombre), 'viejo')
+    calcular_hash = data_io.calcular_hash
+
+    def hash_con_error(ruta, *args, **kwargs):
+        if os.path.basename(ruta) == 'bloqueado.txt':
+            raise PermissionError(f"Permiso denegado: {ruta}")
+        return calcular_hash(ruta, *args, **kwargs)
+
+    monkeypatch.setattr(data_io, 'calcular_hash', hash_con_error)
+    resumen = data_io.sincronizar_carpeta(origen, destino, usar_hash=True)
+    assert (resumen['copiados'], resumen['errores']) == (1, 1)
+    error, = [r for r in resumen['reporte'] if r['estado'] == 'error']
+    assert 'Permiso denegado' in error['error']
+    assert _leer(os.path.join(destino, 'otro.txt')) == 'nuevo'
+
+
+if __name__ == '__main__':
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de la salida y lectura SQLite.
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from modules.core import FlowContext
+from modules.utils.database import escribir_tabla, leer_consulta, obtener_conexion
+
+
+def test_escritura_y_lectura_diferida(tmp_path):
+    ruta = str(tmp_path / 'datos.db')
+    contexto = FlowContext()
+    df = pd.DataFrame({'id': range(25), 'fecha': pd.date_range('2024-01-01', periods=25), 'nota': [None] + ['x'] * 24})
+    conexion = obtener_conexion(contexto, ruta)
+    assert obtener_conexion(contexto, ruta) is conexion
+    assert escribir_tabla(conexion, 'tabla', df, lote=10) == 25
+    assert escribir_tabla(conexion, 'tabla', df.head(5), modo='reemplazar') == 5
+
+    plan = leer_consulta(conexion, 'SELECT * FROM tabla WHERE id >= ?', [2], diferido=True)
+    resultado = plan.seleccionar(['id']).collect(chunk_filas=2)
+    assert resultado['id'].tolist() == [2, 3, 4]
+    contexto.cleanup()
+
+
+def test_hilos_y_contextos_hijos_escriben_con_conexiones_propias(tmp_path):
+    ruta = str(tmp_path / 'paralelo.db')
+    contexto = FlowContext()
+    escribir_tabla(obtener_conexion(contexto, ruta), 'filas', pd.DataFrame({'hilo': [-1], 'n': [0]}))
+
+    def escribir(hilo):
+        hijo = contexto.child()
+        conexion = obtener_conexion(hijo, ruta)
+        for n in range(20):
+            escribir_tabla(conexion, 'filas', pd.DataFrame({'hilo': [hilo] * 10, 'n': [n] * 10}))
+        return id(conexion)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        conexiones = list(pool.map(escribir, range(4)))
+
+    assert len(set(conexiones)) == 4
+    total = leer_consulta(obtener_conexion(contexto, ruta), 'SELECT hilo, COUNT(*) AS filas FROM filas GROUP BY hilo')
+    assert total.set_index('hilo')['filas'].to_dict() == {-1: 1, 0: 200, 1: 200, 2: 200, 3: 200}
+    contexto.cleanup()
+    assert not contexto.resources
+
+
+if __name__ == '__main__':
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
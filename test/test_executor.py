@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del grafo de ejecución: orden, ramas, bucles y formato de conexiones.
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import modules.actions  # noqa: F401  (registra las acciones)
+from modules.core import FlowExecutor
+from modules.core.executor import CompiledFlow
+
+
+def paso(step_id, tipo, **props):
+    return {'id': step_id, 'type': tipo, 'props': props}
+
+
+def conexion(origen, destino, puerto=None):
+    return {'from': {'step': origen, 'port': puerto}, 'to': {'step': destino}}
+
+
+def ejecutar(flow, **variables):
+    executor = FlowExecutor()
+    executor.context.cleanup = lambda: None
+    executor.context.variables.update(variables)
+    return executor.execute_flow(flow), executor.context.variables
+
+
+def test_bucle_con_cuerpo_que_ordena_antes_de_la_cabecera():
+    flow = CompiledFlow(
+        [paso('z_init', 'variable_set'), paso('b_loop', 'bucle_mientras'),
+         paso('a_body', 'variable_set'), paso('c_end', 'variable_set')],
+        [conexion('z_init', 'b_loop'), conexion('b_loop', 'a_body', 'E'),
+         conexion('a_body', 'b_loop'), conexion('b_loop', 'c_end', 'S')])
+    assert flow.back_edges == {('a_body', 'b_loop')}
+    assert flow.starts == ['z_init']
+    orden = sorted(flow.rank, key=flow.rank.get)
+    assert orden == ['z_init', 'b_loop', 'a_body', 'c_end']
+
+
+def test_bucle_mientras_ejecuta_init_cabecera_cuerpo_y_salida():
+    flow = {
+        'steps': [
+            paso('z_init', 'variable_set', variable='log', valor='init'),
+            paso('b_loop', 'bucle_mientras', condicion='verdadero', max_iteraciones=2),
+            paso('a_body', 'variable_set', variable='log', valor='${log},cuerpo'),
+            paso('c_end', 'variable_set', variable='log', valor='${log},fin'),
+        ],
+        'edges': [conexion('z_init', 'b_loop'), conexion('b_loop', 'a_body', 'E'),
+                  conexion('a_body', 'b_loop'), conexion('b_loop', 'c_end', 'S')],
+    }
+    resultado, variables = ejecutar(flow)
+    assert resultado['ok'], resultado
+    assert variables['log'] == 'init,cuerpo,cuerpo,fin'
+
+
+def test_ids_del_editor_step_10_antes_que_step_2():
+    flow = CompiledFlow(
+        [paso('step_1', 'variable_set'), paso('step_2', 'bucle_mientras'),
+         paso('step_10', 'variable_set'), paso('step_3', 'variable_set')],
+        [conexion('step_1', 'step_2'), conexion('step_2', 'step_10', 'E'),
+         conexion('step_10', 'step_2'), conexion('step_2', 'step_3', 'S')])
+    assert flow.back_edges == {('step_10', 'step_2')}
+
+
+def test_condicional_sigue_solo_la_rama_elegida():
+    flow = {
+        'steps': [
+            paso('a', 'condicional_si', condicion='$x > 10'),
+            paso('b', 'variable_set', variable='rama', valor='mayor'),
+            paso('c', 'variable_set', variable='rama', valor='menor'),
+        ],
+        'edges': [conexion('a', 'b', 'E'), conexion('a', 'c', 'S')],
+    }
+    resultado, variables = ejecutar(flow, x=3)
+    assert resultado['ok'], resultado
+    assert variables['rama'] == 'menor'
+
+
+def test_formato_del_boton_ejecutar():
+    # Conexiones con ids sueltos y pasos con typeId, como los envía buildFlowJSON
+    flow = {
+        'steps': [{'id': 'step_1', 'typeId': 'variable_set', 'props': {'variable': 'a', 'valor': '1'}},
+                  {'id': 'step_2', 'typeId': 'variable_set', 'props': {'variable': 'b', 'valor': 'x${a}'}}],
+        'edges': [{'from': 'step_1', 'to': 'step_2'}],
+    }
+    resultado, variables = ejecutar(flow)
+    assert resultado['ok'], resultado
+    assert variables['b'] == 'x1'
+
+
+def test_ciclo_sin_entrada_ni_control_se_rechaza():
+    flow = {
+        'steps': [paso('a', 'variable_set', variable='x', valor='1'),
+                  paso('b', 'variable_set', variable='y', valor='1')],
+        'edges': [conexion('a', 'b'), conexion('b', 'a')],
+    }
+    resultado, _ = ejecutar(flow)
+    assert not resultado['ok']
+    assert 'Ciclo sin paso de control' in resultado['error']
+
+
+def test_bucle_al_inicio_del_flujo_parte_de_la_cabecera():
+    # Ids del editor: el cuerpo N10_ ordena antes que la cabecera N2_
+    flow = {
+        'steps': [
+            paso('N2_bucle_mientras', 'bucle_mientras', condicion='verdadero', max_iteraciones=3),
+            paso('N10_variable_set', 'variable_set', variable='vueltas', valor='${vueltas}x'),
+        ],
+        'edges': [conexion('N2_bucle_mientras', 'N10_variable_set', 'E'),
+                  conexion('N10_variable_set', 'N2_bucle_mientras')],
+    }
+    compiled = FlowExecutor().compile_flow(flow)
+    assert compiled.back_edges == {('N10_variable_set', 'N2_bucle_mientras')}
+    resultado, variables = ejecutar(flow, vueltas='')
+    assert resultado['ok'], resultado
+    assert variables['vueltas'] == 'xxx'
+
+
+if __name__ == '__main__':
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
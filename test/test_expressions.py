@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del motor de expresiones de condiciones y bucles.
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pytest
+
+from modules.core.expressions import (ExpresionInvalida, compilar, compilar_vectorial, evaluar,
+                                      resolver_valor)
+
+
+def test_variables_rutas_y_operadores_en_espanol():
+    variables = {'total': 1500, 'fila': {'estado': 'ok', 'items': [3, 4]}, 'nombre': ''}
+    assert evaluar('$total > 1000 y ${fila.estado} == "ok"', variables) is True
+    assert evaluar('no vacio($nombre) o ${fila.items.1} == 4', variables) is True
+    assert evaluar('"y" in ["y", "o"]', variables) is True
+    assert compilar('$total > 1') is compilar('$total > 1')
+    with pytest.raises(NameError, match='fila.falta'):
+        evaluar('${fila.falta} == 1', variables)
+
+
+def test_solo_se_permiten_nodos_seguros():
+    for texto in ('__import__("os")', '$x.__class__', 'open("a")', '[c for c in "ab"]', 'lambda: 1'):
+        with pytest.raises(ExpresionInvalida):
+            compilar(texto)
+
+
+def test_version_por_columnas():
+    df = pd.DataFrame({'monto': [5, 50, 500], 'estado': ['ok', 'error', 'ok']})
+    expresion = compilar_vectorial('${fila.monto} > 10 and ${fila.estado} in ["ok"]')
+    assert list(expresion.evaluar({'fila': df})) == [False, False, True]
+    assert list(compilar_vectorial('"alto" if ${fila.monto} >= 50 else "bajo"').evaluar({'fila': df})) == ['bajo', 'alto', 'alto']
+    # Sin equivalente por columnas: se ejecuta fila a fila
+    assert compilar_vectorial('len(${fila.estado}) > 2') is None
+
+
+def test_resolver_valor_de_propiedades():
+    variables = {'tabla': [1, 2], 'cliente': {'nombre': 'Ana'}}
+    assert resolver_valor('$tabla', variables) is variables['tabla']
+    assert resolver_valor('Hola ${cliente.nombre} ${falta}', variables) == 'Hola Ana ${falta}'
+    # Nombres que no son identificadores, como en flujos anteriores
+    variables.update({'mi-variable': 7, 'datos.col': 'x'})
+    assert resolver_valor('$mi-variable', variables) == 7
+    assert resolver_valor('$datos.col', variables) == 'x'
+    assert resolver_valor('$otra-cosa', variables) == '$otra-cosa'
+
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__, '-q']))
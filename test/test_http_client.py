@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del cliente HTTP y de las acciones de peticiones contra un
+servidor local.
+"""
+
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import modules.actions  # noqa: F401
+from modules.core import FlowContext
+from modules.actions.navigation.http import descargar_archivos_action, peticiones_http_lote_action
+from modules.utils.http_client import ClienteHTTP, SesionNavegador, solicitar, descargar
+
+
+class _Servidor(BaseHTTPRequestHandler):
+    visitas = []
+    fallar_con = None
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self):
+        largo = int(self.headers.get('Content-Length') or 0)
+        cuerpo = self.rfile.read(largo) if largo else b''
+        _Servidor.visitas.append({'metodo': self.command, 'ruta': self.path,
+                                  'host': self.headers.get('Host', '').split(':')[0],
+                                  'cookie': self.headers.get('Cookie'), 'cuerpo': cuerpo})
+        if _Servidor.fallar_con:
+            self.send_response(_Servidor.fallar_con)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.path.startswith('/archivo'):
+            datos = b'x' * 5000
+            inicio = 0
+            rango = self.headers.get('Range')
+            if rango:
+                inicio = int(rango.split('=')[1].split('-')[0])
+                self.send_response(206)
+            else:
+                self.send_response(200)
+            self.send_header('Content-Length', str(len(datos) - inicio))
+            self.end_headers()
+            self.wfile.write(datos[inicio:])
+            return
+        datos = json.dumps({'ruta': self.path, 'items': [{'a': 1, 'b': {'c': 2}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    do_GET = do_POST = do_PATCH = _responder
+
+
+def _servidor():
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), _Servidor)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, servidor.server_address[1]
+
+
+class _DriverFalso:
+    current_url = 'about:blank'
+
+    def __init__(self, cookies):
+        self._cookies = cookies
+
+    def get_cookies(self):
+        return self._cookies
+
+    def execute_script(self, script):
+        return 'prueba'
+
+
+def setup_function(_):
+    _Servidor.visitas = []
+    _Servidor.fallar_con = None
+
+
+def test_sesion_elige_cookies_por_dominio_ruta_y_esquema():
+    sesion = SesionNavegador(_DriverFalso([
+        {'name': 'todo', 'value': '1', 'domain': '.ejemplo.com', 'path': '/'},
+        {'name': 'api', 'value': '2', 'domain': 'api.ejemplo.com', 'path': '/v1'},
+        {'name': 'segura', 'value': '3', 'domain': 'ejemplo.com', 'path': '/', 'secure': True},
+    ]))
+    assert sesion.cabeceras_para('https://api.ejemplo.com/v1/x')['Cookie'] == 'todo=1; api=2'
+    assert sesion.cabeceras_para('http://www.ejemplo.com/v1')['Cookie'] == 'todo=1'
+    # Sin '.' inicial la cookie es solo del host exacto
+    assert sesion.cabeceras_para('https://ejemplo.com/')['Cookie'] == 'todo=1; segura=3'
+    assert sesion.cabeceras_para('https://v1.api.ejemplo.com/v1')['Cookie'] == 'todo=1'
+    assert 'Cookie' not in sesion.cabeceras_para('https://otro.com/')
+    assert sesion.cabeceras_para('https://otro.com/')['User-Agent'] == 'prueba'
+
+
+def test_descarga_con_la_sesion_del_navegador(tmp_path):
+    servidor, puerto = _servidor()
+    try:
+        contexto = FlowContext()
+        contexto.set_driver('driver', _DriverFalso([{'name': 'SESSION', 'value': 'abc', 'domain': '127.0.0.1', 'path': '/'}]))
+        urls = [f'http://127.0.0.1:{puerto}/archivo/a.bin', f'http://127.0.0.1:{puerto}/archivo/b.bin']
+        resultado = descargar_archivos_action(contexto, urls=urls, carpeta_destino=str(tmp_path), hilos=2)
+        assert resultado['ok'], resultado
+        assert sorted(os.listdir(tmp_path)) == ['a.bin', 'b.bin']
+        assert os.path.getsize(tmp_path / 'a.bin') == 5000
+        assert {v['cookie'] for v in _Servidor.visitas} == {'SESSION=abc'}
+        assert contexto.get_variable('reporte_descargas')['estado'].tolist() == ['ok', 'ok']
+    finally:
+        servidor.shutdown()
+
+
+def test_lote_envia_cookies_solo_al_dominio_correspondiente():
+    servidor, puerto = _servidor()
+    try:
+        contexto = FlowContext()
+        contexto.set_driver('driver', _DriverFalso([{'name': 'SESSION', 'value': 'secreto', 'domain': '127.0.0.1', 'path': '/'}]))
+        urls = [f'http://127.0.0.1:{puerto}/api', f'http://localhost:{puerto}/x']
+        resultado = peticiones_http_lote_action(contexto, datos=urls, usar_sesion='sí', variable_destino='r')
+        assert resultado['ok'], resultado
+        cookies = {v['host']: v['cookie'] for v in _Servidor.visitas}
+        assert cookies['127.0.0.1'] == 'SESSION=secreto'
+        assert cookies['localhost'] is None
+    finally:
+        servidor.shutdown()
+
+
+def test_post_no_se_reintenta_ante_503():
+    servidor, puerto = _servidor()
+    try:
+        _Servidor.fallar_con = 503
+        registro = solicitar(ClienteHTTP(reintentos=2), 'POST', f'http://127.0.0.1:{puerto}/pago', cuerpo={'x': 1})
+        assert registro['status'] == 503
+        assert len(_Servidor.visitas) == 1
+    finally:
+        servidor.shutdown()
+
+
+def test_get_se_reintenta_ante_503_y_post_ante_429():
+    servidor, puerto = _servidor()
+    try:
+        cliente = ClienteHTTP(reintentos=2)
+        cliente.pool.connection_pool_kw['retries'].backoff_factor = 0
+        _Servidor.fallar_con = 503
+        solicitar(cliente, 'GET', f'http://127.0.0.1:{puerto}/lista')
+        assert len(_Servidor.visitas) == 3
+        _Servidor.visitas = []
+        _Servidor.fallar_con = 429
+        solicitar(cliente, 'POST', f'http://127.0.0.1:{puerto}/pago', cuerpo={'x': 1})
+        assert len(_Servidor.visitas) == 3
+    finally:
+        servidor.shutdown()
+
+
+def test_descarga_reanuda_un_parcial(tmp_path):
+    servidor, puerto = _servidor()
+    try:
+        destino = str(tmp_path / 'archivo.bin')
+        with open(destino + '.part', 'wb') as f:
+            f.write(b'x' * 1000)
+        registro = descargar(ClienteHTTP(), f'http://127.0.0.1:{puerto}/archivo', destino)
+        assert registro['estado'] == 'ok' and registro['reanudado']
+        assert os.path.getsize(destino) == 5000
+    finally:
+        servidor.shutdown()
+
+
+if __name__ == '__main__':
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de lectura y escritura de JSON Lines.
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+import pytest
+
+from modules.utils.json_io import escribir_jsonl, leer_jsonl, leer_registros
+
+
+def test_ida_y_vuelta_comprimido_y_anexando(tmp_path):
+    ruta = str(tmp_path / 'salida.jsonl.gz')
+    df = pd.DataFrame({'id': [1, 2, 3], 'nombre': ['á', None, 'c'], 'monto': [1.5, float('nan'), 3.0]})
+    assert escribir_jsonl(df, ruta, chunk_filas=2) == 3
+    assert escribir_jsonl([{'id': 4, 'cliente': {'pais': 'AR'}}], ruta, anexar=True) == 1
+
+    leido = leer_jsonl(ruta)
+    assert leido['id'].tolist() == [1, 2, 3, 4]
+    assert leido['nombre'].tolist()[:1] == ['á'] and pd.isna(leido.loc[1, 'monto'])
+    assert leido.loc[3, 'cliente.pais'] == 'AR'
+
+
+def test_plan_diferido_con_esquema_fijo(tmp_path):
+    ruta = tmp_path / 'eventos.jsonl'
+    ruta.write_text('{"a": 1, "b": {"c": "x"}}\n\n{"a": 2}\n{"a": 3, "b": {"c": "y"}}\n', encoding='utf-8')
+    plan = leer_jsonl(str(ruta), columnas=['a', 'b.c'], diferido=True).filtrar('a', '>=', 2)
+    resultado = plan.collect(chunk_filas=1)
+    assert resultado['a'].tolist() == [2, 3]
+    assert pd.isna(resultado['b.c'].iloc[0]) and resultado['b.c'].iloc[1] == 'y'
+
+
+def test_linea_invalida_indica_su_numero(tmp_path):
+    ruta = tmp_path / 'roto.jsonl'
+    ruta.write_text('{"a": 1}\n{roto\n', encoding='utf-8')
+    with pytest.raises(ValueError, match='línea 2'):
+        list(leer_registros(str(ruta)))
+
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de 'Para cada fila': ejecución por columnas y fila a fila.
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import modules.actions  # noqa: F401
+from modules.actions.control.flow import _plan_vectorial
+from modules.core import FlowExecutor
+
+
+def paso(step_id, tipo, **props):
+    return {'id': step_id, 'type': tipo, 'props': props}
+
+
+def conexion(origen, destino, puerto=None):
+    return {'from': {'step': origen, 'port': puerto}, 'to': {'step': destino}}
+
+
+def _flujo(calculo, hilos=1):
+    return {
+        'steps': [
+            paso('bucle', 'para_cada_fila', variable='ventas', variable_destino='resultado', hilos=hilos, lote=2),
+            paso('calc', 'fila_calcular', campo='total', expresion=calculo),
+            paso('filtro', 'fila_filtrar', condicion='${fila.total} > 20'),
+            paso('fin', 'variable_set', variable='listo', valor='terminado'),
+        ],
+        'edges': [conexion('bucle', 'calc', 'E'), conexion('calc', 'filtro'),
+                  conexion('filtro', 'bucle'), conexion('bucle', 'fin', 'S')],
+    }
+
+
+def _ejecutar(flow, **variables):
+    executor = FlowExecutor()
+    executor.context.cleanup = lambda: None
+    executor.context.variables.update(variables)
+    return executor.execute_flow(flow), executor.context.variables
+
+
+def _ventas():
+    return pd.DataFrame({'producto': ['a', 'bb', 'ccc', 'dddd', 'eeeee'], 'precio': [2, 5, 10, 3, 8],
+                         'cantidad': [4, 5, 3, 10, 1]}, index=[10, 11, 12, 13, 14])
+
+
+def test_cuerpo_vectorizable_se_ejecuta_por_columnas():
+    resultado, variables = _ejecutar(_flujo('${fila.precio} * ${fila.cantidad}'), ventas=_ventas())
+    assert resultado['ok'], resultado
+    assert variables['listo'] == 'terminado'
+    tabla = variables['resultado']
+    assert tabla.index.tolist() == [11, 12, 13]
+    assert tabla['total'].tolist() == [25, 30, 30]
+    assert 'fila' not in variables
+
+
+def test_fila_a_fila_en_paralelo_conserva_orden_e_indice():
+    # len() no tiene versión por columnas: se ejecuta fila a fila en 3 hilos
+    calculo = '${fila.precio} * ${fila.cantidad} + len(${fila.producto})'
+    resultado, variables = _ejecutar(_flujo(calculo, hilos=3), ventas=_ventas())
+    assert resultado['ok'], resultado
+    tabla = variables['resultado']
+    assert tabla.index.tolist() == [11, 12, 13]
+    assert tabla['total'].tolist() == [27, 33, 34]
+
+
+def test_variable_que_depende_de_la_fila_se_ejecuta_fila_a_fila():
+    flow = _flujo('${fila.cantidad} * $precio_fila')
+    flow['steps'].insert(1, paso('var', 'variable_set', variable='precio_fila', valor='${fila.precio}'))
+    flow['edges'][0] = conexion('bucle', 'var', 'E')
+    flow['edges'].append(conexion('var', 'calc'))
+    cuerpo = FlowExecutor().compile_flow(flow).body('bucle')
+    assert _plan_vectorial(cuerpo) is None
+    
+    _, uno = _ejecutar(flow, ventas=_ventas())
+    flow['steps'][0]['props']['hilos'] = 3
+    _, varios = _ejecutar(flow, ventas=_ventas())
+    # Totales fila a fila [8, 25, 30, 30, 8]; por columnas daban [32, 40, 24, 80, 8]
+    assert uno['resultado']['total'].tolist() == varios['resultado']['total'].tolist() == [25, 30, 30]
+
+
+if __name__ == '__main__':
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del plan de consultas diferido (LazyFrame).
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from modules.utils.query_plan import Fuente, LazyFrame
+
+
+def _ventas():
+    return pd.DataFrame({
+        'region': ['norte', 'sur', 'norte', 'sur', 'este', 'norte'],
+        'producto': ['a', 'b', 'b', 'a', 'a', 'a'],
+        'monto': [10, 20, 30, 40, 50, 60],
+        'extra': list('uvwxyz'),
+    })
+
+
+def test_filtros_y_proyeccion_se_empujan_al_scan(tmp_path):
+    ruta = tmp_path / 'ventas.csv'
+    _ventas().to_csv(ruta, index=False)
+    plan = (LazyFrame.desde_csv(str(ruta))
+            .filtrar('monto', '>', 15)
+            .seleccionar(['region', 'monto'])
+            .filtrar('region', '==', 'norte'))
+    fisico = plan.optimizar()
+    assert len(fisico.filtros) == 2
+    assert set(fisico.columnas_scan) == {'region', 'monto'}
+    resultado = plan.collect(chunk_filas=2)
+    assert resultado.to_dict('list') == {'region': ['norte', 'norte'], 'monto': [30, 60]}
+
+
+def test_ordenamientos_sucesivos_se_combinan_de_forma_estable():
+    df = _ventas()
+    plan = LazyFrame.desde(df).ordenar(['monto'], ascendente=False).ordenar(['region'])
+    assert plan.optimizar().orden.por == ('region', 'monto')
+    esperado = df.sort_values('monto', ascending=False, kind='stable')
+    esperado = esperado.sort_values('region', kind='stable', ignore_index=True)
+    pd.testing.assert_frame_equal(plan.collect(), esperado)
+
+
+def test_orden_por_columna_descartada_por_la_proyeccion():
+    plan = LazyFrame.desde(_ventas()).ordenar(['extra'], ascendente=False).seleccionar(['monto'])
+    assert plan.collect()['monto'].tolist() == [60, 50, 40, 30, 20, 10]
+
+
+def test_agregacion_por_bloques_coincide_con_pandas(tmp_path):
+    df = _ventas()
+    ruta = tmp_path / 'ventas.csv'
+    df.to_csv(ruta, index=False)
+    plan = LazyFrame.desde_csv(str(ruta)).agrupar(['region'], [('monto', 'suma'), ('monto', 'promedio')])
+    resultado = plan.collect(chunk_filas=2).sort_values('region', ignore_index=True)
+    esperado = df.groupby('region', as_index=False).agg(monto_suma=('monto', 'sum'), monto_promedio=('monto', 'mean'))
+    pd.testing.assert_frame_equal(resultado, esperado, check_dtype=False)
+
+
+class _FuenteVacia(Fuente):
+    def leer_bloques(self, columnas=None, chunk_filas=0):
+        return iter(())
+
+
+def test_agregacion_sin_bloques_devuelve_columnas_de_grupo():
+    resultado = LazyFrame(_FuenteVacia()).agrupar(['region', 'producto'], [('monto', 'suma')]).collect()
+    assert list(resultado.columns) == ['region', 'producto', 'monto_suma']
+    assert resultado.empty
+
+
+def test_filtrar_en_lista_de_numeros(tmp_path):
+    from modules.actions.data.processors import datos_filtrar
+    from modules.core import FlowContext
+    ruta = tmp_path / 'ventas.csv'
+    _ventas().to_csv(ruta, index=False)
+    contexto = FlowContext()
+    contexto.variables.update(ventas=_ventas(), ventas_csv=LazyFrame.desde_csv(str(ruta)))
+    for variable in ('ventas', 'ventas_csv'):
+        resultado = datos_filtrar(contexto, variable, 'monto', 'en', '20, 50,70', variable_destino='filtrado')
+        assert resultado['ok'], resultado
+        assert LazyFrame.desde(contexto.variables['filtrado']).collect()['monto'].tolist() == [20, 50]
+
+
+if __name__ == '__main__':
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del administrador de ejecuciones concurrentes y de la cancelación.
+"""
+
+import os
+import sys
+import threading
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+import modules.actions  # noqa: F401
+from modules.core.runs import RunManager, RunQueueFull, COMPLETED, CANCELLED
+
+
+def _flujo(nombre, segundos=None):
+    pasos = [{'id': 'a', 'type': 'variable_set', 'props': {'variable': 'nombre', 'valor': nombre}}]
+    if segundos:
+        pasos.append({'id': 'b', 'type': 'pausa', 'props': {'segundos': segundos}})
+    edges = [{'from': {'step': 'a'}, 'to': {'step': 'b'}}] if segundos else []
+    return {'name': nombre, 'steps': pasos, 'edges': edges}
+
+
+def _esperar(condicion, limite=5.0):
+    fin = time.monotonic() + limite
+    while not condicion():
+        assert time.monotonic() < fin, "la condición no se cumplió a tiempo"
+        time.sleep(0.01)
+
+
+def test_prioridad_y_cola_acotada():
+    iniciados = []
+    manager = RunManager(max_concurrent=1, max_queued=2)
+    bloqueante = manager.submit(_flujo('bloqueante', segundos=30))
+    _esperar(lambda: manager.active() == [bloqueante])
+    baja = manager.submit(_flujo('baja'), priority=0)
+    alta = manager.submit(_flujo('alta'), priority=5)
+    with pytest.raises(RunQueueFull):
+        manager.submit(_flujo('sobra'))
+    assert manager.status(alta)['posicion'] == 1
+
+    manager.notifier = lambda p: iniciados.append(p['runId']) if p.get('estado') == COMPLETED else None
+    assert manager.cancel(bloqueante)
+    assert manager.result(baja, timeout=5)['ok']
+    assert iniciados == [alta, baja]
+    assert manager.get(bloqueante).status == CANCELLED
+    manager.shutdown()
+
+
+def test_notificador_corre_sin_el_lock_tomado():
+    manager = RunManager(max_concurrent=1)
+    consultas = []
+
+    def notificador(payload):
+        if payload.get('level') != 'run':
+            return
+        # Otro hilo consulta el estado mientras se notifica el fin
+        hilo = threading.Thread(target=lambda: consultas.append(manager.list_runs()))
+        hilo.start()
+        hilo.join(2)
+        consultas.append(not hilo.is_alive())
+
+    manager.notifier = notificador
+    run_id = manager.submit(_flujo('uno'))
+    assert manager.result(run_id, timeout=5)['ok']
+    _esperar(lambda: len(consultas) == 2)
+    assert consultas[-1] is True
+
+    pendiente = RunManager(max_concurrent=1, notifier=notificador)
+    lento = pendiente.submit(_flujo('lento', segundos=30))
+    _esperar(lambda: pendiente.active() == [lento])
+    en_cola = pendiente.submit(_flujo('en_cola'))
+    consultas.clear()
+    assert pendiente.cancel(en_cola)
+    assert consultas[-1] is True
+    pendiente.shutdown()
+
+
+def test_pausa_y_reanudacion():
+    manager = RunManager(max_concurrent=1)
+    run_id = manager.submit(_flujo('pausable', segundos=0.3))
+    _esperar(lambda: manager.active() == [run_id])
+    assert manager.pause(run_id)
+    time.sleep(0.5)
+    assert manager.result(run_id) is None
+    assert manager.resume(run_id)
+    assert manager.result(run_id, timeout=5)['ok']
+    manager.shutdown()
+
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__, '-q']))
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del índice persistente de carpetas.
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.utils.snapshots import IndiceCarpetas
+
+
+def _escribir(ruta, texto, mtime=None):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write(texto)
+    if mtime is not None:
+        os.utime(ruta, (mtime, mtime))
+
+
+def _estados(cambios):
+    return {c['relativa']: c['estado'] for c in cambios}
+
+
+def test_detecta_nuevos_modificados_y_eliminados(tmp_path):
+    carpeta = tmp_path / 'entrada'
+    carpeta.mkdir()
+    _escribir(str(carpeta / 'a.csv'), 'uno')
+    _escribir(str(carpeta / 'b.csv'), 'dos')
+    indice = IndiceCarpetas(str(tmp_path / 'indice.sqlite'))
+
+    assert _estados(indice.detectar_cambios(str(carpeta))) == {'a.csv': 'nuevo', 'b.csv': 'nuevo'}
+    assert indice.detectar_cambios(str(carpeta)) == []
+
+    _escribir(str(carpeta / 'a.csv'), 'uno modificado')
+    os.remove(carpeta / 'b.csv')
+    _escribir(str(carpeta / 'c.csv'), 'tres')
+    # Sin actualizar, la misma comparación puede repetirse
+    cambios = indice.detectar_cambios(str(carpeta), actualizar=False)
+    assert _estados(cambios) == {'a.csv': 'modificado', 'b.csv': 'eliminado', 'c.csv': 'nuevo'}
+    assert _estados(indice.detectar_cambios(str(carpeta))) == _estados(cambios)
+
+    # Otra instancia lee la instantánea persistida
+    assert IndiceCarpetas(str(tmp_path / 'indice.sqlite')).detectar_cambios(str(carpeta)) == []
+
+
+def test_con_hash_un_archivo_tocado_sin_cambios_no_se_informa(tmp_path):
+    carpeta = tmp_path / 'entrada'
+    carpeta.mkdir()
+    _escribir(str(carpeta / 'a.csv'), 'igual', mtime=1_000_000)
+    indice = IndiceCarpetas(str(tmp_path / 'indice.sqlite'))
+    indice.detectar_cambios(str(carpeta), usar_hash=True)
+
+    _escribir(str(carpeta / 'a.csv'), 'igual', mtime=2_000_000)
+    assert indice.detectar_cambios(str(carpeta), usar_hash=True) == []
+    _escribir(str(carpeta / 'a.csv'), 'otro!', mtime=3_000_000)
+    assert _estados(indice.detectar_cambios(str(carpeta), usar_hash=True)) == {'a.csv': 'modificado'}
+
+
+if __name__ == '__main__':
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
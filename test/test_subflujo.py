@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de 'Ejecutar flujo': entradas, salidas, aislamiento y caché.
+"""
+
+import json
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+import modules.actions  # noqa: F401
+from modules.core import FlowExecutor
+
+
+def paso(step_id, tipo, **props):
+    return {'id': step_id, 'type': tipo, 'props': props}
+
+
+def conexion(origen, destino):
+    return {'from': {'step': origen}, 'to': {'step': destino}}
+
+
+def _guardar(ruta, pasos, edges=()):
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump({'steps': pasos, 'edges': list(edges)}, f)
+    return str(ruta)
+
+
+def _ejecutar(flow, **variables):
+    executor = FlowExecutor()
+    executor.context.cleanup = lambda: None
+    executor.context.variables.update(variables)
+    return executor, executor.execute_flow(flow), executor.context.variables
+
+
+def test_entradas_salidas_y_variables_del_padre(tmp_path):
+    sub = _guardar(tmp_path / 'saludo.json', [
+        paso('s1', 'variable_set', variable='temporal', valor='interno'),
+        paso('s2', 'variable_set', variable='mensaje', valor='hola ${nombre}'),
+    ], [conexion('s1', 's2')])
+    flow = {'steps': [paso('p1', 'ejecutar_flujo', ruta=sub, entradas='nombre=$usuario', salidas='saludo=mensaje')],
+            'edges': []}
+    executor, resultado, variables = _ejecutar(flow, usuario='ana', temporal='del padre')
+    assert resultado['ok'], resultado
+    assert variables['saludo'] == 'hola ana'
+    # Lo que el subflujo tocó y no es salida vuelve al valor del padre
+    assert variables['temporal'] == 'del padre'
+    assert 'nombre' not in variables and 'mensaje' not in variables
+
+    # Segunda carga sin cambios en el archivo: mismo flujo compilado
+    assert executor.load_flow(sub) is executor.load_flow(sub)
+
+
+def test_llamada_recursiva_se_rechaza(tmp_path):
+    ruta = tmp_path / 'recursivo.json'
+    _guardar(ruta, [paso('r1', 'ejecutar_flujo', ruta=str(ruta))])
+    _, resultado, _ = _ejecutar({'steps': [paso('p1', 'ejecutar_flujo', ruta=str(ruta))], 'edges': []})
+    assert not resultado['ok']
+    assert 'recursiva' in str(resultado.get('error'))
+
+
+def test_subflujo_dentro_de_para_cada_fila_en_paralelo(tmp_path):
+    sub = _guardar(tmp_path / 'doble.json', [paso('c1', 'fila_calcular', campo='doble', expresion='${fila.n} * 2')])
+    flow = {'steps': [paso('bucle', 'para_cada_fila', variable='tabla', variable_destino='res', hilos=3, lote=1),
+                      paso('sub', 'ejecutar_flujo', ruta=sub, salidas='fila=fila')],
+            'edges': [{'from': {'step': 'bucle', 'port': 'E'}, 'to': {'step': 'sub'}},
+                      conexion('sub', 'bucle')]}
+    _, resultado, variables = _ejecutar(flow, tabla=pd.DataFrame({'n': list(range(8))}))
+    assert resultado['ok'], resultado
+    assert variables['res']['doble'].tolist() == [n * 2 for n in range(8)]
+
+
+if __name__ == '__main__':
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
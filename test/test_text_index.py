@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del lector de texto con índice de líneas sobre mmap.
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from modules.utils import text_index
+from modules.utils.text_index import ArchivoTexto
+
+
+def _log(tmp_path, lineas, final='\n'):
+    ruta = tmp_path / 'app.log'
+    ruta.write_bytes(('\n'.join(lineas) + final).encode('utf-8'))
+    return str(ruta)
+
+
+def test_rangos_busqueda_y_plan(tmp_path, monkeypatch):
+    # Bloques chicos para cruzar los límites del escaneo por bloques
+    monkeypatch.setattr(text_index, 'BLOQUE_INDEXADO', 7)
+    lineas = [f'{i} {"ERROR" if i % 3 == 0 else "info"} mensaje ñ' for i in range(20)]
+    archivo = ArchivoTexto(_log(tmp_path, lineas), carpeta_indices=None)
+    assert len(archivo) == 20
+    assert archivo[0] == lineas[0] and archivo[-1] == lineas[-1]
+    assert archivo[5:8] == lineas[5:8]
+    with pytest.raises(IndexError):
+        archivo[20]
+
+    encontrados = archivo.buscar('error', ignorar_mayusculas=True, inicio=1, max_resultados=3)
+    assert [n for n, _ in encontrados] == [3, 6, 9]
+
+    plan = archivo.como_plan().filtrar('linea', 'contiene', 'ERROR')
+    assert plan.collect(chunk_filas=4)['numero'].tolist() == [1, 4, 7, 10, 13, 16, 19]
+
+
+def test_indice_cacheado_e_incremental(tmp_path):
+    carpeta = str(tmp_path / 'indices')
+    ruta = _log(tmp_path, ['uno', 'dos'], final='')
+    primero = ArchivoTexto(ruta, carpeta_indices=carpeta)
+    assert not primero.indice_desde_cache and len(primero) == 2
+
+    assert ArchivoTexto(ruta, carpeta_indices=carpeta).indice_desde_cache
+
+    # El log sigue creciendo: la última línea sin salto se completa y se agregan otras
+    with open(ruta, 'ab') as f:
+        f.write(b' y medio\ntres\n')
+    creciente = ArchivoTexto(ruta, carpeta_indices=carpeta)
+    assert creciente.lineas() == ['uno', 'dos y medio', 'tres']
+
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__, '-q']))
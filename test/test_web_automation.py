@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas del pool de navegadores y de la navegación en paralelo con
+sesiones simuladas (sin navegador real).
+"""
+
+import os
+import sys
+import types
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from modules.core import FlowContext
+from modules.core.cancellation import CancellationToken, FlowCancelled, bind_token
+from modules.utils import web_automation
+from modules.utils.web_automation import DriverPool, PerfilNavegador, esperar_pagina, navegar_urls
+
+
+class _DriverFalso:
+    def __init__(self):
+        self.timeouts = types.SimpleNamespace(page_load=300.0)
+        self.window_handles = ['principal']
+        self.switch_to = types.SimpleNamespace(window=lambda handle: None)
+        self.visitadas = []
+        self.cerrado = False
+        self.vivo = True
+        self.limpiezas = []
+
+    def set_page_load_timeout(self, segundos):
+        self.timeouts.page_load = segundos
+
+    def get(self, url):
+        self.actual = url
+        if url != 'about:blank':
+            self.visitadas.append(url)
+
+    def execute_script(self, script, *args):
+        if not self.vivo:
+            raise RuntimeError("sesión terminada")
+        if args:
+            return [f"titulo {self.actual}", self.actual, {nombre: 'x' for nombre in args[0]}]
+        return 1
+
+    def execute_cdp_cmd(self, comando, argumentos):
+        self.limpiezas.append(comando)
+
+    def quit(self):
+        self.cerrado = True
+
+
+class _PaginaQueCarga:
+    """Responde a los scripts de espera como una página que tarda en cargar."""
+
+    def __init__(self, consultas_hasta_completa):
+        self.restantes = consultas_hasta_completa
+        self.recursos = 0
+
+    def execute_script(self, script):
+        self.restantes -= 1
+        listo = 'complete' if self.restantes <= 0 else 'loading'
+        if 'getEntriesByType' in script:
+            # Llegan recursos nuevos hasta que la página termina
+            if listo != 'complete':
+                self.recursos += 1
+            return [listo, self.recursos]
+        return listo
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    creados = []
+
+    def fabrica():
+        driver = _DriverFalso()
+        creados.append(driver)
+        return driver
+
+    perfil = PerfilNavegador(sin_ventana=True, bloquear=('prueba',))
+    pool = DriverPool(fabrica, tamano=1)
+    monkeypatch.setitem(web_automation._pools, perfil, pool)
+    monkeypatch.setattr(web_automation, 'sesiones_recomendadas', lambda pedidas=None: pedidas or 1)
+    pool.perfil, pool.creados = perfil, creados
+    return pool
+
+
+def test_perfil_sin_ventana_y_con_bloqueos(monkeypatch):
+    from selenium.webdriver.chrome.options import Options
+    perfil = PerfilNavegador(sin_ventana=True, bloquear=('imagenes', 'analitica', '*.mp4', '*.png'))
+    patrones = perfil.patrones_bloqueados()
+    assert '*.jpg' in patrones and '*doubleclick.net*' in patrones and '*.mp4' in patrones
+    assert len(patrones) == len(set(patrones))
+
+    opciones = Options()
+    web_automation._configurar_opciones(opciones, perfil)
+    assert '--headless=new' in opciones.arguments
+    assert opciones.experimental_options['prefs'] == {'profile.managed_default_content_settings.images': 2}
+
+    comandos = []
+    driver = types.SimpleNamespace(execute_cdp_cmd=lambda cmd, args: comandos.append((cmd, args)))
+    web_automation._aplicar_bloqueos(driver, perfil)
+    assert comandos[-1] == ('Network.setBlockedURLs', {'urls': patrones})
+
+    # Un pool por perfil: una sesión sin ventana no se presta a un paso visible
+    monkeypatch.setattr(web_automation, '_pools', {})
+    assert web_automation.obtener_pool(perfil) is web_automation.obtener_pool(perfil)
+    assert web_automation.obtener_pool(perfil) is not web_automation.obtener_pool(PerfilNavegador())
+
+
+def test_resolucion_del_driver_se_cachea_en_disco(tmp_path, monkeypatch):
+    navegador = tmp_path / 'chrome.exe'
+    driver = tmp_path / 'chromedriver'
+    navegador.write_text('v1')
+    driver.write_text('bin')
+    consultas = []
+    monkeypatch.setattr(web_automation, 'RUTA_CACHE_DRIVERS', str(tmp_path / 'navegadores.json'))
+    monkeypatch.setattr(web_automation, '_cache_drivers', None)
+    monkeypatch.setattr(web_automation, 'detectar_navegadores', lambda: {'chrome': str(navegador)})
+    monkeypatch.setattr(web_automation.shutil, 'which', lambda nombre: consultas.append(nombre) or str(driver))
+
+    assert web_automation.resolver_driver('chrome')['driver'] == str(driver)
+    # Un proceso nuevo lee la caché del disco sin buscar el driver
+    monkeypatch.setattr(web_automation, '_cache_drivers', None)
+    assert web_automation.resolver_driver('chrome')['navegador'] == str(navegador)
+    assert consultas == ['chromedriver']
+
+    # El navegador se actualizó: se vuelve a resolver
+    os.utime(navegador, (1, 1))
+    web_automation.resolver_driver('chrome')
+    assert consultas == ['chromedriver', 'chromedriver']
+
+
+def test_esperas_por_condicion():
+    assert esperar_pagina(_PaginaQueCarga(3), 'documento', timeout=5) < 5
+    assert esperar_pagina(_PaginaQueCarga(2), 'red', timeout=5, quietud=0.2) >= 0.2
+    assert esperar_pagina(object(), 'ninguna') == 0.0
+    with pytest.raises(TimeoutError):
+        esperar_pagina(_PaginaQueCarga(10_000), 'documento', timeout=0.3)
+    with pytest.raises(ValueError):
+        esperar_pagina(_PaginaQueCarga(1), 'siempre')
+
+
+def test_pool_reutiliza_la_sesion_devuelta():
+    pool = DriverPool(_DriverFalso, tamano=1)
+    driver = pool.tomar()
+    pool.devolver(driver)
+    assert pool.tomar() is driver
+    with pytest.raises(TimeoutError):
+        pool.tomar(timeout=0.05)
+
+
+def test_pool_limpia_todo_el_navegador_o_descarta_la_sesion():
+    pool = DriverPool(_DriverFalso, tamano=1)
+    driver = pool.tomar()
+    pool.devolver(driver)
+    assert driver.limpiezas == ['Network.clearBrowserCookies', 'Storage.clearDataForOrigin']
+    assert not driver.cerrado
+
+    # Sin CDP no se pueden borrar las cookies de otros sitios: no se reutiliza
+    driver = pool.tomar()
+    driver.execute_cdp_cmd = None
+    pool.devolver(driver)
+    assert driver.cerrado
+    assert pool.estado() == {'libres': 0, 'prestadas': 0, 'tamano': 1}
+
+
+def test_abrir_sin_reutilizar_devuelve_la_sesion_prestada(monkeypatch):
+    from modules.actions.navigation import browser
+    pool = DriverPool(_DriverFalso, tamano=1)
+    dedicado = _DriverFalso()
+    monkeypatch.setattr(browser, 'crear_driver', lambda perfil: dedicado)
+    monkeypatch.setattr(browser, 'cambiar_pagina_web', lambda *args: 0.0)
+    contexto = FlowContext()
+    prestado = contexto.borrow_driver(pool)
+
+    resultado = browser.abrir_pagina_action(contexto, 'https://ejemplo.test', reutilizar_sesion='no')
+    assert resultado['ok'], resultado
+    assert pool.estado()['prestadas'] == 0 and not prestado.cerrado
+    contexto.clear_all_drivers()
+    # La sesión dedicada se cierra; no entra al pool
+    assert dedicado.cerrado
+    assert pool.estado() == {'libres': 1, 'prestadas': 0, 'tamano': 1}
+
+
+def test_contexto_devuelve_la_sesion_al_pool_y_se_recicla():
+    pool = DriverPool(_DriverFalso, tamano=1, max_usos=2)
+    contexto = FlowContext()
+    primero = contexto.borrow_driver(pool)
+    assert contexto.borrow_driver(pool) is primero
+    contexto.clear_all_drivers()
+    assert pool.estado() == {'libres': 1, 'prestadas': 0, 'tamano': 1}
+
+    assert contexto.borrow_driver(pool) is primero
+    contexto.clear_driver()
+    # Alcanzó max_usos: se cerró y el próximo préstamo crea otra sesión
+    assert primero.cerrado
+    segundo = pool.tomar()
+    assert segundo is not primero
+    segundo.vivo = False
+    pool.devolver(segundo)
+    assert pool.tomar() is not segundo
+
+
+def test_navegar_urls_no_agranda_el_pool_compartido(pool):
+    urls = [f'https://ejemplo.test/{i}' for i in range(6)]
+    resultados = navegar_urls(urls, campos={'precio': '.precio'}, sesiones=3,
+                              perfil=pool.perfil, espera='ninguna', timeout=7)
+    assert [r['url'] for r in resultados] == urls
+    assert all(r['estado'] == 'ok' and r['precio'] == 'x' for r in resultados)
+    assert pool.tamano == 1
+    assert pool.estado() == {'libres': 1, 'prestadas': 0, 'tamano': 1}
+    # Las sesiones de excedente se cierran; la que queda recupera su timeout
+    assert sum(not d.cerrado for d in pool.creados) == 1
+    assert all(d.timeouts.page_load == 300.0 for d in pool.creados)
+
+
+def test_navegar_urls_respeta_la_cancelacion(pool):
+    token = CancellationToken()
+    token.cancel()
+    with bind_token(token), pytest.raises(FlowCancelled):
+        navegar_urls(['https://ejemplo.test/a', 'https://ejemplo.test/b'], sesiones=2,
+                     perfil=pool.perfil, espera='ninguna')
+    assert not any(d.visitadas for d in pool.creados)
+    assert pool.estado()['prestadas'] == 0
+
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__, '-q']))
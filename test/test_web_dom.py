@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Pruebas de extracción masiva del DOM y llenado de formularios con un
+driver simulado que responde a los scripts inyectados.
+"""
+
+import json
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from modules.utils import web_dom
+
+
+class _SitioPaginado:
+    """Tabla repartida en páginas; el botón 'siguiente' avanza hasta la última."""
+
+    def __init__(self, paginas, columnas):
+        self.paginas = paginas
+        self.columnas = columnas
+        self.actual = 0
+        self.llamadas = 0
+
+    def execute_script(self, script, *args):
+        self.llamadas += 1
+        huella = f"pagina-{self.actual}"
+        if script == web_dom.SCRIPT_EXTRAER:
+            return json.dumps({'columnas': self.columnas, 'filas': self.paginas[self.actual], 'huella': huella})
+        if script == web_dom.SCRIPT_SIGUIENTE:
+            if self.actual + 1 >= len(self.paginas):
+                return False
+            self.actual += 1
+            return True
+        if script == web_dom.SCRIPT_HUELLA:
+            return huella
+        return 'complete'
+
+
+def test_extraer_tabla_paginada_en_una_llamada_por_pagina():
+    sitio = _SitioPaginado([[['1', 'a', 'x']], [['2', 'b']], [['3', 'c', 'z']]], ['id', '', 'id'])
+    registros, paginas = web_dom.extraer_paginas(sitio, '#tabla', siguiente='.next', max_paginas=10, timeout=2)
+    assert paginas == 3
+    assert registros[0] == {'id': '1', 'col_2': 'a', 'id_2': 'x', 'pagina': 1}
+    assert registros[1] == {'id': '2', 'col_2': 'b', 'id_2': None, 'pagina': 2}
+    assert [r['pagina'] for r in registros] == [1, 2, 3]
+    # extraer + siguiente + huella + readyState por cambio de página
+    assert sitio.llamadas < 15
+
+
+def test_extraer_respeta_max_paginas():
+    sitio = _SitioPaginado([[['1']], [['2']], [['3']]], None)
+    registros, paginas = web_dom.extraer_paginas(sitio, '#tabla', siguiente='.next', max_paginas=2, timeout=2)
+    assert paginas == 2 and [r['col_1'] for r in registros] == ['1', '2']
+
+
+class _Formulario:
+    def __init__(self, campos):
+        self.campos = set(campos)
+        self.envios = []
+        self.abiertas = 0
+
+    def get(self, url):
+        self.abiertas += 1
+
+    def execute_script(self, script, *args):
+        if script == web_dom.SCRIPT_LLENAR:
+            valores, enviar = args
+            json.dumps(valores)  # todo debe poder serializarse hacia el navegador
+            faltantes = [s for s in valores if s not in self.campos]
+            if not faltantes:
+                self.envios.append(valores)
+            return faltantes
+        return 'complete'
+
+
+def test_llenar_formularios_un_script_por_fila_y_errores_por_fila():
+    driver = _Formulario(['#nombre', '#edad', '#activo'])
+    filas = [
+        {'nombre': 'Ana', 'edad': np.int64(30), 'activo': True},
+        {'nombre': float('nan'), 'edad': np.float64(41.5), 'activo': False},
+    ]
+    mapeo = {'nombre': '#nombre', 'edad': '#edad', 'activo': '#activo'}
+    reporte = web_dom.llenar_formularios(driver, filas, mapeo, enviar='#guardar', url_formulario='http://x/form',
+                                         espera='ninguna')
+    assert [r['estado'] for r in reporte] == ['ok', 'ok']
+    assert driver.abiertas == 2
+    assert driver.envios[1] == {'#nombre': None, '#edad': 41.5, '#activo': False}
+
+    reporte = web_dom.llenar_formularios(driver, [{'nombre': 'Eva', 'mail': 'e@x'}],
+                                         {'nombre': '#nombre', 'mail': '#mail'}, espera='ninguna')
+    assert reporte[0]['estado'] == 'error' and '#mail' in reporte[0]['error']
+
+
+if __name__ == '__main__':
+    import pytest
+    sys.exit(pytest.main([__file__, '-q']))
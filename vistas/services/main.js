@@ -30,6 +30,7 @@ async function init() {
   uiConsole = setupConsole({
     onRun:   runFlow,
     onStop:  stopFlow,
+    onPause: pauseFlow,
     onClear: () => state.clearResults(),
   });
 
@@ -228,25 +229,34 @@ function mountNode(step, def) {
   const ports = document.createElement('div');
   ports.className = 'ports';
   const pIn  = document.createElement('div'); pIn.className  = 'port port-in';
-  const pOut = document.createElement('div'); pOut.className = 'port port-out';
-
-  pOut.addEventListener('click', (e) => {
-    e.stopPropagation();
-    state.__edgeFrom = { step: step.id, port: 'out' };
-    pOut.classList.add('target');
-    setTimeout(() => pOut.classList.remove('target'), 300);
+  // Dos salidas: E (verdadero / cuerpo del bucle) y S (falso / salida del bucle)
+  const outs = [
+    ['E', 'Salida derecha: verdadero / cuerpo del bucle'],
+    ['S', 'Salida inferior: falso / al terminar el bucle'],
+  ].map(([port, title]) => {
+    const pOut = document.createElement('div');
+    pOut.className = 'port port-out';
+    pOut.dataset.port = port;
+    pOut.title = title;
+    pOut.addEventListener('click', (e) => {
+      e.stopPropagation();
+      state.__edgeFrom = { step: step.id, port };
+      pOut.classList.add('target');
+      setTimeout(() => pOut.classList.remove('target'), 300);
+    });
+    return pOut;
   });
 
   pIn.addEventListener('click', (e) => {
     e.stopPropagation();
     if (state.__edgeFrom && state.__edgeFrom.step !== step.id) {
-      addEdge(state.__edgeFrom.step, step.id);
+      addEdge(state.__edgeFrom.step, step.id, state.__edgeFrom.port);
       state.__edgeFrom = null;
     }
   });
 
   ports.appendChild(pIn);
-  ports.appendChild(pOut);
+  outs.forEach(p => ports.appendChild(p));
 
   el.appendChild(header);
   el.appendChild(body);
@@ -361,10 +371,10 @@ function deleteStep(stepId) {
   if (state.steps.length) centerOnStep(state.steps[0].id, true);
 }
 
-function addEdge(fromStepId, toStepId) {
+function addEdge(fromStepId, toStepId, port = 'E') {
   if (fromStepId === toStepId) return;
   if (state.edges.some(e => e.from.step === fromStepId && e.to.step === toStepId)) return;
-  state.edges.push({ from: { step: fromStepId, port: 'out' }, to: { step: toStepId, port: 'in' } });
+  state.edges.push({ from: { step: fromStepId, port }, to: { step: toStepId, port: 'W' } });
   edges.renderEdges();
 }
 
@@ -430,12 +440,19 @@ async function runFlow() {
 }
 
 function stopFlow() {
-  if (window.eel && typeof window.eel.cancel_flow === 'function') {
-    window.eel.cancel_flow()();
+  if (window.eel && typeof window.eel.cancel_run === 'function') {
+    window.eel.cancel_run()();
   }
   uiConsole?.log('Detener: solicitado.');
 }
 
+async function pauseFlow(pause) {
+  if (window.eel && typeof window.eel.pause_run === 'function') {
+    await (pause ? window.eel.pause_run() : window.eel.resume_run())();
+  }
+  uiConsole?.log(pause ? 'Pausa: solicitada.' : 'Reanudar: solicitado.');
+}
+
 function onProgress(payload) {
   // payload: { stepId, message, level, preview }
   const { stepId, message, level, preview } = payload || {};
@@ -470,7 +487,11 @@ function buildFlowJSON() {
       position: { x: Math.round(s.x), y: Math.round(s.y) },
       props: s.props || {},
     })),
-    edges: state.edges.map(e => ({ from: e.from.step, to: e.to.step })),
+    // El puerto de salida decide la rama (E: verdadero / cuerpo, S: falso / salida)
+    edges: state.edges.map(e => ({
+      from: { step: e.from.step, port: e.from.port },
+      to:   { step: e.to.step,   port: e.to.port },
+    })),
   };
 }
 
@@ -496,7 +517,10 @@ function loadFlowJSON(data) {
   const edgesIn = Array.isArray(data?.edges) ? data.edges : [];
   state.edges = edgesIn
     .filter(e => e && e.from && e.to)
-    .map(e => ({ from: { step: e.from, port: 'out' }, to: { step: e.to, port: 'in' } }));
+    .map(e => ({
+      from: typeof e.from === 'object' ? e.from : { step: e.from, port: 'E' },
+      to:   typeof e.to === 'object'   ? e.to   : { step: e.to,   port: 'W' },
+    }));
 
   updateCanvasSize();
   edges.renderEdges();
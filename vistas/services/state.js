@@ -137,12 +137,14 @@ export const state = {
     // reconstruir edges válidos
     const valid = new Set(this.steps.map(s => s.id));
     const edges = Array.isArray(flow?.edges) ? flow.edges : [];
+    // Extremos como id del paso o como {step, port}
+    const end = (x, port) => (x && typeof x === 'object') ? { step: x.step, port: x.port || port } : { step: x, port };
     this.edges = edges
-      .filter(e => e && valid.has(e.from) && valid.has(e.to))
+      .filter(e => e && valid.has(end(e.from).step) && valid.has(end(e.to).step))
       .map(e => ({
         id: `edge_${Date.now()}_${Math.random().toString(36).slice(2,7)}`,
-        from: { step: e.from, port: 'E' },
-        to:   { step: e.to,   port: 'W' }
+        from: end(e.from, 'E'),
+        to:   end(e.to, 'W')
       }));
   },
 };
@@ -1,10 +1,11 @@
-export function setupConsole({ onRun, onStop, onClear }) {
+export function setupConsole({ onRun, onStop, onPause, onClear }) {
   const el = document.getElementById('console');
   el.innerHTML = `
     <div class="con-header">
       <div class="con-title">Flow Console</div>
       <div class="con-actions">
         <button id="con-run">▶ Ejecutar</button>
+        <button id="con-pause">⏸ Pausar</button>
         <button id="con-stop">■ Detener</button>
         <button id="con-clear">🧹 Limpiar</button>
       </div>
@@ -14,6 +15,13 @@ export function setupConsole({ onRun, onStop, onClear }) {
 
   el.querySelector('#con-run').addEventListener('click', onRun);
   el.querySelector('#con-stop').addEventListener('click', onStop);
+  const pauseBtn = el.querySelector('#con-pause');
+  pauseBtn.addEventListener('click', async () => {
+    const paused = pauseBtn.dataset.paused === '1';
+    await onPause?.(!paused);
+    pauseBtn.dataset.paused = paused ? '0' : '1';
+    pauseBtn.textContent = paused ? '⏸ Pausar' : '▶ Reanudar';
+  });
   el.querySelector('#con-clear').addEventListener('click', () => {
     const body = el.querySelector('#con-body'); body.innerHTML = ''; onClear?.();
   });